@@ -0,0 +1,460 @@
+# bench.py
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from loadgen import percentile
+
+# ----------------------------
+# Reproducible benchmark suite
+# Runs headless (Streamlit AppTest against v1.py, plus the engine/store/chart
+# modules directly) and writes one flat JSON of metrics, all lower-is-better,
+# so two commits can be compared:
+#   python bench.py run [--out bench.json] [--sizes 1000,100000,1000000]
+#                       [--only startup,flow,leaderboard,chart] [--repeat 3] [--quick]
+#   python bench.py compare base.json new.json [--threshold 0.25]
+# Groups:
+#   startup      fresh interpreter per repeat: intro page first render (cold
+#                imports, scenario compile, no chart/pandas)
+#   flow         per scenario: start, answer every step, final page (radar
+#                chart, analysis); plus the bare engine cost of a run
+#   leaderboard  per synthetic size: single-row save latency, leaderboard page
+#                first render (board load) and warm rerender, process RSS growth
+#   chart        plot_spiderchart build + PNG encode time, peak traced memory,
+#                RSS growth over many uncached renders
+# Synthetic leaderboards are built once per (size, seed) under .bench_cache/
+# and copied for each run, so repeated runs measure the app, not the fill.
+# compare exits with status 1 when a metric got slower/bigger than
+# base * (1 + threshold) and the difference exceeds the metric's noise floor.
+# ----------------------------
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "v1.py")
+BENCH_CACHE_DIR = os.environ.get("SERIOUSGAME_BENCH_CACHE", ".bench_cache")
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+QUICK_SIZES = (1_000, 10_000)
+GROUPS = ("startup", "flow", "leaderboard", "chart")
+FILL_BATCH_ROWS = 50_000
+LEAK_CHECK_RENDERS = 60
+# absolute differences below these never count as regressions (timer noise)
+NOISE_FLOOR = {"s": 0.005, "ms": 0.1, "us": 1.0, "kb": 256, "mb": 2.0, "bytes": 512, "count": 0}
+
+# the intro page's first run, in a fresh interpreter, as the app sees it
+_STARTUP_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+assert not at.exception, at.exception
+import perf
+print(json.dumps({"wall_seconds": time.perf_counter() - t0, **perf.startup.report}))
+"""
+
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name: str, value: float, unit: str):
+        self.metrics[name] = {"value": round(float(value), 6), "unit": unit}
+
+
+def _median(values: list) -> float:
+    return percentile(sorted(values), 50)
+
+
+def _rss_kb() -> float:
+    # current resident set size (Linux); peak RSS elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _slug(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name.lower()).strip("_")
+
+
+@contextmanager
+def _scratch_dir():
+    # run in an empty temporary directory: the app creates its stores in the cwd
+    home = os.getcwd()
+    with tempfile.TemporaryDirectory() as cwd:
+        os.chdir(cwd)
+        try:
+            yield cwd
+        finally:
+            os.chdir(home)
+
+
+def _fresh_app_state():
+    # AppTest runs the script in this process: drop cached stores/boards/engines
+    # so each measurement starts from the database in the current directory
+    import streamlit as st
+
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def _app_test(timeout: float = 600):
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    set_log_level("error")      # deprecation notices would drown the report
+    return AppTest.from_file(APP, default_timeout=timeout)
+
+
+def _timed_run(at) -> float:
+    t = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - t
+    if at.exception:
+        raise RuntimeError(f"app raised during the benchmark: {at.exception[0].message}")
+    return elapsed
+
+
+def _play_through(scenario_idx: int, rng: random.Random) -> list:
+    # intro -> start -> one random option per step; seconds of each answer's rerun
+    # (the last one also renders the results: radar chart, ranks, analysis)
+    from game_content import scenarios
+
+    steps = len(list(scenarios.values())[scenario_idx])
+    at = _app_test()
+    _timed_run(at)
+    at.selectbox[0].select_index(scenario_idx)
+    [b for b in at.button if b.label == "Start scenario"][0].click()
+    _timed_run(at)
+    elapsed = []
+    for _ in range(steps):
+        options = [b for b in at.button if (b.key or "").startswith("opt_")]
+        options[rng.randrange(len(options))].click()
+        elapsed.append(_timed_run(at))
+    return elapsed
+
+
+def _warm_up():
+    # one untimed game and leaderboard page on an empty store, so lazy imports
+    # (pandas, matplotlib, pyarrow) are not charged to the first measured case
+    with _scratch_dir():
+        _fresh_app_state()
+        _play_through(0, random.Random(0))
+        at = _app_test()
+        _timed_run(at)
+        at.session_state.page = "leaderboard"
+        _timed_run(at)
+        _fresh_app_state()
+
+
+# ----------------------------
+# Startup
+# ----------------------------
+def bench_startup(results: Results, repeat: int):
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd:
+            out = subprocess.run(
+                [sys.executable, "-c", _STARTUP_SCRIPT, APP], cwd=cwd, check=True, capture_output=True, text=True,
+                env={**os.environ, "PYTHONPATH": os.path.dirname(APP), "SERIOUSGAME_LIVE_REFRESH_S": "0"},
+            )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    results.add("startup.intro_first_run_s", _median([r["run_seconds"] for r in runs]), "s")
+    results.add("startup.apptest_wall_s", _median([r["wall_seconds"] for r in runs]), "s")
+    if runs[0]["since_process_start_seconds"] is not None:
+        results.add("startup.process_to_first_render_s",
+                    _median([r["since_process_start_seconds"] for r in runs]), "s")
+    results.add("startup.heavy_modules_on_intro", max(len(r["heavy_modules_loaded"]) for r in runs), "count")
+
+
+# ----------------------------
+# Game flow
+# ----------------------------
+def bench_flow(results: Results, repeat: int, seed: int):
+    import charts
+    from game_content import scenarios
+    from game_engine import GameEngine
+
+    rng = random.Random(seed)
+    engine = GameEngine(scenarios)
+    n, t = 0, time.perf_counter()
+    while time.perf_counter() - t < 0.5:
+        state = engine.start(rng.choice(list(scenarios)))
+        while not engine.is_finished(state):
+            engine.choose(state, rng.randrange(len(engine.current_step(state)["options"])))
+        engine.result_entry(state, "bench")
+        n += 1
+    results.add("flow.engine_run_us", (time.perf_counter() - t) / n * 1e6, "us")
+
+    _warm_up()
+    for scenario_idx, name in enumerate(scenarios):
+        totals, answers, finals = [], [], []
+        for _ in range(repeat):
+            with _scratch_dir():
+                _fresh_app_state()
+                charts._render.cache_clear()    # every run renders its radar chart
+                started = time.perf_counter()
+                steps = _play_through(scenario_idx, rng)
+                totals.append(time.perf_counter() - started)
+                answers.extend(steps[:-1])
+                finals.append(steps[-1])
+        key = f"flow.{_slug(name)}"
+        results.add(f"{key}.full_run_s", _median(totals), "s")
+        results.add(f"{key}.answer_p50_ms", _median(answers) * 1000, "ms")
+        results.add(f"{key}.final_page_s", _median(finals), "s")
+
+
+# ----------------------------
+# Leaderboard scaling
+# ----------------------------
+def synthetic_db(size: int, seed: int) -> str:
+    # cached synthetic leaderboard: engine-played runs over the last 30 days
+    from game_content import scenarios
+    from game_engine import GameEngine
+    from leaderboard_store import LeaderboardStore
+
+    path = os.path.abspath(os.path.join(BENCH_CACHE_DIR, f"leaderboard-{size}-s{seed}.db"))
+    if os.path.exists(path):
+        return path
+    os.makedirs(BENCH_CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    store = LeaderboardStore(tmp, legacy_csv=None)
+    engine = GameEngine(scenarios)
+    rng = random.Random(seed)
+    names = list(scenarios)
+    start = datetime.utcnow() - timedelta(days=30)
+    step = timedelta(days=30) / size
+    batch = []
+    for i in range(size):
+        state = engine.start(names[rng.randrange(len(names))])
+        while not engine.is_finished(state):
+            engine.choose(state, rng.randrange(len(engine.current_step(state)["options"])))
+        batch.append(engine.result_entry(state, f"player-{rng.randrange(50_000)}", (start + i * step).isoformat()))
+        if len(batch) == FILL_BATCH_ROWS:
+            store.append_many(batch)
+            batch = []
+    if batch:
+        store.append_many(batch)
+    conn = store._connect()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    os.replace(tmp, path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(tmp + suffix):
+            os.remove(tmp + suffix)
+    return path
+
+
+def bench_leaderboard(results: Results, sizes: list, repeat: int, seed: int):
+    from game_content import scenarios
+    from game_engine import GameEngine
+    from leaderboard_store import LeaderboardStore
+
+    engine = GameEngine(scenarios)
+    rng = random.Random(seed)
+    _warm_up()
+    for size in sizes:
+        source = synthetic_db(size, seed)
+        with _scratch_dir():
+            shutil.copyfile(source, "leaderboard.db")
+            key = f"leaderboard.{size}"
+
+            # single-row synchronous saves into a table of this size
+            store = LeaderboardStore("leaderboard.db", legacy_csv=None)
+            saves = []
+            for i in range(200):
+                state = engine.start(rng.choice(list(scenarios)))
+                while not engine.is_finished(state):
+                    engine.choose(state, rng.randrange(len(engine.current_step(state)["options"])))
+                entry = engine.result_entry(state, f"bench-{i}")
+                t = time.perf_counter()
+                store.append(entry)
+                saves.append(time.perf_counter() - t)
+            saves.sort()
+            results.add(f"{key}.save_p50_ms", percentile(saves, 50) * 1000, "ms")
+            results.add(f"{key}.save_p99_ms", percentile(saves, 99) * 1000, "ms")
+
+            # leaderboard page: first render loads the shared board, then warm reruns
+            _fresh_app_state()
+            at = _app_test()
+            _timed_run(at)
+            rss = _rss_kb()
+            at.session_state.page = "leaderboard"
+            results.add(f"{key}.page_first_render_s", _timed_run(at), "s")
+            results.add(f"{key}.page_rss_growth_mb", (_rss_kb() - rss) / 1024, "mb")
+            results.add(f"{key}.page_rerender_s", _median([_timed_run(at) for _ in range(max(3, repeat))]), "s")
+            _fresh_app_state()
+
+
+# ----------------------------
+# Radar chart
+# ----------------------------
+def bench_chart(results: Results, seed: int):
+    import gc
+    import io
+    import tracemalloc
+
+    from charts import DIMENSIONS, plot_spiderchart
+
+    rng = random.Random(seed)
+    vectors = [{d: rng.randint(-10, 10) for d in DIMENSIONS} for _ in range(60)]
+
+    def render(scores: dict) -> int:
+        fig = plot_spiderchart(scores)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", bbox_inches="tight")
+        fig.clear()
+        return buf.tell()
+
+    t = time.perf_counter()
+    render(vectors[0])      # imports matplotlib, builds font caches
+    results.add("chart.first_render_s", time.perf_counter() - t, "s")
+
+    builds, renders, size = [], [], 0
+    for scores in vectors[:30]:
+        t = time.perf_counter()
+        fig = plot_spiderchart(scores)
+        builds.append(time.perf_counter() - t)
+        fig.clear()
+        t = time.perf_counter()
+        size = render(scores)
+        renders.append(time.perf_counter() - t)
+    results.add("chart.plot_spiderchart_ms", _median(builds) * 1000, "ms")
+    results.add("chart.render_png_ms", _median(renders) * 1000, "ms")
+    results.add("chart.png_bytes", size, "bytes")
+
+    gc.collect()
+    tracemalloc.start()
+    render(vectors[1])
+    results.add("chart.render_peak_traced_kb", tracemalloc.get_traced_memory()[1] / 1024, "kb")
+    tracemalloc.stop()
+
+    gc.collect()
+    rss = _rss_kb()
+    for i in range(LEAK_CHECK_RENDERS):
+        render(vectors[i % len(vectors)])
+    gc.collect()
+    results.add(f"chart.rss_growth_{LEAK_CHECK_RENDERS}_renders_kb", _rss_kb() - rss, "kb")
+
+
+# ----------------------------
+# Runner & comparison
+# ----------------------------
+def _meta(args) -> dict:
+    import streamlit
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(APP),
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "streamlit": streamlit.__version__,
+        "sizes": args.sizes,
+        "repeat": args.repeat,
+        "seed": args.seed,
+    }
+
+
+def run(args) -> dict:
+    os.environ["SERIOUSGAME_LIVE_REFRESH_S"] = "0"      # no timer-driven fragment reruns
+    os.environ["SERIOUSGAME_WRITE_BEHIND"] = "0"        # saves land before the next page render
+    results = Results()
+    global BENCH_CACHE_DIR
+    BENCH_CACHE_DIR = os.path.abspath(BENCH_CACHE_DIR)
+    timings = {}
+    for group in args.only:
+        t = time.perf_counter()
+        if group == "startup":
+            bench_startup(results, args.repeat)
+        elif group == "flow":
+            bench_flow(results, args.repeat, args.seed)
+        elif group == "leaderboard":
+            bench_leaderboard(results, args.sizes, args.repeat, args.seed)
+        elif group == "chart":
+            bench_chart(results, args.seed)
+        timings[group] = round(time.perf_counter() - t, 2)
+        print(f"[bench] {group}: {timings[group]:.1f} s", file=sys.stderr)
+    return {"meta": {**_meta(args), "group_seconds": timings}, "metrics": results.metrics}
+
+
+def compare(base: dict, new: dict, threshold: float) -> tuple:
+    # (rows, regressions); rows: (metric, base, new, ratio, status)
+    rows, regressions = [], []
+    for name in sorted(set(base["metrics"]) | set(new["metrics"])):
+        b, n = base["metrics"].get(name), new["metrics"].get(name)
+        if b is None or n is None:
+            rows.append((name, b and b["value"], n and n["value"], None, "only in " + ("new" if b is None else "base")))
+            continue
+        bv, nv, unit = b["value"], n["value"], n["unit"]
+        ratio = nv / bv if bv else (1.0 if nv == bv else float("inf"))
+        status = "ok"
+        if nv > bv * (1 + threshold) and nv - bv > NOISE_FLOOR.get(unit, 0):
+            status = "REGRESSION"
+            regressions.append(name)
+        elif nv < bv * (1 - threshold) and bv - nv > NOISE_FLOOR.get(unit, 0):
+            status = "improved"
+        rows.append((name, bv, nv, ratio, status))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark startup, game flow, leaderboard scaling and charts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="run the suite and write JSON")
+    p.add_argument("--out", default="bench.json")
+    p.add_argument("--sizes", default=None, help="comma-separated leaderboard sizes (default 1e3,1e5,1e6)")
+    p.add_argument("--only", default=",".join(GROUPS), help=f"comma-separated groups from {', '.join(GROUPS)}")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--quick", action="store_true", help=f"sizes {QUICK_SIZES}, one repeat")
+    p = sub.add_parser("compare", help="compare two result files; exit 1 on regressions")
+    p.add_argument("base")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        rows, regressions = compare(base, new, args.threshold)
+        print(f"base {base['meta'].get('commit')}  ->  new {new['meta'].get('commit')}  (threshold +{args.threshold:.0%})")
+        for name, bv, nv, ratio, status in rows:
+            ratio_text = "" if ratio is None else f"x{ratio:.2f}"
+            bv_text, nv_text = ("-" if v is None else f"{v:.4g}" for v in (bv, nv))
+            print(f"  {name:<58} {bv_text:>10} {nv_text:>10} {ratio_text:>7}  {status}")
+        print(f"{len(regressions)} regression(s)")
+        sys.exit(1 if regressions else 0)
+
+    args.sizes = [int(float(s)) for s in args.sizes.split(",")] if args.sizes else list(
+        QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    args.repeat = 1 if args.quick else args.repeat
+    args.only = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = set(args.only) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+    report = run(args)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, m in report["metrics"].items():
+        print(f"  {name:<58} {m['value']:>12.4f} {m['unit']}")
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
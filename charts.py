@@ -0,0 +1,94 @@
+# charts.py
+import io
+import os
+import threading
+from functools import lru_cache
+
+from perf import timed
+
+# ----------------------------
+# Spider (radar) chart rendering
+# Charts are rendered once per distinct score vector and kept as image bytes in
+# a bounded LRU. Figures are built with the object-oriented API (no pyplot
+# global registry) and closed as soon as they are rendered.
+# ----------------------------
+DIMENSIONS = ("time", "cost", "trust", "impact")
+CHART_CACHE_SIZE = int(os.environ.get("SERIOUSGAME_CHART_CACHE_SIZE", "2048"))
+
+# Agg's text/font caches are shared, so renders are serialized; with the LRU in
+# front this lock is only contended on cold renders
+_render_lock = threading.Lock()
+
+
+def plot_spiderchart(scores: dict):
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    labels = [l.capitalize() for l in scores.keys()]
+    values = [scores[k] for k in scores.keys()]
+
+    # Normalize for visualization: shift range so center isn't negative (optional)
+    # We'll display raw values but map to symmetric scale for visual balance
+    max_abs = max(6, max(abs(v) for v in values))  # at least 6 for decent axes
+    scaled = [v / max_abs for v in values]
+
+    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+    scaled += scaled[:1]
+    angles += angles[:1]
+
+    fig = Figure(figsize=(6,6))
+    ax = fig.add_subplot(polar=True)
+    ax.plot(angles, scaled, color="#0d6efd", linewidth=2)
+    ax.fill(angles, scaled, color="#0d6efd", alpha=0.25)
+
+    # labels
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(labels, fontsize=12)
+    # radial ticks: show meaningful ticks based on max_abs
+    ticks = [-max_abs, -max_abs/2, 0, max_abs/2, max_abs]
+    tick_labels = [str(int(t)) for t in ticks]
+    ax.set_yticks([t/max_abs for t in ticks])
+    ax.set_yticklabels(tick_labels)
+    ax.set_ylim(-1, 1)
+    ax.grid(color="#e6eef8")
+    ax.set_title("Final Scores (normalized view)", y=1.08)
+    return fig
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+@timed("chart.render_cold")
+def _render(vector: tuple, fmt: str) -> bytes:
+    with _render_lock:
+        fig = plot_spiderchart(dict(zip(DIMENSIONS, vector)))
+        buf = io.BytesIO()
+        try:
+            fig.savefig(buf, format=fmt, bbox_inches="tight")
+        finally:
+            # never registered with pyplot, so dropping its artists is all the
+            # closing it needs
+            fig.clear()
+    return buf.getvalue()
+
+
+@timed("chart.render")
+def render_spiderchart(scores: dict, fmt: str = "png") -> bytes:
+    # cached image bytes for a final score vector
+    return _render(tuple(int(scores[d]) for d in DIMENSIONS), fmt)
+
+
+def chart_cache_info():
+    return _render.cache_info()
+
+
+def prewarm_spiderchart_cache(all_steps, fmt: str = "png") -> int:
+    # render every reachable final score vector of every scenario; returns how
+    # many charts were rendered (already-cached vectors are free)
+    from scenario_analysis import reachable_score_vectors
+
+    seen = set()
+    for steps in all_steps:
+        for vec in reachable_score_vectors(steps):
+            seen.add(tuple(int(v) for v in vec))
+    for vec in seen:
+        _render(vec, fmt)
+    return len(seen)
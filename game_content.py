@@ -0,0 +1,49 @@
+# game_content.py
+from scenario_catalog import ScenarioCatalog
+
+# ----------------------------
+# Static content: module-level, so it is built once per process rather than
+# on every Streamlit rerun of the app script
+# ----------------------------
+# Minimal CSS to improve look
+APP_CSS = """
+    <style>
+    /* App background and text */
+    .stApp {
+        background: #f7f9fb;
+        color: #0f1720;
+    }
+    /* Buttons */
+    .stButton>button {
+        background: linear-gradient(180deg,#0d6efd,#0a58ca);
+        color: white;
+        border-radius: 8px;
+        padding: 8px 12px;
+        font-weight: 600;
+        border: none;
+    }
+    .stButton>button:hover {
+        opacity: 0.95;
+    }
+    /* Sidebar header */
+    .css-1y0tads {  /* may vary across Streamlit versions; kept minimal */
+        font-weight:700;
+    }
+    /* Small card */
+    .card {
+        background: white;
+        padding: 1rem;
+        border-radius: 8px;
+        box-shadow: 0 2px 8px rgba(15,23,36,0.06);
+    }
+    </style>
+    """
+
+# ----------------------------
+# Story-driven scenarios (sequential lifecycle)
+# Loaded from the data files in scenarios/ (see scenario_catalog.py). The app
+# follows catalog.refresh() to pick up edited files; scripts can use the
+# `scenarios` snapshot taken at import.
+# ----------------------------
+catalog = ScenarioCatalog()
+scenarios = catalog.scenarios
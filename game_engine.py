@@ -0,0 +1,113 @@
+# game_engine.py
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# ----------------------------
+# Headless game rules
+# Pure Python state machine (start scenario -> choose options -> finish -> save)
+# with no Streamlit dependency: the UI drives it, and so can the load generator.
+# ----------------------------
+DIMENSIONS = ("time", "cost", "trust", "impact")
+
+
+def new_scores() -> dict:
+    return {d: 0 for d in DIMENSIONS}
+
+
+def rules_version(steps: list) -> str:
+    # short content hash of a scenario's option impacts: rows saved under
+    # different weights carry different versions and can be re-scored
+    impacts = [[[int(impacts[d]) for d in DIMENSIONS] for _label, impacts in step["options"]] for step in steps]
+    return hashlib.sha256(json.dumps(impacts).encode()).hexdigest()[:12]
+
+
+def encode_path(choices: list) -> bytes:
+    return bytes(choices)
+
+
+def decode_path(path: bytes) -> list:
+    return list(path)
+
+
+@dataclass
+class GameState:
+    scenario: str | None = None
+    step: int = 0
+    scores: dict = field(default_factory=new_scores)
+    choices: list = field(default_factory=list)   # option index picked at each step
+
+    @property
+    def total(self) -> int:
+        return sum(self.scores.values())
+
+
+class GameEngine:
+    def __init__(self, scenarios: dict):
+        self.scenarios = scenarios
+        self.rules = {name: rules_version(steps) for name, steps in scenarios.items()}
+
+    def start(self, scenario: str) -> GameState:
+        if scenario not in self.scenarios:
+            raise ValueError(f"unknown scenario: {scenario!r}")
+        return GameState(scenario=scenario)
+
+    def restore(self, scenario: str, choices: list) -> GameState:
+        # rebuild a state from its choice path; scores are replayed under the
+        # current rules, so a resumed game never carries stale weights
+        state = self.start(scenario)
+        for option_idx in choices:
+            self.choose(state, option_idx)
+        return state
+
+    def steps(self, state: GameState) -> list:
+        return self.scenarios[state.scenario]
+
+    def is_finished(self, state: GameState) -> bool:
+        return state.scenario is not None and state.step >= len(self.steps(state))
+
+    def current_step(self, state: GameState) -> dict:
+        if state.scenario is None or self.is_finished(state):
+            raise ValueError("no step to play")
+        return self.steps(state)[state.step]
+
+    def choose(self, state: GameState, option_idx: int) -> GameState:
+        # apply one option's impacts and advance (mutates and returns state)
+        options = self.current_step(state)["options"]
+        if not 0 <= option_idx < len(options):
+            raise ValueError(f"option {option_idx} out of range for step {state.step}")
+        _label, impacts = options[option_idx]
+        for d, k in impacts.items():
+            state.scores[d] += k
+        state.choices.append(option_idx)
+        state.step += 1
+        return state
+
+    def finish(self, state: GameState) -> dict:
+        # final scores of a completed run
+        if not self.is_finished(state):
+            raise ValueError("scenario is not finished")
+        return {**state.scores, "total": state.total}
+
+    def result_entry(self, state: GameState, name: str, timestamp: str | None = None) -> dict:
+        name = name.strip()
+        if not name:
+            raise ValueError("a name is required to save a score")
+        scores = self.finish(state)
+        return {
+            "Timestamp": timestamp or datetime.utcnow().isoformat(),
+            "Name": name,
+            "Scenario": state.scenario,
+            "Time": scores["time"],
+            "Cost": scores["cost"],
+            "Trust": scores["trust"],
+            "Impact": scores["impact"],
+            "Total": scores["total"],
+            # compact choice path: one byte per step, the option index picked
+            "Path": encode_path(state.choices),
+            "Rules": self.rules[state.scenario],
+        }
+
+    def save(self, state: GameState, name: str, store) -> int:
+        return store.append(self.result_entry(state, name))
@@ -0,0 +1,313 @@
+# leaderboard_columnar.py
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from perf import timed
+
+# ----------------------------
+# Columnar export/import and streaming analytics over leaderboard history
+# Exports stream the store in id order, one record batch at a time, into an
+# Arrow IPC file (uncompressed, memory-mappable) or a Parquet file, with the
+# schema of leaderboard_schema.arrow_schema() shared by partition archives.
+# Analytics never build a DataFrame of the whole table: HistoryAggregates
+# folds record batches into per-scenario sums, per-dimension histograms and a
+# per-day trend, reading only the columns it needs. Arrow files are
+# memory-mapped, so those columns are paged in straight from the file.
+# The app's Insights page reads compacted day partitions this way (see
+# leaderboard_partitions.py) and only the days not yet archived from SQLite;
+# exports and Insights both include pruned days, which only their archive holds;
+# StoreHistory then keeps those aggregates current by folding in just the rows
+# saved since, re-reading everything only when the store generation changes.
+#   python leaderboard_columnar.py export history.arrow | history.parquet
+#   python leaderboard_columnar.py import history.parquet
+#   python leaderboard_columnar.py insights [history.arrow]
+# ----------------------------
+EXPORT_BATCH_ROWS = 100_000
+CHANNELS = ("Time", "Cost", "Trust", "Impact", "Total")
+_US_PER_DAY = 86_400_000_000
+
+
+# ----------------------------
+# Export / import
+# ----------------------------
+@timed("columnar.export")
+def export_columnar(store, path: str, batch_rows: int = EXPORT_BATCH_ROWS) -> int:
+    # whole history -> .arrow/.feather (IPC file) or .parquet; returns rows written
+    from leaderboard_partitions import archive_rows, archive_scenarios, write_archive
+    from leaderboard_schema import rows_to_arrow
+
+    written = 0
+    with store.read_snapshot():
+        # one snapshot; the scenario dictionary covers every batch of the file,
+        # pruned days (whose rows only their archive holds) included
+        pruned = [archive for _, (archive, _, _, p) in sorted(store.archives("day").items()) if p]
+        names = store.scenarios()
+        for archive in pruned:
+            names += [s for s in archive_scenarios(archive) if s not in names]
+
+        def batches():
+            nonlocal written
+            for archive in pruned:
+                for rows in archive_rows(archive):
+                    written += len(rows)
+                    yield rows_to_arrow(rows, names)
+            for rows in store.iter_rows(batch_rows):
+                written += len(rows)
+                yield rows_to_arrow(rows, names)
+
+        write_archive(batches(), path)
+    return written
+
+
+def iter_batches(path: str, columns: list | None = None):
+    # record batches of a columnar file; Arrow IPC files are memory-mapped
+    import pyarrow as pa
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(columns=columns)
+        return
+    reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        yield batch if columns is None else batch.select(columns)
+
+
+@timed("columnar.import")
+def import_columnar(store, path: str, batch_rows: int = EXPORT_BATCH_ROWS) -> int:
+    # append the rows of an exported file that the store does not hold yet (one
+    # transaction per batch; see LeaderboardStore.append_missing), so re-importing
+    # a file adds nothing; workshop session ids are local to the source database
+    # and are not carried over. Returns the rows added.
+    imported = 0
+    columns = ["Timestamp", "Name", "Scenario", "Time", "Cost", "Trust", "Impact", "Total", "Path", "Rules"]
+    for batch in iter_batches(path, columns):
+        data = batch.to_pydict()
+        entries = [
+            {"Timestamp": ts.isoformat(), "Name": name, "Scenario": scenario, "Time": t, "Cost": c,
+             "Trust": tr, "Impact": i, "Total": total, "Path": p, "Rules": rules, "Event": None}
+            for ts, name, scenario, t, c, tr, i, total, p, rules in zip(*(data[c] for c in columns))
+            if ts is not None
+        ]
+        for start in range(0, len(entries), batch_rows):
+            imported += store.append_missing(entries[start:start + batch_rows])
+    return imported
+
+
+# ----------------------------
+# Streaming aggregations
+# ----------------------------
+class HistoryAggregates:
+    # fold record batches in; results are small frames (scenarios x values / days)
+    def __init__(self):
+        self.scenarios = []                 # global scenario order
+        self._code = {}                     # name -> index in self.scenarios
+        self.rows = 0
+        self._n = np.zeros(0, dtype=np.int64)
+        self._sums = np.zeros((0, len(CHANNELS)), dtype=np.int64)
+        self._hist = {c: {} for c in CHANNELS}   # channel -> {(scenario code, value): count}
+        self._trend = {}                    # (scenario code, day number) -> [runs, total sum]
+
+    def copy(self) -> "HistoryAggregates":
+        # independent of later add_batch() calls; O(scenarios x values + days)
+        other = HistoryAggregates()
+        other.scenarios = list(self.scenarios)
+        other._code = dict(self._code)
+        other.rows = self.rows
+        other._n = self._n.copy()
+        other._sums = self._sums.copy()
+        other._hist = {c: dict(h) for c, h in self._hist.items()}
+        other._trend = {cell: list(acc) for cell, acc in self._trend.items()}
+        return other
+
+    def _codes(self, column) -> np.ndarray:
+        # batch's dictionary-encoded Scenario -> global codes
+        dictionary = column.dictionary.to_pylist()
+        for name in dictionary:
+            if name not in self._code:
+                self._code[name] = len(self.scenarios)
+                self.scenarios.append(name)
+        remap = np.array([self._code[name] for name in dictionary], dtype=np.int64)
+        return remap[column.indices.to_numpy(zero_copy_only=False)]
+
+    def add_batch(self, batch):
+        import pyarrow as pa
+
+        if batch.num_rows == 0:
+            return
+        codes = self._codes(batch.column("Scenario"))
+        k = len(self.scenarios)
+        if len(self._n) < k:
+            self._n = np.pad(self._n, (0, k - len(self._n)))
+            self._sums = np.pad(self._sums, ((0, k - len(self._sums)), (0, 0)))
+        self._n += np.bincount(codes, minlength=k)
+        for j, channel in enumerate(CHANNELS):
+            values = batch.column(channel).to_numpy(zero_copy_only=False).astype(np.int64)
+            self._sums[:, j] += np.bincount(codes, weights=values, minlength=k).astype(np.int64)
+            keys, counts = np.unique((codes << 32) | (values + (1 << 31)), return_counts=True)
+            hist = self._hist[channel]
+            for key, n in zip(keys.tolist(), counts.tolist()):
+                cell = (key >> 32, (key & 0xFFFFFFFF) - (1 << 31))
+                hist[cell] = hist.get(cell, 0) + n
+        days = batch.column("Timestamp").cast(pa.int64()).to_numpy(zero_copy_only=False) // _US_PER_DAY
+        totals = batch.column("Total").to_numpy(zero_copy_only=False).astype(np.int64)
+        keys, inverse = np.unique((codes << 32) | (days + (1 << 31)), return_inverse=True)
+        runs = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=totals)
+        for key, n, s in zip(keys.tolist(), runs.tolist(), sums.tolist()):
+            cell = (key >> 32, (key & 0xFFFFFFFF) - (1 << 31))
+            acc = self._trend.setdefault(cell, [0, 0])
+            acc[0] += n
+            acc[1] += int(s)
+        self.rows += batch.num_rows
+
+    def means(self):
+        # per scenario: runs and mean of every dimension and of the total
+        import pandas as pd
+
+        n = np.maximum(self._n, 1)[:, None]
+        df = pd.DataFrame(np.round(self._sums / n, 2), columns=[f"Mean {c}" for c in CHANNELS])
+        df.insert(0, "Runs", self._n)
+        df.insert(0, "Scenario", self.scenarios)
+        return df
+
+    def histogram(self, channel: str, scenario: str | None = None):
+        # value -> runs for one dimension (all scenarios when scenario is None)
+        import pandas as pd
+
+        code = None if scenario is None else self._code.get(scenario, -1)
+        counts = {}
+        for (c, value), n in self._hist[channel].items():
+            if code is None or c == code:
+                counts[value] = counts.get(value, 0) + n
+        return pd.Series(counts, name="Runs", dtype=np.int64).sort_index().rename_axis(channel)
+
+    def trend(self):
+        # day x scenario mean total, plus a long frame with run counts
+        import pandas as pd
+
+        if not self._trend:
+            return pd.DataFrame(columns=["Day", "Scenario", "Runs", "Mean Total"])
+        rows = [
+            (np.datetime64(day, "D"), self.scenarios[code], n, round(s / n, 2))
+            for (code, day), (n, s) in sorted(self._trend.items(), key=lambda kv: (kv[0][1], kv[0][0]))
+        ]
+        return pd.DataFrame(rows, columns=["Day", "Scenario", "Runs", "Mean Total"])
+
+
+def aggregate_file(path: str) -> HistoryAggregates:
+    agg = HistoryAggregates()
+    for batch in iter_batches(path, ["Timestamp", "Scenario", *CHANNELS]):
+        agg.add_batch(batch)
+    return agg
+
+
+@timed("columnar.aggregate_store")
+def aggregate_store(store, batch_rows: int = EXPORT_BATCH_ROWS) -> tuple:
+    # (HistoryAggregates, sources): up-to-date day archives are memory-mapped,
+    # the remaining days stream from SQLite; sources["last_id"] is the newest
+    # row the aggregates include
+    from leaderboard_schema import rows_to_arrow
+
+    agg = HistoryAggregates()
+    sources = {"archived_days": 0, "archived_rows": 0, "store_rows": 0, "last_id": 0}
+    with store.read_snapshot():
+        generation = store.state()[1]
+        live = dict(store.partitions("day"))
+        archived = store.archives("day")
+        # a pruned archive is always read (SQLite no longer has its rows); a
+        # copy only while it matches its live day
+        fresh = {
+            day: path for day, (path, rows, gen, pruned) in archived.items()
+            if pruned or (gen == generation and live.get(day) == rows and os.path.exists(path))
+        }
+        copies = {day for day in fresh if not archived[day][3]}
+        for day, path in sorted(fresh.items()):
+            for batch in iter_batches(path, ["Timestamp", "Scenario", *CHANNELS]):
+                agg.add_batch(batch)
+                sources["archived_rows"] += batch.num_rows
+            sources["archived_days"] += 1
+        sources["last_id"] = store.last_id()
+        names = store.scenarios()
+        for rows in store.iter_rows(batch_rows, days=set(live) - copies if copies else None):
+            agg.add_batch(rows_to_arrow(rows, names))
+            sources["store_rows"] += len(rows)
+    return agg, sources
+
+
+class StoreHistory:
+    # the store's aggregates, shared by every Insights view: a save only folds in
+    # the rows with id > last_id; a new generation (clear, rescore) rebuilds.
+    # Readers get a published copy, so a fold never changes what they draw.
+    def __init__(self, store, batch_rows: int = EXPORT_BATCH_ROWS):
+        self.store = store
+        self.batch_rows = batch_rows
+        self._lock = threading.Lock()
+        self._agg = None
+        self._sources = None
+        self._state = None
+        self._published = None
+
+    def current(self) -> tuple:
+        # (HistoryAggregates, sources, seconds spent bringing them up to date)
+        from leaderboard_schema import rows_to_arrow
+
+        with self._lock:
+            started = time.perf_counter()
+            state = self.store.state()
+            if self._agg is None or state[1] != self._state[1]:
+                self._agg, self._sources = aggregate_store(self.store, self.batch_rows)
+            elif state != self._state:
+                with self.store.read_snapshot():
+                    names = self.store.scenarios()
+                    for rows in self.store.iter_rows(self.batch_rows, after_id=self._sources["last_id"]):
+                        self._agg.add_batch(rows_to_arrow(rows, names))
+                        self._sources["store_rows"] += len(rows)
+                        self._sources["last_id"] = rows[-1][0]
+            else:
+                return self._published
+            self._state = state
+            self._published = (self._agg.copy(), dict(self._sources), time.perf_counter() - started)
+            return self._published
+
+
+def main(argv=None):
+    from leaderboard_store import LEADERBOARD_DB, LeaderboardStore
+
+    parser = argparse.ArgumentParser(description="Columnar export/import and analytics of the leaderboard")
+    parser.add_argument("--db", default=LEADERBOARD_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("export", help="write the whole leaderboard to .arrow/.feather or .parquet")
+    p.add_argument("path")
+    p = sub.add_parser("import", help="append the rows of an exported file")
+    p.add_argument("path")
+    p = sub.add_parser("insights", help="per-scenario means and trend (of a file, or of the store)")
+    p.add_argument("path", nargs="?")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.command == "insights" and args.path:
+        agg, sources = aggregate_file(args.path), {"file": args.path}
+    else:
+        store = LeaderboardStore(args.db, legacy_csv=None)
+        if args.command == "export":
+            n = export_columnar(store, args.path)
+            print(f"exported {n} rows to {args.path} in {time.perf_counter() - t0:.2f} s")
+            return
+        if args.command == "import":
+            n = import_columnar(store, args.path)
+            print(f"imported {n} rows from {args.path} in {time.perf_counter() - t0:.2f} s")
+            return
+        agg, sources = aggregate_store(store)
+    print(f"{agg.rows} rows aggregated in {time.perf_counter() - t0:.2f} s ({sources})")
+    print(agg.means().to_string(index=False))
+    print(agg.trend().tail(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# leaderboard_feed.py
+import threading
+import time
+
+# ----------------------------
+# In-process change feed for live leaderboard views
+# The store notifies the feed after every commit made by this process, so the
+# feed version is a plain integer every viewer can compare for free. Writes
+# from other processes sharing the DB file are picked up by polling the store's
+# (version, generation) at most once per poll_interval for the whole process,
+# however many viewers are open. Both paths record the store version they saw,
+# so one commit moves the feed once, whichever path notices it first.
+# ----------------------------
+LIVE_POLL_INTERVAL = 1.0
+
+
+class ChangeFeed:
+    def __init__(self, store, poll_interval: float = LIVE_POLL_INTERVAL):
+        self.store = store
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._version = 0
+        self._store_state = store.state()
+        self._polled = time.monotonic()
+        store.subscribe(self.publish)
+
+    def publish(self):
+        # store listener: a commit made by this process
+        self._advance(self.store.state())
+
+    def _advance(self, state: tuple):
+        with self._cond:
+            if state[0] <= self._store_state[0]:
+                return      # this commit was already published (store versions only grow)
+            self._store_state = state
+            self._version += 1
+            self._cond.notify_all()
+
+    def _poll(self):
+        now = time.monotonic()
+        if now - self._polled < self.poll_interval:
+            return
+        with self._cond:
+            if now - self._polled < self.poll_interval:
+                return
+            self._polled = now
+        # commits from other processes; ours were published by the listener
+        self._advance(self.store.state())
+
+    def version(self) -> int:
+        # cheap: an int read, plus one SQLite round trip per poll_interval process-wide
+        self._poll()
+        return self._version
+
+    def wait(self, since: int, timeout: float | None = None) -> int:
+        # block until the version moves past `since` (or timeout); returns the version
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._version != since:
+                    return self._version
+                remaining = self.poll_interval
+                if deadline is not None:
+                    remaining = min(remaining, deadline - time.monotonic())
+                    if remaining <= 0:
+                        return self._version
+                self._cond.wait(remaining)
+            self._poll()
@@ -0,0 +1,211 @@
+# leaderboard_index.py
+from array import array
+from bisect import bisect_left, insort
+
+# ----------------------------
+# Incremental ranking index for the leaderboard
+# Totals are small integers, so each scenario keeps a Fenwick (binary indexed)
+# tree of row counts per total plus the row positions in each total bucket.
+# Inserts, "what is my rank" and locating the first row of any page are all
+# O(log range); a page then only walks the rows it returns. Bucket positions
+# are int32 arrays, 4 bytes per row and scenario index, not boxed ints in lists.
+# Ties keep insertion order (row id order). Timestamp order is not kept here:
+# imported history gets new ids, so SQLite sorts by timestamp instead.
+# copy() is O(distinct totals): the copy shares the append-only row lists and
+# reads each only up to its own counts, so a published index never changes
+# under its readers while a refresh extends a copy of it.
+# ----------------------------
+
+
+class ScoreRankIndex:
+    def __init__(self):
+        self.lo = 0
+        self.size = 0
+        self._tree = [0]               # 1-based Fenwick tree over totals lo .. lo+size-1
+        self.buckets = {}              # total -> array('i') of row positions, insertion order (shared, append-only)
+        self.counts = {}               # total -> rows of that bucket visible to this index
+        self.totals = []               # sorted distinct totals present
+        self.n = 0
+
+    def copy(self) -> "ScoreRankIndex":
+        # only the latest copy may be extended: older ones keep reading their prefix
+        other = ScoreRankIndex.__new__(ScoreRankIndex)
+        other.lo, other.size, other.n = self.lo, self.size, self.n
+        other._tree = list(self._tree)
+        other.buckets = dict(self.buckets)
+        other.counts = dict(self.counts)
+        other.totals = list(self.totals)
+        return other
+
+    # ----------------------------
+    # Fenwick primitives
+    # ----------------------------
+    def _fenwick_add(self, i: int, delta: int):
+        i += 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i: int) -> int:
+        # number of rows with total <= lo + i
+        i = min(i + 1, self.size)
+        s = 0
+        while i > 0:
+            s += self._tree[i]
+            i -= i & -i
+        return s
+
+    def _kth(self, k: int) -> int:
+        # smallest bucket index whose prefix count reaches k (1-based k)
+        pos, step = 0, 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+    def _rebuild(self, lo: int, hi: int):
+        # grow the covered range (with slack, so growth is amortized) and rebuild in O(range)
+        span = hi - lo + 1
+        pad = max(8, span // 2)
+        self.lo, self.size = lo - pad, span + 2 * pad
+        tree = [0] * (self.size + 1)
+        for total, count in self.counts.items():
+            tree[total - self.lo + 1] += count
+        for i in range(1, self.size + 1):
+            j = i + (i & -i)
+            if j <= self.size:
+                tree[j] += tree[i]
+        self._tree = tree
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def add(self, total: int, position: int):
+        total = int(total)
+        if self.size == 0 or not self.lo <= total < self.lo + self.size:
+            lo = min(total, self.lo if self.size else total)
+            hi = max(total, self.lo + self.size - 1 if self.size else total)
+            self._rebuild(lo, hi)
+        rows = self.buckets.get(total)
+        if rows is None:
+            rows = self.buckets[total] = array("i")
+            insort(self.totals, total)
+        rows.append(position)
+        self.counts[total] = self.counts.get(total, 0) + 1
+        self.n += 1
+        self._fenwick_add(total - self.lo, 1)
+
+    def add_many(self, totals, positions):
+        # bulk load (initial refresh): bucket with one stable sort, rebuild the tree once
+        import numpy as np
+
+        totals = np.asarray(totals, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.int32)
+        if not len(totals):
+            return
+        uniq, inverse = np.unique(totals, return_inverse=True)
+        grouped = positions[np.argsort(inverse, kind="stable")]
+        bounds = np.cumsum(np.bincount(inverse))
+        start = 0
+        for total, end in zip(uniq.tolist(), bounds.tolist()):
+            rows = self.buckets.get(total)
+            if rows is None:
+                rows = self.buckets[total] = array("i")
+                insort(self.totals, total)
+            rows.frombytes(grouped[start:end].tobytes())
+            self.counts[total] = self.counts.get(total, 0) + end - start
+            start = end
+        self.n += len(totals)
+        lo = min(self.totals[0], self.lo) if self.size else self.totals[0]
+        hi = max(self.totals[-1], self.lo + self.size - 1) if self.size else self.totals[-1]
+        self._rebuild(lo, hi)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def count_above(self, total: int) -> int:
+        if self.n == 0 or total >= self.lo + self.size - 1:
+            return 0
+        if total < self.lo:
+            return self.n
+        return self.n - self._prefix(total - self.lo)
+
+    def rank(self, total: int) -> int:
+        # competition rank ("1224") a row with this total has or would have
+        return self.count_above(int(total)) + 1
+
+    def page_positions(self, page: int, page_size: int, ascending: bool = False) -> list:
+        start = page * page_size
+        if start >= self.n or page_size <= 0:
+            return []
+        if ascending:
+            # bucket holding the (start+1)-th smallest row
+            b = self._kth(start + 1)
+            total = self.lo + b
+            skip = start - (self._prefix(b - 1) if b > 0 else 0)
+            order = range(bisect_left(self.totals, total), len(self.totals))
+        else:
+            # bucket holding the (start+1)-th largest row; ties still in insertion order
+            b = self._kth(self.n - start)
+            total = self.lo + b
+            skip = start - (self.n - self._prefix(b))
+            order = range(bisect_left(self.totals, total), -1, -1)
+        out = []
+        for t_idx in order:
+            total = self.totals[t_idx]
+            rows = self.buckets[total]
+            take = rows[skip:min(skip + page_size - len(out), self.counts[total])]
+            out.extend(take)
+            skip = 0
+            if len(out) >= page_size:
+                break
+        return out
+
+    def top_positions(self, n: int) -> list:
+        return self.page_positions(0, n, ascending=False)
+
+
+class LeaderboardIndex:
+    # one ScoreRankIndex per scenario plus one across all scenarios
+    def __init__(self):
+        self.all = ScoreRankIndex()
+        self.by_scenario = {}
+
+    def add(self, scenario: str, total: int, position: int):
+        idx = self.by_scenario.get(scenario)
+        if idx is None:
+            idx = self.by_scenario[scenario] = ScoreRankIndex()
+        idx.add(total, position)
+        self.all.add(total, position)
+
+    def add_many(self, scenarios, totals, start: int):
+        # rows start, start+1, ... in order; scenarios/totals are aligned sequences
+        import numpy as np
+
+        totals = np.asarray(totals, dtype=np.int64)
+        positions = np.arange(start, start + len(totals), dtype=np.int64)
+        self.all.add_many(totals, positions)
+        names, codes = np.unique(np.asarray(scenarios, dtype=object), return_inverse=True)
+        for code, scenario in enumerate(names.tolist()):
+            mask = codes == code
+            idx = self.by_scenario.get(scenario)
+            if idx is None:
+                idx = self.by_scenario[scenario] = ScoreRankIndex()
+            idx.add_many(totals[mask], positions[mask])
+
+    def copy(self) -> "LeaderboardIndex":
+        other = LeaderboardIndex()
+        other.all = self.all.copy()
+        other.by_scenario = {name: idx.copy() for name, idx in self.by_scenario.items()}
+        return other
+
+    def get(self, scenario: str | None = None) -> ScoreRankIndex:
+        if scenario is None:
+            return self.all
+        return self.by_scenario.get(scenario) or ScoreRankIndex()
+
+    def scenarios(self) -> list:
+        return sorted(self.by_scenario)
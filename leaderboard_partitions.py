@@ -0,0 +1,294 @@
+# leaderboard_partitions.py
+import argparse
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+from perf import timed
+
+# ----------------------------
+# Time-partitioned leaderboard views and archives
+# Every saved row belongs to a day partition (UTC date of its timestamp) and,
+# while a facilitator has a workshop session open, to that session's event
+# partition. The store keeps a per-partition histogram of totals in the save
+# transaction (partition_totals), so a partition's ranking summary, row counts
+# and "what rank is this total" never touch the rows; its pages are indexed
+# range reads of that partition only.
+# Closed day partitions can be compacted into columnar files (Arrow IPC,
+# memory-mapped on read, or Parquet) for historical analytics:
+#   python leaderboard_partitions.py compact [--keep-days 7] [--format arrow|parquet] [--prune]
+#   python leaderboard_partitions.py summary [--day YYYY-MM-DD | --event ID]
+#   python leaderboard_partitions.py start-event LABEL | end-event
+# By default archives are copies: SQLite stays the system of record (re-scoring
+# and the all-time view read it); a partition changed after compaction (late
+# rows, re-scoring, clear) is rewritten or dropped on the next compact.
+# With --prune the archived days leave SQLite in the transaction that records
+# the file, which is from then on their only copy: they drop out of the
+# all-time view, re-scoring and day/event windows, while exports and Insights
+# read them from the archive. Late rows of a pruned day are merged into a new
+# file on the next compact; clear() turns pruned archives back into stale copies.
+# ----------------------------
+ARCHIVE_DIR = os.environ.get("SERIOUSGAME_ARCHIVE_DIR", "leaderboard_archive")
+COMPACT_AFTER_DAYS = int(os.environ.get("SERIOUSGAME_COMPACT_AFTER_DAYS", "7"))
+ARCHIVE_FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+def today() -> str:
+    # partitions follow the stored timestamps, which are UTC
+    return datetime.utcnow().date().isoformat()
+
+
+# ----------------------------
+# Ranking summaries from a partition's totals histogram
+# ----------------------------
+def merge_histograms(hists) -> list:
+    counts = {}
+    for hist in hists:
+        for total, n in hist:
+            counts[total] = counts.get(total, 0) + n
+    return sorted(counts.items())
+
+
+def summarize(hist: list) -> dict:
+    # hist: [(total, count)] ascending -> runs, best, worst, mean, median
+    n = sum(c for _, c in hist)
+    if not n:
+        return {"Runs": 0, "Best": None, "Worst": None, "Mean": None, "Median": None}
+    half, seen, median = (n + 1) / 2, 0, None
+    for total, c in hist:
+        seen += c
+        if median is None and seen >= half:
+            median = total
+    return {
+        "Runs": n,
+        "Best": hist[-1][0],
+        "Worst": hist[0][0],
+        "Mean": round(sum(t * c for t, c in hist) / n, 2),
+        "Median": median,
+    }
+
+
+def ranking_summary(totals: dict) -> list:
+    # one row per scenario plus "All", from store.partition_totals()
+    rows = [{"Scenario": s, **summarize(hist)} for s, hist in totals.items()]
+    if len(rows) > 1:
+        rows.append({"Scenario": "All", **summarize(merge_histograms(totals.values()))})
+    return rows
+
+
+# ----------------------------
+# One partition as a leaderboard
+# Same read interface as SharedLeaderboard (count/scenarios/rank/top/page), so
+# the live leaderboard fragment renders either. Results are cached per feed
+# version and shared by every viewer of the partition.
+# ----------------------------
+class PartitionView:
+    def __init__(self, store, kind: str, key, feed=None):
+        self.store = store
+        self.kind = kind
+        self.key = str(key)
+        self.feed = feed
+        self._lock = threading.Lock()
+        self._version = None
+        self._totals = {}           # scenario -> [(total, count)] ascending
+        self._results = {}
+
+    def refresh(self):
+        version = self.feed.version() if self.feed is not None else self.store.state()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            self._totals = self.store.partition_totals(self.kind, self.key)
+            self._results = {}
+            self._version = version
+
+    def _cached(self, key: tuple, build):
+        results = self._results
+        value = results.get(key)
+        if value is None:
+            if len(results) >= 256:
+                results.clear()
+            value = results[key] = build()
+        return value
+
+    def _histogram(self, scenario: str | None) -> list:
+        if scenario is not None:
+            return self._totals.get(scenario, [])
+        return self._cached(("hist",), lambda: merge_histograms(self._totals.values()))
+
+    def count(self, scenario: str | None = None) -> int:
+        self.refresh()
+        return sum(c for _, c in self._histogram(scenario))
+
+    def scenarios(self) -> list:
+        self.refresh()
+        return sorted(self._totals)
+
+    def rank(self, total: int, scenario: str | None = None) -> int:
+        # competition rank within the partition, like LeaderboardIndex.rank
+        self.refresh()
+        return 1 + sum(c for t, c in self._histogram(scenario) if t > total)
+
+    def summary(self) -> list:
+        self.refresh()
+        return self._cached(("summary",), lambda: ranking_summary(self._totals))
+
+    def top(self, scenario: str | None = None, n: int = 5):
+        return self.page(scenario, "Total", False, 0, n)
+
+    @timed("partition.page")
+    def page(self, scenario: str | None = None, sort_by: str = "Total", ascending: bool = False,
+             page: int = 0, page_size: int = 50):
+        self.refresh()
+        return self._cached(
+            ("page", scenario, sort_by, ascending, page, page_size),
+            lambda: self.store.to_dataframe(scenario, sort_by=sort_by, ascending=ascending, limit=page_size,
+                                            offset=page * page_size, partition=(self.kind, self.key)),
+        )
+
+
+# ----------------------------
+# Columnar archives of closed day partitions
+# ----------------------------
+def write_archive(batches, path: str):
+    # iterable of record batches (leaderboard_schema.rows_to_arrow) -> one Arrow
+    # or Parquet file, written atomically; batches are streamed, not collected
+    import pyarrow as pa
+    from leaderboard_schema import arrow_schema
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        with pq.ParquetWriter(tmp, arrow_schema(), compression="zstd") as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    else:
+        # uncompressed IPC file: readers memory-map it and get zero-copy columns
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, arrow_schema()) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    os.replace(tmp, path)
+
+
+def read_archive(path: str):
+    # pyarrow.Table; Arrow files are memory-mapped, so only touched columns are paged in
+    import pyarrow as pa
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def archive_rows(path: str):
+    # the rows of an archive, one list per record batch, in store row order
+    # (leaderboard_schema.FILE_COLUMNS), ready for rows_to_arrow
+    for batch in read_archive(path).to_batches():
+        yield list(zip(*(column.to_pylist() for column in batch.columns)))
+
+
+def archive_scenarios(path: str) -> list:
+    import pyarrow as pa
+
+    return read_archive(path).column("Scenario").cast(pa.string()).unique().to_pylist()
+
+
+@timed("partitions.compact")
+def compact(store, directory: str = ARCHIVE_DIR, keep_days: int = COMPACT_AFTER_DAYS,
+            fmt: str = "arrow", now: str | None = None, prune: bool = False) -> list:
+    # archive every day partition older than keep_days that has no up-to-date
+    # file, and with prune delete the archived rows from SQLite;
+    # returns [{"day", "rows", "path", "action"}]
+    from leaderboard_schema import rows_to_arrow
+
+    cutoff = (date.fromisoformat(now or today()) - timedelta(days=keep_days)).isoformat()
+    names = store.scenarios()
+    archived = store.archives("day")
+    live = dict(store.partitions("day"))
+    report = []
+    os.makedirs(directory, exist_ok=True)
+    for key, n in live.items():
+        if key >= cutoff:
+            continue    # ISO dates sort as strings; recent days stay hot
+        old = archived.get(key)
+        merge = old is not None and old[3]      # late rows of a pruned day
+        with store.read_snapshot():
+            generation = store.state()[1]
+            if not merge and old is not None and old[1:3] == (n, generation) and os.path.exists(old[0]):
+                rows, path = None, old[0]
+            else:
+                rows = store.fetch_partition("day", key)
+        if rows is None and not prune:
+            continue
+        if rows is not None:
+            # named by generation: a merge never overwrites the file it reads
+            path = os.path.abspath(os.path.join(directory, f"day={key}.{generation}{ARCHIVE_FORMATS[fmt]}"))
+            kept = [r for batch in archive_rows(old[0]) for r in batch] if merge else []
+            write_archive([rows_to_arrow(kept + rows, names)], path)
+            action = "merged" if merge else "written" if old is None else "rewritten"
+            live_rows, total = len(rows), len(kept) + len(rows)
+        else:
+            action, live_rows, total = "kept", n, n
+        if prune or merge:
+            if not store.prune_partition("day", key, path, total, live_rows, generation):
+                # saved to or re-scored meanwhile: the next compact starts over
+                if rows is not None:
+                    os.remove(path)
+                continue
+            action += ", pruned"
+        else:
+            store.record_archive("day", key, path, total, generation)
+        if old is not None and old[0] != path and os.path.exists(old[0]):
+            os.remove(old[0])
+        report.append({"day": key, "rows": total, "path": path, "action": action})
+    for key, (path, _, _, pruned) in archived.items():
+        if key not in live and not pruned:
+            # the partition was cleared since it was archived
+            if os.path.exists(path):
+                os.remove(path)
+            store.record_archive("day", key, None)
+            report.append({"day": key, "rows": 0, "path": path, "action": "dropped"})
+    return report
+
+
+def main(argv=None):
+    from leaderboard_store import LEADERBOARD_DB, LeaderboardStore
+
+    parser = argparse.ArgumentParser(description="Leaderboard partitions: summaries, workshop sessions, archives")
+    parser.add_argument("--db", default=LEADERBOARD_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("compact", help="archive closed day partitions to columnar files")
+    p.add_argument("--dir", default=ARCHIVE_DIR)
+    p.add_argument("--keep-days", type=int, default=COMPACT_AFTER_DAYS)
+    p.add_argument("--format", choices=sorted(ARCHIVE_FORMATS), default="arrow")
+    p.add_argument("--prune", action="store_true", help="delete the archived rows from SQLite")
+    p = sub.add_parser("summary", help="ranking summary of one partition (default: today)")
+    p.add_argument("--day")
+    p.add_argument("--event", type=int)
+    p = sub.add_parser("start-event", help="open a workshop session; later saves belong to it")
+    p.add_argument("label")
+    sub.add_parser("end-event", help="close the open workshop session")
+    args = parser.parse_args(argv)
+
+    store = LeaderboardStore(args.db, legacy_csv=None)
+    if args.command == "compact":
+        for r in compact(store, args.dir, args.keep_days, args.format, prune=args.prune):
+            print(f"{r['day']}: {r['action']} {r['path']} ({r['rows']} rows)")
+    elif args.command == "summary":
+        kind, key = ("event", args.event) if args.event is not None else ("day", args.day or today())
+        print(f"== {kind} {key}")
+        for row in ranking_summary(store.partition_totals(kind, key)):
+            print("   " + ", ".join(f"{k}: {v}" for k, v in row.items()))
+    elif args.command == "start-event":
+        print(f"workshop session {store.start_event(args.label)} started: {args.label}")
+    else:
+        store.end_event()
+        print("workshop session closed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# leaderboard_schema.py
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+
+from leaderboard_store import LEADERBOARD_COLUMNS
+
+logger = logging.getLogger("seriousgame.schema")
+
+# ----------------------------
+# Compact, typed leaderboard frames
+#   Timestamp  datetime64
+#   Name       interned strings (repeat players share one object); pandas'
+#              Arrow-backed string dtype stores them contiguously where available
+#   Scenario   category (dictionary-encoded, shared categories per process)
+#   Time..Impact int8, Total int16 (widened only if a value does not fit)
+# Every frame the app builds (store reads, shared snapshot, pages, legacy CSV)
+# goes through to_compact_frame so dtypes stay identical and concat keeps them.
+# ----------------------------
+SCORE_COLUMNS = ["Time", "Cost", "Trust", "Impact"]
+SCORE_DTYPE = np.int8
+TOTAL_DTYPE = np.int16
+
+
+def _small_int(values, dtype) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.int64)
+    info = np.iinfo(dtype)
+    if arr.size and (arr.min() < info.min or arr.max() > info.max):
+        # a future scenario with bigger swings: widen rather than wrap around
+        return arr.astype(np.int32)
+    return arr.astype(dtype)
+
+
+def _timestamps(values) -> pd.Series:
+    return pd.to_datetime(pd.Series(values, dtype=object), format="ISO8601", errors="coerce")
+
+
+def scenario_dtype(categories) -> pd.CategoricalDtype:
+    return pd.CategoricalDtype(categories=list(categories), ordered=False)
+
+
+def to_compact_frame(rows, scenario_categories=None) -> pd.DataFrame:
+    # rows: sequence of tuples in LEADERBOARD_COLUMNS order (or a DataFrame with those columns)
+    if isinstance(rows, pd.DataFrame):
+        cols = {c: rows[c].to_numpy() for c in LEADERBOARD_COLUMNS}
+    else:
+        rows = list(rows)
+        cols = {c: [r[i] for r in rows] for i, c in enumerate(LEADERBOARD_COLUMNS)}
+    scenarios = pd.Series(cols["Scenario"], dtype=object)
+    categories = list(scenario_categories) if scenario_categories is not None else []
+    seen = set(categories)
+    categories += [s for s in pd.unique(scenarios) if s not in seen]
+    names = np.fromiter((sys.intern(str(n)) for n in cols["Name"]), dtype=object, count=len(scenarios))
+    data = {
+        "Timestamp": _timestamps(cols["Timestamp"]).to_numpy(),
+        "Name": names,
+        "Scenario": pd.Categorical(scenarios, dtype=scenario_dtype(categories)),
+    }
+    for c in SCORE_COLUMNS:
+        data[c] = _small_int(cols[c], SCORE_DTYPE)
+    data["Total"] = _small_int(cols["Total"], TOTAL_DTYPE)
+    return pd.DataFrame(data, columns=LEADERBOARD_COLUMNS)
+
+
+def empty_frame(scenario_categories=()) -> pd.DataFrame:
+    return to_compact_frame([], scenario_categories)
+
+
+def read_legacy_csv(path: str) -> pd.DataFrame:
+    # old leaderboard.csv (ISO-string timestamps, object columns) -> compact frame;
+    # rows with missing or non-numeric scores are dropped, and an unreadable or
+    # foreign file yields no rows: a bad legacy file must not stop the app
+    try:
+        raw = pd.read_csv(path, dtype=object)
+    except (OSError, UnicodeDecodeError, ValueError) as exc:   # EmptyDataError/ParserError are ValueErrors
+        logger.warning("legacy leaderboard %s is unreadable, importing nothing: %s", path, exc)
+        return empty_frame()
+    missing = [c for c in LEADERBOARD_COLUMNS if c not in raw.columns]
+    if missing:
+        logger.warning("legacy leaderboard %s lacks columns %s, importing nothing", path, missing)
+        return empty_frame()
+    for c in SCORE_COLUMNS + ["Total"]:
+        raw[c] = pd.to_numeric(raw[c], errors="coerce")
+    raw = raw.dropna(subset=SCORE_COLUMNS + ["Total", "Timestamp", "Name", "Scenario"])
+    raw = raw[_timestamps(raw["Timestamp"]).notna().to_numpy()]
+    return to_compact_frame(raw[LEADERBOARD_COLUMNS].reset_index(drop=True))
+
+
+# ----------------------------
+# Columnar files (partition archives, exports)
+# One Arrow schema for every file written, so archives and exports can be
+# read and aggregated together:
+#   id int64, Timestamp timestamp[us], Name string,
+#   Scenario dictionary<int16, string> (the store's scenario names),
+#   Time..Impact int16, Total int32 (room for long scenarios; files are
+#   compressed or memory-mapped, so width barely matters there),
+#   Path binary, Rules string, Day string, Event int32
+# ----------------------------
+FILE_COLUMNS = ["id"] + LEADERBOARD_COLUMNS + ["Path", "Rules", "Day", "Event"]
+
+
+def arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("Timestamp", pa.timestamp("us")),
+        ("Name", pa.string()),
+        ("Scenario", pa.dictionary(pa.int16(), pa.string())),
+        *[(c, pa.int16()) for c in SCORE_COLUMNS],
+        ("Total", pa.int32()),
+        ("Path", pa.binary()),
+        ("Rules", pa.string()),
+        ("Day", pa.string()),
+        ("Event", pa.int32()),
+    ])
+
+
+def rows_to_arrow(rows: list, scenario_names: list):
+    # store rows in FILE_COLUMNS order -> pyarrow.RecordBatch; scenario_names fixes
+    # the dictionary so every batch of one file shares it (new names are appended)
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    cols = list(zip(*rows)) if rows else [()] * len(FILE_COLUMNS)
+    names = list(scenario_names)
+    lookup = {s: i for i, s in enumerate(names)}
+    for s in cols[3]:
+        if s not in lookup:
+            lookup[s] = len(names)
+            names.append(s)
+    scenario = pa.DictionaryArray.from_arrays(
+        pa.array([lookup[s] for s in cols[3]], pa.int16()), pa.array(names, pa.string())
+    )
+    timestamps = _timestamps(cols[1]).to_numpy().astype("datetime64[us]")
+    arrays = [
+        pa.array(cols[0], pa.int64()),
+        pa.array(timestamps, pa.timestamp("us"), from_pandas=True),
+        pa.array(cols[2], pa.string()),
+        scenario,
+        *[pa.array(cols[4 + i], pa.int16()) for i in range(len(SCORE_COLUMNS))],
+        pa.array(cols[8], pa.int32()),
+        pa.array([None if p is None else bytes(p) for p in cols[9]], pa.binary()),
+        pa.array(cols[10], pa.string()),
+        pa.array(cols[11], pa.string()),
+        pa.array(cols[12], pa.int32()),
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
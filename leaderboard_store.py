@@ -0,0 +1,779 @@
+# leaderboard_store.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from leaderboard_index import LeaderboardIndex
+from perf import timed
+
+# ----------------------------
+# Leaderboard storage backend
+# SQLite in WAL mode: one INSERT per save, readers never block the writer,
+# and (scenario, total) is indexed so ranking queries don't scan the table.
+# ----------------------------
+LEADERBOARD_DB = "leaderboard.db"
+LEGACY_LEADERBOARD_CSV = "leaderboard.csv"
+
+LEADERBOARD_COLUMNS = ["Timestamp", "Name", "Scenario", "Time", "Cost", "Trust", "Impact", "Total"]
+
+# display column -> SQL column
+_SQL_COLUMNS = {
+    "Timestamp": "timestamp",
+    "Name": "name",
+    "Scenario": "scenario",
+    "Time": "time",
+    "Cost": "cost",
+    "Trust": "trust",
+    "Impact": "impact",
+    "Total": "total",
+}
+_SELECT_COLUMNS = ", ".join(_SQL_COLUMNS[c] for c in LEADERBOARD_COLUMNS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leaderboard (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT    NOT NULL,
+    name      TEXT    NOT NULL,
+    scenario  TEXT    NOT NULL,
+    time      INTEGER NOT NULL,
+    cost      INTEGER NOT NULL,
+    trust     INTEGER NOT NULL,
+    impact    INTEGER NOT NULL,
+    total     INTEGER NOT NULL,
+    path      BLOB,            -- one byte per step: index of the option chosen
+    rules     TEXT,            -- scoring rules version the scores were computed with
+    day       TEXT,            -- partition: UTC date of timestamp (YYYY-MM-DD)
+    event     INTEGER          -- partition: workshop session open when saved (events.id)
+);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_scenario_total ON leaderboard (scenario, total DESC);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_total ON leaderboard (total DESC);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_name ON leaderboard (name);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_scenario_name ON leaderboard (scenario, name);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_timestamp ON leaderboard (timestamp);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_scenario_timestamp ON leaderboard (scenario, timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS choice_counts (
+    scenario TEXT    NOT NULL,
+    step     INTEGER NOT NULL,
+    option   INTEGER NOT NULL,
+    count    INTEGER NOT NULL,
+    PRIMARY KEY (scenario, step, option)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scoring_rules (
+    version    TEXT PRIMARY KEY,
+    scenario   TEXT NOT NULL,
+    impacts    TEXT NOT NULL,  -- JSON steps x options x (time, cost, trust, impact)
+    registered TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS score_history (
+    id       INTEGER NOT NULL, -- leaderboard row
+    rules    TEXT    NOT NULL, -- version these (superseded) scores were computed with
+    time     INTEGER NOT NULL,
+    cost     INTEGER NOT NULL,
+    trust    INTEGER NOT NULL,
+    impact   INTEGER NOT NULL,
+    total    INTEGER NOT NULL,
+    rescored TEXT    NOT NULL,
+    PRIMARY KEY (id, rules)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    label   TEXT NOT NULL,
+    started TEXT NOT NULL,
+    ended   TEXT
+);
+CREATE TABLE IF NOT EXISTS partition_totals (
+    kind     TEXT    NOT NULL, -- 'day' or 'event'
+    key      TEXT    NOT NULL, -- the date, or the event id
+    scenario TEXT    NOT NULL,
+    total    INTEGER NOT NULL,
+    count    INTEGER NOT NULL,
+    PRIMARY KEY (kind, key, scenario, total)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS partition_archive (
+    kind       TEXT    NOT NULL,
+    key        TEXT    NOT NULL,
+    path       TEXT    NOT NULL,
+    rows       INTEGER NOT NULL,
+    generation INTEGER NOT NULL, -- store generation the file was written at
+    written    TEXT    NOT NULL,
+    pruned     INTEGER NOT NULL DEFAULT 0, -- 1: the rows left SQLite, the file is their only copy
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+"""
+
+
+def _partition_clause(partition: tuple | None) -> tuple:
+    # (SQL condition, params) selecting one time partition, or every row
+    if partition is None:
+        return "1", []
+    kind, key = partition
+    if kind == "day":
+        return "day = ?", [str(key)]
+    if kind == "event":
+        return "event = ?", [int(key)]
+    raise ValueError(f"unknown partition kind: {kind!r}")
+
+
+class LeaderboardStore:
+    def __init__(self, path: str = LEADERBOARD_DB, legacy_csv: str | None = LEGACY_LEADERBOARD_CSV):
+        self.path = path
+        # one connection per thread: Streamlit runs every session in its own thread
+        self._local = threading.local()
+        self._listeners = []        # called after every commit (see leaderboard_feed.py)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        self._migrate(conn)
+        if legacy_csv and os.path.exists(legacy_csv):
+            self._import_legacy_csv(legacy_csv)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # autocommit mode; writes open their own BEGIN IMMEDIATE transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        # databases created before choice paths / rules versions / partitions were stored
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(leaderboard)")}
+        for column, sql_type in (("path", "BLOB"), ("rules", "TEXT"), ("day", "TEXT"), ("event", "INTEGER")):
+            if column not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE leaderboard ADD COLUMN {column} {sql_type}")
+                except sqlite3.OperationalError:
+                    pass  # another process added it first
+        if "pruned" not in {row[1] for row in conn.execute("PRAGMA table_info(partition_archive)")}:
+            try:
+                conn.execute("ALTER TABLE partition_archive ADD COLUMN pruned INTEGER NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_day ON leaderboard (day, scenario, total DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_leaderboard_event ON leaderboard (event, scenario, total DESC)")
+        if "day" not in columns:
+            # existing rows go to the day they were saved; summaries built once
+            with self._write() as conn:
+                conn.execute("UPDATE leaderboard SET day = substr(timestamp, 1, 10) WHERE day IS NULL")
+                self._rebuild_partition_totals(conn)
+
+    @contextmanager
+    def _write(self):
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue on
+        # busy_timeout instead of failing with "database is locked" on upgrade
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        for callback in self._listeners:
+            callback()
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _import_legacy_csv(self, csv_path: str):
+        # one-shot migration of the old full-rewrite CSV; guarded by a meta flag
+        # inside the write transaction so concurrent processes import it only once
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_csv_imported'").fetchone():
+                return
+            from leaderboard_schema import read_legacy_csv
+
+            df = read_legacy_csv(csv_path)   # typed; malformed rows are dropped
+            rows = [
+                (ts.isoformat(), name, str(scenario), int(t), int(c), int(tr), int(i), int(total), ts.date().isoformat())
+                for ts, name, scenario, t, c, tr, i, total in df.itertuples(index=False, name=None)
+            ]
+            conn.executemany(
+                f"INSERT INTO leaderboard ({_SELECT_COLUMNS}, day) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._rebuild_partition_totals(conn)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_csv_imported', 1)")
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    @staticmethod
+    def _row(entry: dict, event: int | None) -> tuple:
+        path = entry.get("Path")
+        return tuple(entry[c] for c in LEADERBOARD_COLUMNS) + (
+            None if path is None else bytes(path), entry.get("Rules"),
+            str(entry["Timestamp"])[:10], entry.get("Event", event))
+
+    @staticmethod
+    def _current_event_id(conn: sqlite3.Connection) -> int | None:
+        return conn.execute("SELECT MAX(id) FROM events WHERE ended IS NULL").fetchone()[0]
+
+    def _insert(self, conn: sqlite3.Connection, entries: list) -> int:
+        # rows are tagged with the workshop session open at commit time;
+        # returns the id of the last row
+        event = self._current_event_id(conn)
+        rows = [self._row(e, event) for e in entries]
+        sql = (f"INSERT INTO leaderboard ({_SELECT_COLUMNS}, path, rules, day, event) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+        if len(rows) == 1:
+            last_id = conn.execute(sql, rows[0]).lastrowid
+        else:
+            conn.executemany(sql, rows)
+            last_id = None
+        self._bump_choice_counts(conn, entries)
+        self._bump_partition_totals(conn, rows)
+        return last_id
+
+    @staticmethod
+    def _bump_partition_totals(conn: sqlite3.Connection, rows: list):
+        # per-partition histogram of totals (ranking summaries for windowed views)
+        counts = {}
+        for r in rows:
+            scenario, total, day, event = r[2], int(r[7]), r[10], r[11]
+            keys = [("day", day)] if event is None else [("day", day), ("event", str(event))]
+            for kind, key in keys:
+                k = (kind, key, scenario, total)
+                counts[k] = counts.get(k, 0) + 1
+        if counts:
+            conn.executemany(
+                "INSERT INTO partition_totals (kind, key, scenario, total, count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, key, scenario, total) DO UPDATE SET count = count + excluded.count",
+                [k + (n,) for k, n in counts.items()],
+            )
+
+    @staticmethod
+    def _shift_partition_totals(conn: sqlite3.Connection, moves: list):
+        # moves: (id, old total, new total) of re-scored rows, applied before the update
+        for kind, column in (("day", "day"), ("event", "CAST(event AS TEXT)")):
+            conn.executemany(
+                f"INSERT INTO partition_totals (kind, key, scenario, total, count) "
+                f"SELECT '{kind}', {column}, scenario, ?, ? FROM leaderboard WHERE id = ? AND {column} IS NOT NULL "
+                "ON CONFLICT (kind, key, scenario, total) DO UPDATE SET count = count + excluded.count",
+                [(old, -1, row_id) for row_id, old, _ in moves] + [(new, 1, row_id) for row_id, _, new in moves],
+            )
+        if moves:
+            conn.execute("DELETE FROM partition_totals WHERE count = 0")
+
+    @staticmethod
+    def _rebuild_partition_totals(conn: sqlite3.Connection):
+        conn.execute("DELETE FROM partition_totals")
+        conn.execute(
+            "INSERT INTO partition_totals (kind, key, scenario, total, count) "
+            "SELECT 'day', day, scenario, total, COUNT(*) FROM leaderboard WHERE day IS NOT NULL "
+            "GROUP BY day, scenario, total"
+        )
+        conn.execute(
+            "INSERT INTO partition_totals (kind, key, scenario, total, count) "
+            "SELECT 'event', CAST(event AS TEXT), scenario, total, COUNT(*) FROM leaderboard "
+            "WHERE event IS NOT NULL GROUP BY event, scenario, total"
+        )
+
+    @staticmethod
+    def _bump_choice_counts(conn: sqlite3.Connection, entries: list):
+        # running per-step/per-option counters, updated in the save transaction
+        counts = {}
+        for e in entries:
+            for step, option in enumerate(e.get("Path") or ()):
+                key = (e["Scenario"], step, int(option))
+                counts[key] = counts.get(key, 0) + 1
+        if counts:
+            conn.executemany(
+                "INSERT INTO choice_counts (scenario, step, option, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (scenario, step, option) DO UPDATE SET count = count + excluded.count",
+                [k + (n,) for k, n in counts.items()],
+            )
+
+    @timed("store.append")
+    def append(self, entry: dict) -> int:
+        with self._write() as conn:
+            return self._insert(conn, [entry])
+
+    @timed("store.append_many")
+    def append_many(self, entries: list) -> int:
+        # one transaction (and one version bump) for a whole batch
+        with self._write() as conn:
+            self._insert(conn, entries)
+        return len(entries)
+
+    @timed("store.append_missing")
+    def append_missing(self, entries: list) -> int:
+        # append_many() minus entries already stored (same Name, Timestamp,
+        # Scenario and choice path), so importing a file twice adds nothing;
+        # returns the rows added
+        with self._write() as conn:
+            seen, fresh = set(), []
+            for e in entries:
+                path = e.get("Path")
+                key = (e["Scenario"], str(e["Timestamp"]), e["Name"], None if path is None else bytes(path))
+                if key in seen:
+                    continue
+                seen.add(key)
+                if conn.execute(
+                    "SELECT 1 FROM leaderboard WHERE scenario = ? AND timestamp = ? AND name = ? AND path IS ?", key
+                ).fetchone() is None:
+                    fresh.append(e)
+            if fresh:
+                self._insert(conn, fresh)
+        return len(fresh)
+
+    def clear(self):
+        with self._write() as conn:
+            conn.execute("DELETE FROM leaderboard")
+            conn.execute("DELETE FROM choice_counts")
+            conn.execute("DELETE FROM score_history")
+            conn.execute("DELETE FROM partition_totals")
+            # pruned archives become stale copies: readers skip them, the next compact drops them
+            conn.execute("UPDATE partition_archive SET pruned = 0")
+            # lets incremental readers know their cached rows are gone
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    # ----------------------------
+    # Re-scoring (see rescoring.py)
+    # ----------------------------
+    def register_rules(self, version: str, scenario: str, impacts_json: str):
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO scoring_rules (version, scenario, impacts, registered) "
+                "VALUES (?, ?, ?, datetime('now'))",
+                (version, scenario, impacts_json),
+            )
+
+    def fetch_paths(self, scenario: str, after_id: int = 0, limit: int = 50_000, stale_for: str | None = None) -> list:
+        # (id, path, rules, time, cost, trust, impact, total) in id order; with
+        # stale_for, only rows not already scored under that rules version
+        sql = "SELECT id, path, rules, time, cost, trust, impact, total FROM leaderboard WHERE scenario = ? AND id > ?"
+        params = [scenario, after_id]
+        if stale_for is not None:
+            sql += " AND rules IS NOT ?"
+            params.append(stale_for)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(int(limit))
+        return self._connect().execute(sql, params).fetchall()
+
+    @timed("store.apply_rescore")
+    def apply_rescore(self, updates: list, rules: str) -> int:
+        # updates: (id, old_rules, old time..total, new time..total); the old scores
+        # are kept in score_history so both versions stay comparable
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO score_history (id, rules, time, cost, trust, impact, total, rescored) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'))",
+                [(u[0], u[1] or "unversioned") + tuple(u[2:7]) for u in updates],
+            )
+            self._shift_partition_totals(conn, [(u[0], u[6], u[11]) for u in updates if u[6] != u[11]])
+            conn.executemany(
+                "UPDATE leaderboard SET time = ?, cost = ?, trust = ?, impact = ?, total = ?, rules = ? WHERE id = ?",
+                [tuple(u[7:12]) + (rules, u[0]) for u in updates],
+            )
+            # existing rows changed: incremental readers must reload
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        return len(updates)
+
+    def score_history(self, row_id: int) -> list:
+        # superseded scores of one row: (rules, time, cost, trust, impact, total, rescored)
+        return self._connect().execute(
+            "SELECT rules, time, cost, trust, impact, total, rescored FROM score_history WHERE id = ? ORDER BY rescored",
+            (row_id,),
+        ).fetchall()
+
+    # ----------------------------
+    # Workshop sessions ("events") and time partitions
+    # ----------------------------
+    def start_event(self, label: str) -> int:
+        # closes the open session, if any; later saves belong to the new one
+        with self._write() as conn:
+            conn.execute("UPDATE events SET ended = datetime('now') WHERE ended IS NULL")
+            return conn.execute(
+                "INSERT INTO events (label, started) VALUES (?, datetime('now'))", (label,)
+            ).lastrowid
+
+    def end_event(self):
+        with self._write() as conn:
+            conn.execute("UPDATE events SET ended = datetime('now') WHERE ended IS NULL")
+
+    def current_event(self) -> tuple | None:
+        # (id, label, started) of the open workshop session
+        return self._connect().execute(
+            "SELECT id, label, started FROM events WHERE ended IS NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+
+    def events(self, limit: int = 20) -> list:
+        # (id, label, started, ended), newest first
+        return self._connect().execute(
+            "SELECT id, label, started, ended FROM events ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def partition_totals(self, kind: str, key: str) -> dict:
+        # {scenario: [(total, count), ...] ascending}: a partition's ranking summary
+        rows = self._connect().execute(
+            "SELECT scenario, total, count FROM partition_totals WHERE kind = ? AND key = ? ORDER BY scenario, total",
+            (kind, str(key)),
+        ).fetchall()
+        out = {}
+        for scenario, total, n in rows:
+            out.setdefault(scenario, []).append((total, n))
+        return out
+
+    def partitions(self, kind: str) -> list:
+        # (key, rows) of every non-empty partition, oldest first
+        return self._connect().execute(
+            "SELECT key, SUM(count) FROM partition_totals WHERE kind = ? GROUP BY key ORDER BY key", (kind,)
+        ).fetchall()
+
+    def fetch_partition(self, kind: str, key: str) -> list:
+        # every row of one partition, in id order: (id, LEADERBOARD_COLUMNS..., path, rules, day, event)
+        where, params = _partition_clause((kind, key))
+        return self._connect().execute(
+            f"SELECT id, {_SELECT_COLUMNS}, path, rules, day, event FROM leaderboard WHERE {where} ORDER BY id",
+            params,
+        ).fetchall()
+
+    @contextmanager
+    def read_snapshot(self):
+        # reads made by this thread inside the block all see one consistent
+        # state (a WAL read transaction), e.g. a long chunked export
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            yield self
+        finally:
+            conn.execute("COMMIT")
+
+    def iter_rows(self, batch_rows: int = 100_000, days=None, after_id: int = 0):
+        # every row after after_id (or those of the given day partitions) in id
+        # order, batch_rows at a time, in fetch_partition()'s column order
+        sql = f"SELECT id, {_SELECT_COLUMNS}, path, rules, day, event FROM leaderboard WHERE id > ?"
+        params = []
+        if days is not None:
+            days = sorted(days)
+            if not days:
+                return
+            # "+day" keeps this a rowid range scan: through idx_leaderboard_day
+            # every batch would re-sort all matching ids into a temp B-tree
+            sql += f" AND +day IN ({', '.join('?' * len(days))})"
+            params = days
+        sql += " ORDER BY id LIMIT ?"
+        last_id = after_id
+        while True:
+            rows = self._connect().execute(sql, [last_id, *params, int(batch_rows)]).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+
+    def archives(self, kind: str) -> dict:
+        # {key: (path, rows, generation, pruned)} of compacted partitions
+        rows = self._connect().execute(
+            "SELECT key, path, rows, generation, pruned FROM partition_archive WHERE kind = ?", (kind,)
+        ).fetchall()
+        return {key: (path, n, generation, bool(pruned)) for key, path, n, generation, pruned in rows}
+
+    def record_archive(self, kind: str, key: str, path: str | None, rows: int = 0, generation: int = 0):
+        # path None forgets the archive
+        with self._write() as conn:
+            if path is None:
+                conn.execute("DELETE FROM partition_archive WHERE kind = ? AND key = ?", (kind, str(key)))
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO partition_archive (kind, key, path, rows, generation, written) "
+                    "VALUES (?, ?, ?, ?, ?, datetime('now'))",
+                    (kind, str(key), path, rows, generation),
+                )
+
+    @timed("store.prune_partition")
+    def prune_partition(self, kind: str, key: str, path: str, rows: int, live_rows: int, generation: int) -> bool:
+        # the archive at path now holds the partition (rows in all, live_rows of
+        # them read from SQLite at generation): record it and delete those rows in
+        # one transaction. Refused (False) if the partition changed since it was
+        # read. Choice counts and score history keep counting the pruned runs.
+        where, params = _partition_clause((kind, key))
+        with self._write() as conn:
+            current = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+            n = conn.execute(f"SELECT COUNT(*) FROM leaderboard WHERE {where}", params).fetchone()[0]
+            if (current, n) != (generation, live_rows):
+                return False
+            # the rows' other partitions (day, workshop session) lose them too
+            for other, column in (("day", "day"), ("event", "CAST(event AS TEXT)")):
+                if other != kind:
+                    conn.execute(
+                        f"INSERT INTO partition_totals (kind, key, scenario, total, count) "
+                        f"SELECT '{other}', {column}, scenario, total, -COUNT(*) FROM leaderboard "
+                        f"WHERE {where} AND {column} IS NOT NULL GROUP BY {column}, scenario, total "
+                        "ON CONFLICT (kind, key, scenario, total) DO UPDATE SET count = count + excluded.count",
+                        params,
+                    )
+            conn.execute("DELETE FROM partition_totals WHERE (kind = ? AND key = ?) OR count = 0", (kind, str(key)))
+            conn.execute(f"DELETE FROM leaderboard WHERE {where}", params)
+            conn.execute(
+                "INSERT OR REPLACE INTO partition_archive (kind, key, path, rows, generation, written, pruned) "
+                "VALUES (?, ?, ?, ?, ?, datetime('now'), 1)",
+                (kind, str(key), path, rows, generation + 1),
+            )
+            # cached boards hold the deleted rows
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        return True
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def version(self) -> int:
+        # bumped in the same transaction as every write
+        return self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def state(self) -> tuple:
+        # (version, generation) in one round trip
+        rows = dict(self._connect().execute(
+            "SELECT key, value FROM meta WHERE key IN ('version', 'generation')"
+        ).fetchall())
+        return rows["version"], rows["generation"]
+
+    def last_id(self) -> int:
+        # id of the newest row (0 when empty)
+        return self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM leaderboard").fetchone()[0]
+
+    @timed("store.fetch_since")
+    def fetch_since(self, last_id: int = 0) -> list:
+        # rows appended after last_id, oldest first, with their id as first column
+        return self._connect().execute(
+            f"SELECT id, {_SELECT_COLUMNS} FROM leaderboard WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+
+    def choice_counts(self, scenario: str) -> dict:
+        # {(step, option): runs that picked it}; size is steps x options, not runs
+        rows = self._connect().execute(
+            "SELECT step, option, count FROM choice_counts WHERE scenario = ?", (scenario,)
+        ).fetchall()
+        return {(step, option): n for step, option, n in rows}
+
+    def count(self, scenario: str | None = None, partition: tuple | None = None) -> int:
+        where, params = _partition_clause(partition)
+        if scenario is not None:
+            where += " AND scenario = ?"
+            params.append(scenario)
+        return self._connect().execute(f"SELECT COUNT(*) FROM leaderboard WHERE {where}", params).fetchone()[0]
+
+    def scenarios(self) -> list:
+        rows = self._connect().execute("SELECT DISTINCT scenario FROM leaderboard ORDER BY scenario").fetchall()
+        return [r[0] for r in rows]
+
+    @timed("store.fetch")
+    def fetch(self, scenario: str | None = None, sort_by: str = "Total", ascending: bool = False,
+              limit: int | None = None, offset: int = 0, partition: tuple | None = None) -> list:
+        # partition: ("day", "YYYY-MM-DD") or ("event", id) reads only that slice (indexed)
+        order = f"{_SQL_COLUMNS[sort_by]} {'ASC' if ascending else 'DESC'}, id ASC"
+        where, params = _partition_clause(partition)
+        sql = f"SELECT {_SELECT_COLUMNS} FROM leaderboard WHERE {where}"
+        if scenario is not None:
+            sql += " AND scenario = ?"
+            params.append(scenario)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        return self._connect().execute(sql, params).fetchall()
+
+    def top(self, scenario: str | None = None, n: int = 5, partition: tuple | None = None) -> list:
+        return self.fetch(scenario, sort_by="Total", ascending=False, limit=n, partition=partition)
+
+    def to_dataframe(self, *args, scenario_categories=None, **kwargs):
+        from leaderboard_schema import to_compact_frame
+        return to_compact_frame(self.fetch(*args, **kwargs), scenario_categories)
+
+
+# ----------------------------
+# Process-wide leaderboard snapshot
+# One copy of the rows shared by every session; refreshed only when the store
+# version changes, and then only with the rows appended since the last refresh.
+# Rows live in a few geometrically sized DataFrame chunks (so an append never
+# copies the whole table) and a LeaderboardIndex answers top-N, rank and page
+# queries; a page only materializes the rows it shows.
+# A refresh builds the next _BoardState beside the published one (new chunk
+# list, copied index) and publishes it with one assignment: readers take the
+# current state once per call and never see a half-applied refresh.
+# ----------------------------
+class _BoardState:
+    # immutable once published, apart from its own result caches
+    def __init__(self, version=None, generation=None, last_id=0, chunks=(), offsets=(), n=0,
+                 index=None, categories=()):
+        self.version = version
+        self.generation = generation
+        self.last_id = last_id
+        self.chunks = list(chunks)          # DataFrames, oldest first
+        self.offsets = list(offsets)        # first row position of each chunk
+        self.n = n
+        self.index = index if index is not None else LeaderboardIndex()
+        self.categories = list(categories)  # Scenario categories shared by every chunk
+        self.full = None                    # consolidated frame, built on demand
+        self.results = {}                   # page/top frames of this state, shared by all viewers
+
+    def extended(self, new, version, generation, last_id) -> "_BoardState":
+        # next state with the rows of frame `new` appended; self is left untouched
+        import pandas as pd
+
+        index = self.index.copy()
+        if len(new) > 64:
+            index.add_many(new["Scenario"].to_numpy(), new["Total"].to_numpy(), self.n)
+        else:
+            for i, (scenario, total) in enumerate(zip(new["Scenario"].tolist(), new["Total"].tolist())):
+                index.add(scenario, total, self.n + i)
+        chunks, categories = self.chunks, self.categories
+        cats = list(new["Scenario"].cat.categories)
+        if cats != categories:
+            # a new scenario appeared: widen every chunk to the same categories so
+            # concat keeps the column categorical (new frames, readers keep the old ones)
+            dtype = new["Scenario"].dtype
+            chunks = [c.assign(Scenario=c["Scenario"].astype(dtype)) for c in chunks]
+            categories = cats
+        chunks, offsets = chunks + [new], self.offsets + [self.n]
+        # each chunk stays > 2x the next one: O(log n) chunks and O(n log n) total copying
+        while len(chunks) > 1 and len(chunks[-2]) <= 2 * len(chunks[-1]):
+            last = chunks.pop()
+            offsets.pop()
+            chunks[-1] = pd.concat([chunks[-1], last], ignore_index=True)
+        return _BoardState(version, generation, last_id, chunks, offsets, self.n + len(new), index, categories)
+
+    def take(self, positions: list):
+        import numpy as np
+        import pandas as pd
+        from leaderboard_schema import empty_frame
+
+        if not positions:
+            return empty_frame(self.categories)
+        pos = np.asarray(positions)
+        chunk_of = np.searchsorted(self.offsets, pos, side="right") - 1
+        parts = []
+        # consecutive positions usually sit in the same chunk; keep the requested order
+        run_start = 0
+        for i in range(1, len(pos) + 1):
+            if i == len(pos) or chunk_of[i] != chunk_of[run_start]:
+                c = chunk_of[run_start]
+                parts.append(self.chunks[c].iloc[pos[run_start:i] - self.offsets[c]])
+                run_start = i
+        return pd.concat(parts, ignore_index=True)
+
+    def cached(self, key: tuple, build):
+        # frames are shared between sessions until the data changes: treat them as read-only
+        results = self.results
+        df = results.get(key)
+        if df is None:
+            if len(results) >= 256:
+                results.clear()
+            df = results[key] = build()
+        return df
+
+
+class SharedLeaderboard:
+    # with a ChangeFeed, refresh() skips the SQLite version check until the feed moves
+    def __init__(self, store: LeaderboardStore, feed=None):
+        self.store = store
+        self.feed = feed
+        self._lock = threading.Lock()       # serializes refreshes; readers never take it
+        self._feed_version = None
+        self._state = _BoardState()
+
+    @timed("leaderboard.refresh")
+    def refresh(self) -> _BoardState:
+        # the current state, refreshed first if the store moved
+        feed_version = self.feed.version() if self.feed is not None else None
+        if feed_version is not None and feed_version == self._feed_version:
+            return self._state
+        state = self._state
+        version, generation = self.store.state()
+        if version == state.version and generation == state.generation:
+            self._feed_version = feed_version
+            return state
+        if feed_version is not None and state.version is not None:
+            # live views: while another session refreshes, keep serving the current
+            # state (the next tick picks the change up) rather than queueing on the lock
+            if not self._lock.acquire(blocking=False):
+                return state
+        else:
+            self._lock.acquire()
+        try:
+            self._refresh_locked(feed_version)
+        finally:
+            self._lock.release()
+        return self._state
+
+    def _refresh_locked(self, feed_version):
+        from leaderboard_schema import to_compact_frame
+
+        # another session may have refreshed while we waited for the lock
+        if feed_version is not None and self._feed_version is not None and self._feed_version >= feed_version:
+            return
+        state = self._state
+        version, generation = self.store.state()
+        if version == state.version and generation == state.generation:
+            return
+        if generation != state.generation:
+            state = _BoardState()
+        rows = self.store.fetch_since(state.last_id)
+        if rows:
+            new = to_compact_frame([r[1:] for r in rows], state.categories)
+            state = state.extended(new, version, generation, rows[-1][0])
+        else:
+            state = _BoardState(version, generation, state.last_id, state.chunks, state.offsets, state.n,
+                                state.index, state.categories)
+        self._state = state
+        self._feed_version = feed_version
+
+    @property
+    def version(self):
+        return self._state.version
+
+    @timed("leaderboard.snapshot")
+    def snapshot(self):
+        # the whole table as one frame (analytics/exports); cached per version
+        import pandas as pd
+        from leaderboard_schema import empty_frame
+
+        state = self.refresh()
+        if state.full is None:
+            if len(state.chunks) == 1:
+                state.full = state.chunks[0]
+            elif state.chunks:
+                state.full = pd.concat(state.chunks, ignore_index=True)
+            else:
+                state.full = empty_frame(state.categories)
+        return state.full
+
+    def count(self, scenario: str | None = None) -> int:
+        return self.refresh().index.get(scenario).n
+
+    def scenarios(self) -> list:
+        return self.refresh().index.scenarios()
+
+    def rank(self, total: int, scenario: str | None = None) -> int:
+        return self.refresh().index.get(scenario).rank(total)
+
+    def top(self, scenario: str | None = None, n: int = 5):
+        state = self.refresh()
+        return state.cached(("top", scenario, n), lambda: state.take(state.index.get(scenario).top_positions(n)))
+
+    @timed("leaderboard.page")
+    def page(self, scenario: str | None = None, sort_by: str = "Total", ascending: bool = False,
+             page: int = 0, page_size: int = 50):
+        # only the rows of the requested page; 200 viewers of the same page share one frame
+        state = self.refresh()
+        return state.cached(("page", scenario, sort_by, ascending, page, page_size),
+                            lambda: self._build_page(state, scenario, sort_by, ascending, page, page_size))
+
+    def _build_page(self, state, scenario, sort_by, ascending, page, page_size):
+        if sort_by == "Total":
+            return state.take(state.index.get(scenario).page_positions(page, page_size, ascending))
+        # timestamps and names are not ranked in memory: SQLite walks its
+        # (scenario, timestamp) / (scenario, name) index. Row ids are not save
+        # order once older history has been imported.
+        return self.store.to_dataframe(scenario, sort_by=sort_by, ascending=ascending,
+                                       limit=page_size, offset=page * page_size,
+                                       scenario_categories=state.categories)
@@ -0,0 +1,143 @@
+# leaderboard_writer.py
+import atexit
+import logging
+import os
+import threading
+import time
+
+from perf import timed
+
+# ----------------------------
+# Write-behind buffering for leaderboard saves
+# submit() only appends to an in-memory buffer and returns; a background
+# worker commits the buffer in batches when it reaches batch_size rows or
+# when its oldest row has waited flush_interval seconds. close() (also run at
+# interpreter exit) drains whatever is left, so acknowledged saves are not lost
+# on a normal shutdown.
+# ----------------------------
+WRITE_BATCH_SIZE = int(os.environ.get("SERIOUSGAME_WRITE_BATCH_SIZE", "200"))
+WRITE_FLUSH_INTERVAL = float(os.environ.get("SERIOUSGAME_WRITE_FLUSH_MS", "250")) / 1000
+
+logger = logging.getLogger("seriousgame.writer")
+
+
+class WriteBehindWriter:
+    def __init__(self, store, batch_size: int = WRITE_BATCH_SIZE, flush_interval: float = WRITE_FLUSH_INTERVAL):
+        self.store = store
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self._cond = threading.Condition()
+        self._buffer = []           # (enqueued_at, entry)
+        self._submitted = 0
+        self._committed = 0
+        self._flush_target = 0      # an explicit flush() drains up to here regardless of thresholds
+        self._closing = False
+        self._metrics = {
+            "batches": 0,
+            "rows_committed": 0,
+            "max_batch_rows": 0,
+            "flush_seconds_total": 0.0,
+            "max_flush_seconds": 0.0,
+            "max_queue_wait_seconds": 0.0,
+            "errors": 0,
+        }
+        self._thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+    def submit(self, entry: dict) -> int:
+        # acknowledged as soon as it is buffered; returns its sequence number
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("leaderboard writer is closed")
+            self._buffer.append((time.monotonic(), entry))
+            self._submitted += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+            return self._submitted
+
+    def flush(self, timeout: float | None = None) -> bool:
+        # block until everything submitted so far is committed
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._submitted
+            self._flush_target = max(self._flush_target, target)
+            self._cond.notify_all()
+            while self._committed < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = 30.0):
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # ----------------------------
+    # Worker
+    # ----------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._buffer and (
+                        self._closing
+                        or len(self._buffer) >= self.batch_size
+                        or time.monotonic() - self._buffer[0][0] >= self.flush_interval
+                        or self._committed < self._flush_target
+                    ):
+                        break
+                    if self._closing:
+                        return
+                    wait = None if not self._buffer else self.flush_interval - (time.monotonic() - self._buffer[0][0])
+                    self._cond.wait(wait)
+                batch = self._buffer[:self.batch_size]
+            self._commit(batch)
+
+    @timed("writer.commit")
+    def _commit(self, batch: list):
+        t0 = time.perf_counter()
+        try:
+            self.store.append_many([entry for _, entry in batch])
+        except Exception:
+            # keep the rows buffered and retry on the next round
+            logger.exception("leaderboard batch of %d rows failed; will retry", len(batch))
+            with self._cond:
+                self._metrics["errors"] += 1
+            time.sleep(min(1.0, self.flush_interval or 0.1))
+            return
+        seconds = time.perf_counter() - t0
+        now = time.monotonic()
+        with self._cond:
+            del self._buffer[:len(batch)]
+            self._committed += len(batch)
+            m = self._metrics
+            m["batches"] += 1
+            m["rows_committed"] += len(batch)
+            m["max_batch_rows"] = max(m["max_batch_rows"], len(batch))
+            m["flush_seconds_total"] += seconds
+            m["max_flush_seconds"] = max(m["max_flush_seconds"], seconds)
+            m["max_queue_wait_seconds"] = max(m["max_queue_wait_seconds"], now - batch[0][0])
+            self._cond.notify_all()
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def metrics(self) -> dict:
+        with self._cond:
+            m = dict(self._metrics)
+            m["queued_rows"] = len(self._buffer)
+            m["rows_submitted"] = self._submitted
+        m["batch_size"] = self.batch_size
+        m["flush_interval_seconds"] = self.flush_interval
+        m["mean_batch_rows"] = m["rows_committed"] / m["batches"] if m["batches"] else 0.0
+        m["mean_flush_seconds"] = m["flush_seconds_total"] / m["batches"] if m["batches"] else 0.0
+        return m
@@ -0,0 +1,237 @@
+# loadgen.py
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from game_content import scenarios
+from game_engine import GameEngine
+from leaderboard_feed import ChangeFeed
+from leaderboard_store import LeaderboardStore, SharedLeaderboard
+from leaderboard_writer import WriteBehindWriter, WRITE_BATCH_SIZE, WRITE_FLUSH_INTERVAL
+
+# ----------------------------
+# Simulated-player load generator
+# Drives the headless game engine against the real leaderboard store and
+# reports throughput and p50/p99 latency per operation.
+#   python loadgen.py --players 2000 --workers 64 [--mode process] [--db path]
+#                     [--write-behind [--batch-size N --flush-ms MS]]
+#                     [--viewers 200 --tick-ms 500 --live-seconds 5 --live-saves 20]
+# --viewers adds a classroom phase after the run: that many live leaderboard
+# views tick against one shared board while saves arrive at a steady rate.
+# ----------------------------
+OPERATIONS = ("start", "choose", "finish", "save")
+
+
+def play_one(engine: GameEngine, store, player_id: int, rng: random.Random) -> dict:
+    timings = {op: [] for op in OPERATIONS}
+
+    t = time.perf_counter()
+    state = engine.start(rng.choice(list(engine.scenarios)))
+    timings["start"].append(time.perf_counter() - t)
+
+    while not engine.is_finished(state):
+        n_options = len(engine.current_step(state)["options"])
+        t = time.perf_counter()
+        engine.choose(state, rng.randrange(n_options))
+        timings["choose"].append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    engine.finish(state)
+    timings["finish"].append(time.perf_counter() - t)
+
+    # store is a LeaderboardStore (synchronous) or a WriteBehindWriter (buffered ack)
+    t = time.perf_counter()
+    entry = engine.result_entry(state, f"player-{player_id}")
+    if isinstance(store, WriteBehindWriter):
+        store.submit(entry)
+    else:
+        store.append(entry)
+    timings["save"].append(time.perf_counter() - t)
+    return timings
+
+
+def view_ticks(board: SharedLeaderboard, stop: threading.Event, tick: float) -> list:
+    # board-side work of one open live-leaderboard fragment per tick (Streamlit's
+    # own rendering is not included)
+    ticks = []
+    while not stop.is_set():
+        t = time.perf_counter()
+        board.count()
+        board.page(None, "Total", False, 0, 50)
+        board.rank(0)
+        board.top(None, 5)
+        ticks.append(time.perf_counter() - t)
+        stop.wait(tick)
+    return ticks
+
+
+def live_phase(db_path: str, viewers: int, tick: float, seconds: float, saves_per_s: float, seed: int,
+               write_behind: dict | None = None) -> dict:
+    engine = GameEngine(scenarios)
+    store = LeaderboardStore(db_path, legacy_csv=None)
+    target = WriteBehindWriter(store, **write_behind) if write_behind is not None else store
+    board = SharedLeaderboard(store, ChangeFeed(store))
+    board.snapshot()    # existing rows loaded, as in a running app
+    rng = random.Random(seed)
+    stop = threading.Event()
+    timings = {"live_save": [], "view_tick": []}
+    with ThreadPoolExecutor(max_workers=viewers) as pool:
+        futures = [pool.submit(view_ticks, board, stop, tick) for _ in range(viewers)]
+        deadline = time.perf_counter() + seconds
+        player_id = 0
+        while time.perf_counter() < deadline:
+            _merge(timings, {"live_save": play_one(engine, target, player_id, rng)["save"]})
+            player_id += 1
+            stop.wait(1 / saves_per_s)
+        stop.set()
+        for f in futures:
+            timings["view_tick"].extend(f.result()[1:])   # first tick includes imports
+    if target is not store:
+        target.close()
+    return timings
+
+
+def _merge(into: dict, timings: dict):
+    for op, values in timings.items():
+        into[op].extend(values)
+
+
+def _run_players(db_path: str, player_ids: list, workers: int, seed: int, write_behind: dict | None = None):
+    # one store per process; it hands out one SQLite connection per thread
+    engine = GameEngine(scenarios)
+    store = LeaderboardStore(db_path, legacy_csv=None)
+    target = WriteBehindWriter(store, **write_behind) if write_behind is not None else store
+    timings = {op: [] for op in OPERATIONS}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(play_one, engine, target, pid, random.Random(seed + pid)) for pid in player_ids
+        ]
+        for f in futures:
+            _merge(timings, f.result())
+    writer_metrics = None
+    if target is not store:
+        target.close()
+        writer_metrics = target.metrics()
+    return timings, writer_metrics
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def summarize(timings: dict, wall_seconds: float) -> dict:
+    ops = {}
+    for op, values in timings.items():
+        values = sorted(values)
+        ops[op] = {
+            "count": len(values),
+            "throughput_per_s": len(values) / wall_seconds if wall_seconds else 0.0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": (values[-1] * 1000) if values else 0.0,
+        }
+    return ops
+
+
+def run(players: int, workers: int, mode: str = "thread", processes: int = 4,
+        db_path: str | None = None, seed: int = 0, write_behind: dict | None = None,
+        live: dict | None = None) -> dict:
+    tmpdir = None
+    if db_path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmpdir.name, "loadgen.db")
+    LeaderboardStore(db_path, legacy_csv=None)   # create the schema before workers race for it
+
+    ids = list(range(players))
+    t0 = time.perf_counter()
+    writer_metrics = []
+    if mode == "process":
+        timings = {op: [] for op in OPERATIONS}
+        shards = [ids[i::processes] for i in range(processes)]
+        per_process_workers = max(1, workers // processes)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(_run_players, db_path, shard, per_process_workers, seed, write_behind)
+                for shard in shards
+            ]
+            for f in futures:
+                shard_timings, metrics = f.result()
+                _merge(timings, shard_timings)
+                writer_metrics.append(metrics)
+    else:
+        timings, metrics = _run_players(db_path, ids, workers, seed, write_behind)
+        writer_metrics.append(metrics)
+    # wall time includes draining the write-behind buffers
+    wall = time.perf_counter() - t0
+
+    operations = summarize(timings, wall)
+    if live is not None:
+        operations.update(summarize(live_phase(db_path, seed=seed, write_behind=write_behind, **live), live["seconds"]))
+
+    rows = LeaderboardStore(db_path, legacy_csv=None).count()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+    return {
+        "players": players,
+        "workers": workers,
+        "mode": mode,
+        "wall_seconds": wall,
+        "players_per_s": players / wall if wall else 0.0,
+        "rows_in_store": rows,
+        "operations": operations,
+        "live": live,
+        "write_behind": writer_metrics if write_behind is not None else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent players against the leaderboard store")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=32, help="concurrent player threads (total)")
+    parser.add_argument("--mode", choices=("thread", "process"), default="thread")
+    parser.add_argument("--processes", type=int, default=4, help="process count in --mode process")
+    parser.add_argument("--db", default=None, help="leaderboard DB to write to (default: throwaway temp file)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-behind", action="store_true", help="save through the write-behind buffer")
+    parser.add_argument("--batch-size", type=int, default=WRITE_BATCH_SIZE)
+    parser.add_argument("--flush-ms", type=float, default=WRITE_FLUSH_INTERVAL * 1000)
+    parser.add_argument("--viewers", type=int, default=0, help="live leaderboard views in the classroom phase")
+    parser.add_argument("--tick-ms", type=float, default=500, help="live view refresh interval")
+    parser.add_argument("--live-seconds", type=float, default=5.0)
+    parser.add_argument("--live-saves", type=float, default=20.0, help="saves per second during the live phase")
+    parser.add_argument("--json", action="store_true", help="emit the report as JSON")
+    args = parser.parse_args(argv)
+
+    write_behind = None
+    if args.write_behind:
+        write_behind = {"batch_size": args.batch_size, "flush_interval": args.flush_ms / 1000}
+    live = None
+    if args.viewers:
+        live = {"viewers": args.viewers, "tick": args.tick_ms / 1000,
+                "seconds": args.live_seconds, "saves_per_s": args.live_saves}
+    report = run(args.players, args.workers, args.mode, args.processes, args.db, args.seed, write_behind, live)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['players']} players, {report['workers']} workers ({report['mode']}): "
+          f"{report['wall_seconds']:.2f} s, {report['players_per_s']:.0f} players/s, "
+          f"{report['rows_in_store']} rows in store")
+    for op, s in report["operations"].items():
+        print(f"  {op:<9} n={s['count']:<7} {s['throughput_per_s']:>10.0f}/s  "
+              f"p50={s['p50_ms']:.3f} ms  p99={s['p99_ms']:.3f} ms  max={s['max_ms']:.3f} ms")
+    for m in report["write_behind"] or []:
+        print(f"  write-behind: {m['batches']} batches, mean {m['mean_batch_rows']:.1f} rows, "
+              f"mean flush {m['mean_flush_seconds'] * 1000:.2f} ms, max queue wait "
+              f"{m['max_queue_wait_seconds'] * 1000:.1f} ms, errors {m['errors']}")
+
+
+if __name__ == "__main__":
+    main()
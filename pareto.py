@@ -0,0 +1,175 @@
+# pareto.py
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from perf import timed
+from scenario_analysis import DIMENSIONS, impact_key
+
+# ----------------------------
+# Pareto frontier of choice paths (all four dimensions: higher is better)
+# Scores are additive, so if a partial path dominates another one, every
+# completion of the dominated prefix is dominated by the same completion of
+# the other: we prune after each step and never enumerate every path.
+# ----------------------------
+
+
+@dataclass(frozen=True)
+class FrontierPoint:
+    scores: tuple      # (time, cost, trust, impact)
+    path: tuple        # option index chosen at each step (one representative path)
+    n_paths: int       # number of distinct paths reaching exactly these scores
+
+    @property
+    def total(self) -> int:
+        return sum(self.scores)
+
+
+@dataclass(frozen=True)
+class ParetoResult:
+    frontier: list
+    n_paths: int
+    max_candidates: int        # largest intermediate candidate set after merging
+    seconds: float
+    peak_bytes: int | None = field(default=None)
+
+
+_CHUNK = 1024
+
+
+def _non_dominated(vectors: np.ndarray) -> np.ndarray:
+    # boolean mask of rows not strictly dominated by any other row (rows are unique).
+    # A dominator of a unique vector always has a strictly larger sum, so after
+    # sorting by sum we only compare each chunk against the rows already kept
+    # (transitivity covers the discarded ones) and against itself; memory stays
+    # bounded at frontier x chunk.
+    sums = vectors.sum(axis=1)
+    order = np.argsort(-sums, kind="stable")
+    v, s = vectors[order], sums[order]
+    keep = np.zeros(len(v), dtype=bool)
+    kept = v[:0]
+    for start in range(0, len(v), _CHUNK):
+        block, block_s = v[start:start + _CHUNK], s[start:start + _CHUNK]
+        dominated = (kept[:, None, :] >= block[None, :, :]).all(axis=-1).any(axis=0)
+        inner = (block[:, None, :] >= block[None, :, :]).all(axis=-1) & (block_s[:, None] > block_s[None, :])
+        block_keep = ~(dominated | inner.any(axis=0))
+        keep[start:start + _CHUNK] = block_keep
+        kept = np.concatenate([kept, block[block_keep]])
+    mask = np.zeros(len(v), dtype=bool)
+    mask[order] = keep
+    return mask
+
+
+def _frontier(key: tuple) -> tuple:
+    vectors = np.zeros((1, len(DIMENSIONS)), dtype=np.int64)
+    paths = [()]
+    counts = [1]
+    max_candidates = 1
+    for opts in key:
+        impacts = np.asarray(opts, dtype=np.int64)                      # [options, dims]
+        cand = (vectors[:, None, :] + impacts[None, :, :]).reshape(-1, len(DIMENSIONS))
+        # merge paths landing on the same score vector
+        uniq, first, inverse = np.unique(cand, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        cand_counts = np.repeat(np.asarray(counts, dtype=object), len(opts))
+        merged = np.zeros(len(uniq), dtype=object)
+        np.add.at(merged, inverse, cand_counts)
+        max_candidates = max(max_candidates, len(uniq))
+
+        keep = np.flatnonzero(_non_dominated(uniq))
+        n_opts = len(opts)
+        vectors = uniq[keep]
+        paths = [paths[first[k] // n_opts] + (int(first[k] % n_opts),) for k in keep]
+        counts = [int(merged[k]) for k in keep]
+    frontier = [
+        FrontierPoint(scores=tuple(int(v) for v in vec), path=path, n_paths=n)
+        for vec, path, n in zip(vectors, paths, counts)
+    ]
+    frontier.sort(key=lambda p: (-p.total, p.scores))
+    return frontier, max_candidates
+
+
+@lru_cache(maxsize=64)
+def _pareto(key: tuple) -> ParetoResult:
+    t0 = time.perf_counter()
+    frontier, max_candidates = _frontier(key)
+    n_paths = 1
+    for opts in key:
+        n_paths *= len(opts)
+    return ParetoResult(frontier, n_paths, max_candidates, time.perf_counter() - t0)
+
+
+@timed("pareto.frontier")
+def pareto_frontier(steps: list, measure_memory: bool = False) -> ParetoResult:
+    key = impact_key(steps)
+    if not measure_memory:
+        return _pareto(key)
+    # tracemalloc slows allocation down, so it only runs when asked for
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    frontier, max_candidates = _frontier(key)
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    if started:
+        tracemalloc.stop()
+    return ParetoResult(frontier, _pareto(key).n_paths, max_candidates, seconds, peak)
+
+
+def path_labels(steps: list, path: tuple) -> list:
+    return [steps[s]["options"][o][0] for s, o in enumerate(path)]
+
+
+# ----------------------------
+# CLI: python pareto.py [--scenario NAME] [--json]
+# ----------------------------
+def main(argv=None):
+    from game_content import scenarios
+
+    parser = argparse.ArgumentParser(description="Pareto frontier of choice paths per scenario")
+    parser.add_argument("--scenario", action="append", help="scenario name (repeatable; default: all)")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a text report")
+    args = parser.parse_args(argv)
+
+    names = args.scenario or list(scenarios.keys())
+    report = []
+    for name in names:
+        steps = scenarios[name]
+        res = pareto_frontier(steps, measure_memory=True)
+        report.append({
+            "scenario": name,
+            "paths": res.n_paths,
+            "frontier_size": len(res.frontier),
+            "max_candidates": res.max_candidates,
+            "seconds": res.seconds,
+            "peak_bytes": res.peak_bytes,
+            "frontier": [
+                {**dict(zip(DIMENSIONS, p.scores)), "total": p.total, "path": [o + 1 for o in p.path],
+                 "equivalent_paths": p.n_paths, "choices": path_labels(steps, p.path)}
+                for p in res.frontier
+            ],
+        })
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    for r in report:
+        print(f"== {r['scenario']}")
+        print(f"   {r['frontier_size']} non-dominated of {r['paths']} paths "
+              f"(max {r['max_candidates']} candidates/step, {r['seconds'] * 1000:.2f} ms, "
+              f"peak {r['peak_bytes'] / 1024:.1f} KiB)")
+        for p in r["frontier"]:
+            dims = " ".join(f"{d}={p[d]:+d}" for d in DIMENSIONS)
+            path = "-".join(str(o) for o in p["path"])
+            print(f"   total={p['total']:+d}  {dims}  path={path}  (x{p['equivalent_paths']})")
+
+
+if __name__ == "__main__":
+    main()
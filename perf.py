@@ -0,0 +1,251 @@
+# perf.py
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+# ----------------------------
+# Startup / first-render timing
+# Imported first by the app, so its import time is the reference for "app
+# loaded". The first completed run of each page is recorded once per process,
+# and the intro page's one is reported (log + optional JSON file) as the
+# time-to-first-paint budget after a container restart.
+# ----------------------------
+APP_LOADED = time.perf_counter()
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib")
+STARTUP_REPORT_FILE = os.environ.get("SERIOUSGAME_STARTUP_REPORT")
+
+logger = logging.getLogger("seriousgame.perf")
+if not logger.handlers:
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+
+def seconds_since_process_start() -> float | None:
+    # Linux only: process start time from /proc, in clock ticks since boot
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - started
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.first_runs = {}
+        self.report = None
+
+    def first_render(self, page: str, run_seconds: float):
+        # cheap on every rerun after the first one for a page
+        if page in self.first_runs:
+            return
+        with self._lock:
+            if page in self.first_runs:
+                return
+            self.first_runs[page] = {
+                "run_seconds": round(run_seconds, 4),
+                "since_app_loaded_seconds": round(time.perf_counter() - APP_LOADED, 4),
+                "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+            }
+            if page == "intro" and self.report is None:
+                self._emit(page)
+
+    def _emit(self, page: str):
+        since_start = seconds_since_process_start()
+        self.report = {
+            "page": page,
+            "since_process_start_seconds": None if since_start is None else round(since_start, 4),
+            **self.first_runs[page],
+        }
+        logger.info("first %s render: %s", page, json.dumps(self.report))
+        if STARTUP_REPORT_FILE:
+            try:
+                with open(STARTUP_REPORT_FILE, "w") as f:
+                    json.dump(self.report, f, indent=2)
+            except OSError:
+                logger.exception("could not write startup report to %s", STARTUP_REPORT_FILE)
+
+
+startup = StartupTimer()
+
+
+# ----------------------------
+# Hot-path instrumentation
+# Process-wide latency histograms (fixed Prometheus-style buckets, in seconds)
+# fed by timer()/timed() around page branches and I/O/render helpers.
+# Exportable as Prometheus text exposition or as a JSON snapshot.
+# ----------------------------
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_FILE = os.environ.get("SERIOUSGAME_METRICS_FILE")
+METRICS_FILE_INTERVAL = 10.0
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        # linear interpolation inside the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, c in enumerate(self.counts):
+            upper = min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+            if c and seen + c >= rank:
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+            lower = upper
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_seconds": self.sum,
+            "mean_seconds": self.sum / self.count if self.count else 0.0,
+            "p50_seconds": self.quantile(0.5),
+            "p99_seconds": self.quantile(0.99),
+            "max_seconds": self.max,
+            "buckets": {str(b): c for b, c in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._last_file_write = 0.0
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            h = self._histograms.get(name)
+            if h is None:
+                h = self._histograms[name] = Histogram()
+            h.observe(seconds)
+
+    def timer(self, name: str):
+        return _Timer(self, name)
+
+    def names(self) -> list:
+        with self._lock:
+            return sorted(self._histograms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+    def to_json(self) -> str:
+        return json.dumps({"generated_at": time.time(), "timers": self.snapshot()}, indent=2)
+
+    def to_prometheus(self, prefix: str = "seriousgame_duration_seconds") -> str:
+        lines = [f"# HELP {prefix} Time spent in instrumented app sections.", f"# TYPE {prefix} histogram"]
+        with self._lock:
+            items = sorted(self._histograms.items())
+            for name, h in items:
+                cumulative = 0
+                for bound, c in zip(h.buckets + ("+Inf",), h.counts):
+                    cumulative += c
+                    lines.append(f'{prefix}_bucket{{section="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_sum{{section="{name}"}} {h.sum}')
+                lines.append(f'{prefix}_count{{section="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        # atomic replace, suitable for node_exporter's textfile collector
+        data = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def maybe_write_file(self):
+        # throttled export to SERIOUSGAME_METRICS_FILE (.prom or .json)
+        if not METRICS_FILE:
+            return
+        now = time.monotonic()
+        if now - self._last_file_write < METRICS_FILE_INTERVAL:
+            return
+        self._last_file_write = now
+        try:
+            self.write_textfile(METRICS_FILE)
+        except OSError:
+            logger.exception("could not write metrics to %s", METRICS_FILE)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_name", "_t0")
+
+    def __init__(self, metrics: Metrics, name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._name, time.perf_counter() - self._t0)
+        return False
+
+
+metrics = Metrics()
+
+
+def timed(name: str):
+    # decorator form of metrics.timer(name)
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with metrics.timer(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# ----------------------------
+# cProfile capture of a single rerun
+# ----------------------------
+class RunProfiler:
+    def __init__(self):
+        import cProfile
+
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> tuple:
+        # -> (pstats text report, raw .prof bytes)
+        import io
+        import marshal
+        import pstats
+
+        self._profile.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(40)
+        return out.getvalue(), marshal.dumps(stats.stats)
@@ -0,0 +1,148 @@
+# rescoring.py
+import argparse
+import json
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from game_engine import rules_version
+from perf import timed
+from scenario_analysis import impact_key, impact_tensor
+
+# ----------------------------
+# Bulk re-scoring of saved runs under the current scenario weights
+# Each scenario's impacts become a (steps x options x 5) matrix (4 dimensions
+# + total); a chunk of stored choice paths (n x steps option indices) is scored
+# with one fancy-index gather and a sum over steps. History is streamed in id
+# order, one chunk at a time, so memory stays flat however many rows exist.
+# Rows carry the rules version they were scored with; re-scoring archives the
+# superseded scores in score_history so old and new results can be compared.
+#   python rescoring.py [--db leaderboard.db] [--scenario NAME] [--apply] [--json]
+# ----------------------------
+RESCORE_CHUNK_ROWS = 50_000
+
+
+def score_paths(impacts: np.ndarray, valid: np.ndarray, paths: np.ndarray) -> tuple:
+    # paths uint8 [n, steps] -> (scores int64 [n, 5 channels], ok bool [n]);
+    # rows picking an option the scenario no longer has are flagged, not scored
+    n_steps, max_opts = valid.shape
+    idx = np.minimum(paths, max_opts - 1).astype(np.intp)
+    steps = np.arange(n_steps)
+    ok = (paths < max_opts).all(axis=1) & valid[steps, idx].all(axis=1)
+    scores = impacts[steps, idx].sum(axis=1)
+    return scores, ok
+
+
+@dataclass
+class RescoreReport:
+    scenario: str
+    rules: str
+    rows_scanned: int = 0
+    rows_rescored: int = 0
+    rows_changed: int = 0          # total differs from the stored one
+    skipped_no_path: int = 0       # saved before paths were recorded
+    skipped_incompatible: int = 0  # path does not fit the current steps/options
+    delta_total_sum: int = 0
+    max_abs_delta_total: int = 0
+    old_rules: dict = field(default_factory=dict)   # previous version -> rows
+    applied: bool = False
+    seconds: float = 0.0
+
+    @property
+    def mean_delta_total(self) -> float:
+        return self.delta_total_sum / self.rows_rescored if self.rows_rescored else 0.0
+
+    def as_dict(self) -> dict:
+        return {**self.__dict__, "mean_delta_total": self.mean_delta_total}
+
+
+def _chunk_updates(rows: list, n_steps: int, impacts: np.ndarray, valid: np.ndarray, report: RescoreReport) -> list:
+    with_path = [r for r in rows if r[1] is not None and len(r[1]) == n_steps]
+    report.skipped_no_path += sum(1 for r in rows if r[1] is None)
+    report.skipped_incompatible += len(rows) - len(with_path) - sum(1 for r in rows if r[1] is None)
+    if not with_path:
+        return []
+    paths = np.frombuffer(b"".join(bytes(r[1]) for r in with_path), dtype=np.uint8).reshape(len(with_path), n_steps)
+    old = np.array([r[3:8] for r in with_path], dtype=np.int64)
+    new, ok = score_paths(impacts, valid, paths)
+    report.skipped_incompatible += int((~ok).sum())
+    old, new = old[ok], new[ok]
+    delta = new[:, 4] - old[:, 4]
+    report.rows_rescored += len(new)
+    report.rows_changed += int((new != old).any(axis=1).sum())
+    report.delta_total_sum += int(delta.sum())
+    if len(delta):
+        report.max_abs_delta_total = max(report.max_abs_delta_total, int(np.abs(delta).max()))
+    kept = [r for r, keep in zip(with_path, ok.tolist()) if keep]
+    for r in kept:
+        key = r[2] or "unversioned"
+        report.old_rules[key] = report.old_rules.get(key, 0) + 1
+    return [
+        (r[0], r[2], *r[3:8], *scores)
+        for r, scores in zip(kept, new.tolist())
+    ]
+
+
+@timed("rescore.scenario")
+def rescore_scenario(store, name: str, steps: list, apply: bool = False,
+                     chunk_rows: int = RESCORE_CHUNK_ROWS) -> RescoreReport:
+    # dry run by default: report what would change without touching the store
+    t0 = time.perf_counter()
+    rules = rules_version(steps)
+    report = RescoreReport(scenario=name, rules=rules, applied=apply)
+    key = impact_key(steps)
+    impacts, valid = impact_tensor(key)
+    if apply:
+        store.register_rules(rules, name, json.dumps(key))
+    last_id = 0
+    while True:
+        rows = store.fetch_paths(name, after_id=last_id, limit=chunk_rows, stale_for=rules)
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        report.rows_scanned += len(rows)
+        updates = _chunk_updates(rows, len(steps), impacts, valid, report)
+        if apply and updates:
+            store.apply_rescore(updates, rules)
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def rescore_all(store, scenarios: dict, apply: bool = False, chunk_rows: int = RESCORE_CHUNK_ROWS) -> list:
+    return [rescore_scenario(store, name, steps, apply, chunk_rows) for name, steps in scenarios.items()]
+
+
+def main(argv=None):
+    from game_content import scenarios
+    from leaderboard_store import LEADERBOARD_DB, LeaderboardStore
+
+    parser = argparse.ArgumentParser(description="Re-score saved runs with the current scenario weights")
+    parser.add_argument("--db", default=LEADERBOARD_DB)
+    parser.add_argument("--scenario", action="append", help="scenario name (repeatable; default: all)")
+    parser.add_argument("--chunk-rows", type=int, default=RESCORE_CHUNK_ROWS)
+    parser.add_argument("--apply", action="store_true", help="write the new scores (default: dry run)")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a text report")
+    args = parser.parse_args(argv)
+
+    store = LeaderboardStore(args.db, legacy_csv=None)
+    selected = {name: scenarios[name] for name in (args.scenario or scenarios)}
+    report = [r.as_dict() for r in rescore_all(store, selected, args.apply, args.chunk_rows)]
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    for r in report:
+        print(f"== {r['scenario']} (rules {r['rules']}){'' if r['applied'] else ' [dry run]'}")
+        print(f"   {r['rows_rescored']} of {r['rows_scanned']} stale rows re-scored in {r['seconds'] * 1000:.1f} ms, "
+              f"{r['rows_changed']} changed; total delta mean {r['mean_delta_total']:+.2f}, "
+              f"max |{r['max_abs_delta_total']}|")
+        if r["skipped_no_path"] or r["skipped_incompatible"]:
+            print(f"   skipped: {r['skipped_no_path']} without a path, "
+                  f"{r['skipped_incompatible']} not matching the current steps")
+        for version, n in r["old_rules"].items():
+            print(f"   from {version}: {n} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# scenario_analysis.py
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from perf import timed
+
+# ----------------------------
+# Scenario outcome analysis
+# A scenario is a fixed sequence of steps whose option impacts add up, so the
+# distribution of every score over all choice paths is the convolution of the
+# per-step option distributions. We never enumerate the (options ** steps) paths.
+# The convolution is direct, not FFT: all terms are non-negative, so a path
+# share of 5**-40 keeps full relative precision and unreachable values stay
+# exactly 0 (FFT round-off is ~1e-16 absolute and would bury both).
+# ----------------------------
+DIMENSIONS = ("time", "cost", "trust", "impact")
+CHANNELS = DIMENSIONS + ("total",)
+
+
+def impact_key(steps: list) -> tuple:
+    # hashable (steps x options x dims) view of a scenario, used as memo key
+    return tuple(
+        tuple(tuple(int(impacts[d]) for d in DIMENSIONS) for _label, impacts in step["options"])
+        for step in steps
+    )
+
+
+def impact_tensor(key: tuple) -> tuple:
+    # -> (impacts int64 [steps, max_options, 5 channels], valid bool [steps, max_options])
+    n_steps = len(key)
+    max_opts = max((len(opts) for opts in key), default=0)
+    impacts = np.zeros((n_steps, max_opts, len(CHANNELS)), dtype=np.int64)
+    valid = np.zeros((n_steps, max_opts), dtype=bool)
+    for s, opts in enumerate(key):
+        if opts:
+            impacts[s, :len(opts), :4] = opts
+            valid[s, :len(opts)] = True
+    impacts[..., 4] = impacts[..., :4].sum(axis=-1)
+    return impacts, valid
+
+
+@dataclass(frozen=True)
+class OutcomeDistribution:
+    # probability of each value lo, lo+1, ..., lo+len(pmf)-1 when every option
+    # of every step is equally likely (i.e. the share of all possible strategies)
+    lo: int
+    pmf: np.ndarray
+
+    @property
+    def worst(self) -> int:
+        # sum of every step's lowest option: always reachable
+        return self.lo
+
+    @property
+    def best(self) -> int:
+        # sum of every step's highest option (the support ends there)
+        return self.lo + len(self.pmf) - 1
+
+    def share_below(self, value: int) -> float:
+        idx = int(value) - self.lo
+        if idx <= 0:
+            return 0.0
+        return float(min(1.0, self.pmf[:idx].sum()))
+
+    def share_equal(self, value: int) -> float:
+        idx = int(value) - self.lo
+        if 0 <= idx < len(self.pmf):
+            return float(self.pmf[idx])
+        return 0.0
+
+
+@dataclass(frozen=True)
+class ScenarioAnalysis:
+    n_paths: int
+    distributions: dict  # channel -> OutcomeDistribution
+
+    @property
+    def total(self) -> OutcomeDistribution:
+        return self.distributions["total"]
+
+    def percentile(self, value: int, channel: str = "total") -> float:
+        # % of possible strategies strictly beaten by this score
+        return 100.0 * self.distributions[channel].share_below(value)
+
+
+def _convolve_steps(impacts: np.ndarray, valid: np.ndarray) -> dict:
+    n_steps, _, n_channels = impacts.shape
+    counts = valid.sum(axis=1)
+    big = np.iinfo(np.int64).max
+    mins = np.where(valid[..., None], impacts, big).min(axis=1)       # [steps, channels]
+    maxs = np.where(valid[..., None], impacts, -big).max(axis=1)
+    widths = maxs - mins
+
+    # per-step pmf over the offset from that step's minimum, all channels at once
+    pmf = np.zeros((n_steps, n_channels, int(widths.max(initial=0)) + 1))
+    s_idx, o_idx = np.nonzero(valid)
+    offsets = impacts[s_idx, o_idx] - mins[s_idx]                      # [paths-options, channels]
+    weights = (1.0 / counts[s_idx])[:, None].repeat(n_channels, axis=1)
+    c_idx = np.broadcast_to(np.arange(n_channels), offsets.shape)
+    np.add.at(pmf, (s_idx[:, None].repeat(n_channels, axis=1), c_idx, offsets), weights)
+
+    out = {}
+    for c, name in enumerate(CHANNELS):
+        dist = np.ones(1)
+        for s in range(n_steps):
+            dist = np.convolve(dist, pmf[s, c, :widths[s, c] + 1])
+        out[name] = OutcomeDistribution(lo=int(mins[:, c].sum()), pmf=dist / dist.sum())
+    return out
+
+
+@lru_cache(maxsize=256)
+def _analyze(key: tuple) -> ScenarioAnalysis:
+    impacts, valid = impact_tensor(key)
+    n_paths = 1
+    for opts in key:
+        n_paths *= len(opts)
+    return ScenarioAnalysis(n_paths=n_paths, distributions=_convolve_steps(impacts, valid))
+
+
+@timed("analysis.scenario")
+def analyze_scenario(steps: list) -> ScenarioAnalysis:
+    # memoized per distinct scenario content
+    return _analyze(impact_key(steps))
+
+
+@lru_cache(maxsize=256)
+def _reachable(key: tuple) -> np.ndarray:
+    vectors = np.zeros((1, len(DIMENSIONS)), dtype=np.int64)
+    for opts in key:
+        impacts = np.asarray(opts, dtype=np.int64)
+        vectors = np.unique((vectors[:, None, :] + impacts[None, :, :]).reshape(-1, len(DIMENSIONS)), axis=0)
+    vectors.setflags(write=False)
+    return vectors
+
+
+def reachable_score_vectors(steps: list) -> np.ndarray:
+    # every distinct (time, cost, trust, impact) a finished run can end on;
+    # step-wise de-duplication keeps this small even when paths are not
+    return _reachable(impact_key(steps))
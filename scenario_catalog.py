@@ -0,0 +1,266 @@
+# scenario_catalog.py
+import hashlib
+import json
+import logging
+import marshal
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+
+from game_engine import DIMENSIONS
+
+# ----------------------------
+# Scenario catalog loaded from data files
+# Every *.json / *.toml / *.yaml file in the scenario directory holds one
+# scenario ({"name", "steps": [{"question", "options": [{"label", "impacts"}]}]})
+# or several ({"scenarios": [...]}). Files are validated and compiled once into
+# a compact form (int8 impact array + question/label string tables); compiled
+# files are cached on disk under their content hash, so a restart only stats
+# and loads. refresh() re-stats the directory (at most once per check_interval)
+# and recompiles just the files that changed.
+# Files load in name order; prefix them (01-..., 02-...) to order scenarios.
+# ----------------------------
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SCENARIO_DIR = os.environ.get("SERIOUSGAME_SCENARIO_DIR", os.path.join(_HERE, "scenarios"))
+# next to the code, not the working directory: every launch shares one cache
+SCENARIO_CACHE_DIR = os.environ.get("SERIOUSGAME_SCENARIO_CACHE", os.path.join(_HERE, ".scenario_cache"))
+CATALOG_CHECK_INTERVAL = 2.0
+SCENARIO_SUFFIXES = (".json", ".toml", ".yaml", ".yml")
+_COMPILED_FORMAT = 1
+
+logger = logging.getLogger("seriousgame.catalog")
+
+
+@dataclass(frozen=True)
+class CompiledScenario:
+    name: str
+    n_options: bytes      # options per step
+    impacts: bytes        # int8, steps x max_options x 4 dimensions, zero-padded
+    questions: tuple      # one per step
+    labels: tuple         # per step, one label per option
+
+    @property
+    def n_steps(self) -> int:
+        return len(self.n_options)
+
+    @property
+    def max_options(self) -> int:
+        return max(self.n_options, default=0)
+
+    def impact_array(self):
+        # (steps, max_options, 4) int8 view, for vectorized consumers
+        import numpy as np
+
+        return np.frombuffer(self.impacts, dtype=np.int8).reshape(self.n_steps, self.max_options, len(DIMENSIONS))
+
+    def steps(self) -> list:
+        # the nested form the game engine and analyses use
+        values = array("b", self.impacts)
+        width = self.max_options * len(DIMENSIONS)
+        out = []
+        for s, (question, labels) in enumerate(zip(self.questions, self.labels)):
+            options = []
+            for o, label in enumerate(labels):
+                base = s * width + o * len(DIMENSIONS)
+                options.append((label, dict(zip(DIMENSIONS, values[base:base + len(DIMENSIONS)]))))
+            out.append({"question": question, "options": options})
+        return out
+
+
+# ----------------------------
+# Parsing & validation
+# ----------------------------
+def _parse(path: str, raw: bytes):
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".json":
+        return json.loads(raw)
+    if suffix == ".toml":
+        import tomllib
+
+        return tomllib.loads(raw.decode("utf-8"))
+    try:
+        import yaml
+    except ImportError as exc:
+        raise ImportError(f"{path}: PyYAML is needed for YAML scenario files (pip install pyyaml)") from exc
+    return yaml.safe_load(raw)
+
+
+def _compile_one(path: str, doc) -> CompiledScenario:
+    if not isinstance(doc, dict) or not isinstance(doc.get("name"), str) or not doc["name"].strip():
+        raise ValueError(f"{path}: a scenario needs a non-empty 'name'")
+    name = doc["name"]
+    steps = doc.get("steps")
+    if not isinstance(steps, list) or not steps:
+        raise ValueError(f"{path}: scenario {name!r} needs a non-empty 'steps' list")
+    questions, labels, rows = [], [], []
+    for s, step in enumerate(steps, 1):
+        where = f"{path}: scenario {name!r} step {s}"
+        if not isinstance(step, dict) or not isinstance(step.get("question"), str):
+            raise ValueError(f"{where}: needs a 'question' string")
+        options = step.get("options")
+        # choice paths store one byte per step
+        if not isinstance(options, list) or not 1 <= len(options) <= 255:
+            raise ValueError(f"{where}: needs 1 to 255 'options'")
+        step_labels, step_rows = [], []
+        for o, option in enumerate(options, 1):
+            if not isinstance(option, dict) or not isinstance(option.get("label"), str):
+                raise ValueError(f"{where} option {o}: needs a 'label' string")
+            impacts = option.get("impacts")
+            if not isinstance(impacts, dict) or set(impacts) != set(DIMENSIONS):
+                raise ValueError(f"{where} option {o}: 'impacts' must have exactly {', '.join(DIMENSIONS)}")
+            values = [impacts[d] for d in DIMENSIONS]
+            if not all(type(v) is int and -128 <= v <= 127 for v in values):
+                raise ValueError(f"{where} option {o}: impacts must be integers in -128..127")
+            step_labels.append(option["label"])
+            step_rows.append(values)
+        questions.append(step["question"])
+        labels.append(tuple(step_labels))
+        rows.append(step_rows)
+    max_options = max(len(r) for r in rows)
+    flat = array("b")
+    for step_rows in rows:
+        for values in step_rows:
+            flat.extend(values)
+        flat.extend([0] * (len(DIMENSIONS) * (max_options - len(step_rows))))
+    return CompiledScenario(
+        name=name,
+        n_options=bytes(len(r) for r in rows),
+        impacts=flat.tobytes(),
+        questions=tuple(questions),
+        labels=tuple(labels),
+    )
+
+
+def compile_file(path: str, raw: bytes) -> list:
+    doc = _parse(path, raw)
+    docs = doc["scenarios"] if isinstance(doc, dict) and "scenarios" in doc else [doc]
+    if not isinstance(docs, list):
+        raise ValueError(f"{path}: 'scenarios' must be a list")
+    return [_compile_one(path, d) for d in docs]
+
+
+# ----------------------------
+# On-disk compiled cache (marshal: plain bytes/str/tuples, fast to load)
+# ----------------------------
+def _cache_path(cache_dir: str, digest: str) -> str:
+    return os.path.join(cache_dir, f"{digest}.v{_COMPILED_FORMAT}.bin")
+
+
+def _load_cached(cache_dir: str | None, digest: str) -> list | None:
+    if not cache_dir:
+        return None
+    try:
+        with open(_cache_path(cache_dir, digest), "rb") as f:
+            records = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return [CompiledScenario(*r) for r in records]
+
+
+def _store_cached(cache_dir: str | None, digest: str, compiled: list):
+    if not cache_dir:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = _cache_path(cache_dir, digest) + f".{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump([(c.name, c.n_options, c.impacts, c.questions, c.labels) for c in compiled], f)
+        os.replace(tmp, _cache_path(cache_dir, digest))
+    except OSError:
+        logger.warning("could not write the compiled scenario cache in %s", cache_dir, exc_info=True)
+
+
+# ----------------------------
+# Catalog
+# ----------------------------
+class ScenarioCatalog:
+    def __init__(self, directory: str = SCENARIO_DIR, cache_dir: str | None = SCENARIO_CACHE_DIR,
+                 check_interval: float = CATALOG_CHECK_INTERVAL):
+        self.directory = directory
+        self.cache_dir = cache_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._files = {}            # path -> (mtime_ns, size, digest, [CompiledScenario])
+        self._checked = None
+        self.version = 0            # bumped whenever the set of scenarios changes
+        self.compiled = {}          # name -> CompiledScenario, in file order
+        self.scenarios = {}         # name -> steps (nested dicts), in file order
+        self.stats = {"files": 0, "compiled": 0, "from_cache": 0, "seconds": 0.0}
+        self.refresh(force=True)
+
+    def _scan(self) -> dict:
+        found = {}
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            if entry.is_file() and entry.name.lower().endswith(SCENARIO_SUFFIXES) and not entry.name.startswith("."):
+                st = entry.stat()
+                found[entry.path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def _load_file(self, path: str) -> tuple:
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        compiled = _load_cached(self.cache_dir, digest)
+        if compiled is None:
+            compiled = compile_file(path, raw)
+            _store_cached(self.cache_dir, digest, compiled)
+            self.stats["compiled"] += 1
+        else:
+            self.stats["from_cache"] += 1
+        return digest, compiled
+
+    def refresh(self, force: bool = False) -> bool:
+        # True if the catalog changed; cheap when called on every rerun
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.check_interval:
+            return False
+        with self._lock:
+            if not force and self._checked is not None and now - self._checked < self.check_interval:
+                return False
+            self._checked = now
+            t0 = time.perf_counter()
+            found = self._scan()
+            files, changed = {}, set(found) != set(self._files)
+            for path, (mtime_ns, size) in found.items():
+                old = self._files.get(path)
+                if old is not None and old[:2] == (mtime_ns, size):
+                    files[path] = old
+                    continue
+                try:
+                    digest, compiled = self._load_file(path)
+                except (ValueError, ImportError, OSError) as exc:
+                    if old is None and not self._files:
+                        raise
+                    # keep serving the last good version of a file being edited
+                    logger.error("scenario file %s rejected: %s", path, exc)
+                    if old is not None:
+                        files[path] = old
+                    continue
+                changed = changed or old is None or old[2] != digest
+                files[path] = (mtime_ns, size, digest, compiled)
+            self._files = files
+            self.stats["files"] = len(files)
+            self.stats["seconds"] = time.perf_counter() - t0
+            if not changed:
+                return False
+            first_load = not self.compiled
+            compiled = {}
+            for path, (_, _, _, scenarios) in files.items():
+                for c in scenarios:
+                    if c.name in compiled:
+                        if first_load:
+                            raise ValueError(f"{path}: duplicate scenario name {c.name!r}")
+                        logger.error("scenario file %s: duplicate scenario name %r ignored", path, c.name)
+                        continue
+                    compiled[c.name] = c
+            # unchanged scenarios keep their steps object (and the memo caches keyed on it)
+            previous, previous_compiled = self.scenarios, self.compiled
+            self.scenarios = {
+                name: previous[name] if previous_compiled.get(name) == c else c.steps()
+                for name, c in compiled.items()
+            }
+            self.compiled = compiled
+            self.version += 1
+            return True
@@ -0,0 +1,189 @@
+# session_store.py
+import abc
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from game_engine import GameState, decode_path, encode_path
+from perf import timed
+
+# ----------------------------
+# Resumable sessions
+# A game in progress is kept in st.session_state, i.e. in one server process.
+# With a session store configured, each session also saves a compact record
+# (page, scenario, step, choice path, rules version: ~100 bytes) under a random
+# resume token carried in the URL (?resume=<token>). Any replica that sees the
+# token rebuilds the game by replaying the path, so a restart or a load
+# balancer switching replicas does not lose the run (no sticky sessions).
+# A record that no longer fits the catalog (scenario removed or re-weighted,
+# unknown page, path not matching its steps) resumes on the intro page.
+#   SERIOUSGAME_SESSION_STORE=sessions.db   SQLite file (shared by processes on one host)
+#   SERIOUSGAME_SESSION_STORE=memory        in-process dict (single replica / tests)
+# Unset: sessions live in memory only, as before. A networked store (Redis,
+# a SQL server...) only needs get/put/delete/purge, see SessionStore.
+# ----------------------------
+SESSION_STORE = os.environ.get("SERIOUSGAME_SESSION_STORE")
+SESSION_TTL_SECONDS = float(os.environ.get("SERIOUSGAME_SESSION_TTL_H", "24")) * 3600
+PURGE_EVERY_PUTS = 500
+PAGES = ("intro", "game", "leaderboard", "insights", "pareto", "choices")
+_FORMAT = 2
+
+
+def new_token() -> str:
+    return secrets.token_urlsafe(12)
+
+
+def encode_session(page: str, state: GameState, rules: str | None) -> bytes:
+    return json.dumps(
+        {"v": _FORMAT, "page": page, "scenario": state.scenario, "rules": rules, "step": state.step,
+         "path": encode_path(state.choices).hex()},
+        separators=(",", ":"),
+    ).encode()
+
+
+def decode_session(data: bytes) -> dict:
+    # {"page", "scenario", "rules", "step", "choices"}; ValueError if unreadable
+    try:
+        doc = json.loads(data)
+        if doc.get("v") != _FORMAT:
+            raise ValueError(f"unsupported session format {doc.get('v')!r}")
+        return {"page": doc["page"], "scenario": doc["scenario"], "rules": doc["rules"], "step": doc["step"],
+                "choices": decode_path(bytes.fromhex(doc["path"]))}
+    except (KeyError, TypeError, AttributeError, UnicodeDecodeError) as exc:
+        raise ValueError(f"unreadable session record: {exc}") from exc
+
+
+# ----------------------------
+# Store interface and local implementations
+# ----------------------------
+class SessionStore(abc.ABC):
+    # opaque bytes under a token; implementations must be safe to share between threads
+    @abc.abstractmethod
+    def get(self, token: str) -> bytes | None:
+        ...
+
+    @abc.abstractmethod
+    def put(self, token: str, data: bytes):
+        ...
+
+    @abc.abstractmethod
+    def delete(self, token: str):
+        ...
+
+    @abc.abstractmethod
+    def purge(self, max_age: float = SESSION_TTL_SECONDS) -> int:
+        # drop sessions not written for max_age seconds; returns how many
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}             # token -> (updated, data)
+
+    def get(self, token: str) -> bytes | None:
+        item = self._data.get(token)
+        return None if item is None else item[1]
+
+    def put(self, token: str, data: bytes):
+        with self._lock:
+            self._data[token] = (time.time(), bytes(data))
+
+    def delete(self, token: str):
+        with self._lock:
+            self._data.pop(token, None)
+
+    def purge(self, max_age: float = SESSION_TTL_SECONDS) -> int:
+        cutoff = time.time() - max_age
+        with self._lock:
+            stale = [t for t, (updated, _) in self._data.items() if updated < cutoff]
+            for t in stale:
+                del self._data[t]
+        return len(stale)
+
+
+class SQLiteSessionStore(SessionStore):
+    # one upsert per state change; WAL so resumes never wait on saves
+    def __init__(self, path: str = "sessions.db"):
+        self.path = path
+        self._local = threading.local()
+        self._puts = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " token TEXT PRIMARY KEY, data BLOB NOT NULL, updated REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._connect().execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated)")
+        self.purge()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, token: str) -> bytes | None:
+        row = self._connect().execute("SELECT data FROM sessions WHERE token = ?", (token,)).fetchone()
+        return None if row is None else bytes(row[0])
+
+    @timed("sessions.put")
+    def put(self, token: str, data: bytes):
+        self._connect().execute(
+            "INSERT INTO sessions (token, data, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT (token) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+            (token, bytes(data), time.time()),
+        )
+        self._puts += 1
+        if self._puts % PURGE_EVERY_PUTS == 0:
+            self.purge()
+
+    def delete(self, token: str):
+        self._connect().execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def purge(self, max_age: float = SESSION_TTL_SECONDS) -> int:
+        cur = self._connect().execute("DELETE FROM sessions WHERE updated < ?", (time.time() - max_age,))
+        return cur.rowcount
+
+
+def open_session_store(spec: str | None = SESSION_STORE) -> SessionStore | None:
+    # None when resumable sessions are off
+    if not spec:
+        return None
+    if spec == "memory":
+        return MemorySessionStore()
+    return SQLiteSessionStore(spec.removeprefix("sqlite:///"))
+
+
+# ----------------------------
+# Resume
+# ----------------------------
+def resume(store: SessionStore, token: str, engine) -> tuple | None:
+    # (page, GameState) saved under token, replayed on the current engine;
+    # ("intro", GameState()) if the record no longer fits the catalog; None if
+    # the token is unknown or its record unreadable
+    data = store.get(token)
+    if data is None:
+        return None
+    try:
+        record = decode_session(data)
+    except ValueError:
+        return None
+    page, scenario, choices = record["page"], record["scenario"], record["choices"]
+    if page not in PAGES or record["step"] != len(choices):
+        return "intro", GameState()
+    if scenario is None:
+        return ("intro" if page == "game" else page), GameState()
+    if engine.rules.get(scenario) != record["rules"]:
+        # removed, or re-weighted since the run started
+        return "intro", GameState()
+    try:
+        return page, engine.restore(scenario, choices)
+    except ValueError:
+        return "intro", GameState()     # the path does not fit the scenario's steps
@@ -0,0 +1,62 @@
+# tests/conftest.py
+import os
+import random
+import sys
+
+import pytest
+
+# the app's modules sit flat next to v1.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard_store import LeaderboardStore  # noqa: E402
+from scenario_analysis import DIMENSIONS  # noqa: E402
+
+
+@pytest.fixture
+def make_scenario():
+    # random scenario steps; options is a count per step, or a tuple to draw each step's count from
+    def make(n_steps, options, seed, spread=3):
+        rng = random.Random(seed)
+        return [
+            {"question": f"q{s}", "options": [
+                (f"o{o}", {d: rng.randint(-spread, spread) for d in DIMENSIONS})
+                for o in range(options if isinstance(options, int) else rng.choice(options))
+            ]}
+            for s in range(n_steps)
+        ]
+
+    return make
+
+
+@pytest.fixture
+def make_entry():
+    # one leaderboard save; keyword arguments override the defaults
+    def make(i=0, **fields):
+        entry = {"Timestamp": f"2026-01-01T00:00:{i % 60:02d}", "Name": f"p{i}", "Scenario": "A",
+                 "Time": 0, "Cost": 0, "Trust": 0, "Impact": 0, "Total": 0, "Path": b"\x00", "Rules": "r"}
+        entry.update(fields)
+        return entry
+
+    return make
+
+
+@pytest.fixture
+def make_entries(make_entry):
+    # n random saves on 2026-01-<day>: scores sum to Total, paths of 3 steps x 3 options
+    def make(n, rng, day=1, scenarios=("A", "B", "C")):
+        out = []
+        for i in range(n):
+            t, c, tr, im = (rng.randint(-3, 5) for _ in range(4))
+            out.append(make_entry(
+                i, Timestamp=f"2026-01-{day:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+                Scenario=rng.choice(scenarios), Time=t, Cost=c, Trust=tr, Impact=im, Total=t + c + tr + im,
+                Path=bytes(rng.randrange(3) for _ in range(3)),
+            ))
+        return out
+
+    return make
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LeaderboardStore(str(tmp_path / "lb.db"), legacy_csv=None)
@@ -0,0 +1,76 @@
+# tests/test_leaderboard_columnar.py
+import random
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from leaderboard_columnar import StoreHistory, aggregate_store, export_columnar, import_columnar
+from leaderboard_partitions import compact
+from leaderboard_store import LeaderboardStore, SharedLeaderboard
+
+
+def _same(a, b):
+    assert a.rows == b.rows
+    assert a.means().sort_values("Scenario").reset_index(drop=True).equals(
+        b.means().sort_values("Scenario").reset_index(drop=True))
+    for channel in ("Time", "Total"):
+        assert a.histogram(channel).equals(b.histogram(channel))
+    assert a.trend().sort_values(["Day", "Scenario"]).reset_index(drop=True).equals(
+        b.trend().sort_values(["Day", "Scenario"]).reset_index(drop=True))
+
+
+def test_archived_and_live_days_aggregate_like_a_plain_scan(tmp_path, store, make_entries):
+    rng = random.Random(1)
+    for day in range(1, 6):
+        store.append_many(make_entries(50, rng, day))
+    plain, sources = aggregate_store(store, batch_rows=7)
+    assert sources["store_rows"] == 250 and sources["last_id"] == store.last_id()
+    compact(store, str(tmp_path / "archive"), keep_days=0, now="2026-01-05")
+    mixed, sources = aggregate_store(store, batch_rows=7)
+    assert sources["archived_days"] == 4 and sources["store_rows"] == 50
+    _same(plain, mixed)
+
+
+def test_store_history_folds_new_rows_and_rebuilds_on_a_new_generation(store, make_entries):
+    rng = random.Random(2)
+    store.append_many(make_entries(40, rng, 1))
+    history = StoreHistory(store, batch_rows=16)
+    first, _, _ = history.current()
+    assert history.current()[0] is first      # nothing saved: same published copy
+
+    store.append_many(make_entries(30, rng, 2))
+    store.append(make_entries(1, rng, 3)[0])
+    folded, sources, _ = history.current()
+    assert first.rows == 40                   # a published copy never changes
+    assert sources["store_rows"] == 71
+    _same(folded, aggregate_store(store)[0])
+
+    store.clear()
+    store.append_many(make_entries(5, rng, 4))
+    rebuilt, sources, _ = history.current()
+    assert rebuilt.rows == 5 and sources["store_rows"] == 5
+    _same(rebuilt, aggregate_store(store)[0])
+
+
+def test_imported_history_sorts_by_timestamp_and_imports_once(tmp_path, store, make_entries):
+    rng = random.Random(3)
+    source = LeaderboardStore(str(tmp_path / "old.db"), legacy_csv=None)
+    old = make_entries(2, rng, 1)
+    old[0]["Name"], old[1]["Name"] = "old1", "old2"
+    source.append_many(old)
+    export_columnar(source, str(tmp_path / "old.arrow"))
+
+    today = make_entries(1, rng, 20)[0]
+    today["Name"] = "today"
+    store.append(today)
+    board = SharedLeaderboard(store)
+    board.count()
+    assert import_columnar(store, str(tmp_path / "old.arrow")) == 2
+    for ascending in (False, True):
+        expected = [r[1] for r in store.fetch(sort_by="Timestamp", ascending=ascending)]
+        assert expected == (["today", "old2", "old1"] if not ascending else ["old1", "old2", "today"])
+        assert board.page(None, "Timestamp", ascending)["Name"].tolist() == expected
+    # a second import (or a file overlapping the store) adds nothing
+    assert import_columnar(store, str(tmp_path / "old.arrow")) == 0
+    assert store.count() == 3
@@ -0,0 +1,34 @@
+# tests/test_leaderboard_feed.py
+import time
+
+from leaderboard_feed import ChangeFeed
+from leaderboard_store import LeaderboardStore
+
+POLL = 0.05
+
+
+def test_one_local_save_moves_the_feed_once(store, make_entry):
+    feed = ChangeFeed(store, poll_interval=POLL)
+    assert feed.version() == 0
+    store.append(make_entry(1))
+    assert feed.version() == 1
+    time.sleep(2 * POLL)        # the poll sees the same commit and must not publish it again
+    assert feed.version() == 1
+    store.append_many([make_entry(2), make_entry(3)])
+    time.sleep(2 * POLL)
+    assert feed.version() == 2
+
+
+def test_commits_from_another_process_are_polled_once(store, make_entry):
+    feed = ChangeFeed(store, poll_interval=POLL)
+    other = LeaderboardStore(store.path, legacy_csv=None)    # no listener: stands in for another process
+    other.append(make_entry(1))
+    assert feed.wait(0, timeout=1.0) == 1
+    time.sleep(2 * POLL)
+    assert feed.version() == 1
+    other.clear()
+    time.sleep(2 * POLL)
+    assert feed.version() == 2
+    store.append(make_entry(2))
+    time.sleep(2 * POLL)
+    assert feed.version() == 3
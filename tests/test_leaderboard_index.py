@@ -0,0 +1,144 @@
+# tests/test_leaderboard_index.py
+import random
+import threading
+
+import pytest
+
+from leaderboard_index import LeaderboardIndex, ScoreRankIndex
+from leaderboard_store import SharedLeaderboard
+
+
+def _rows(n, seed=0, spread=30):
+    rng = random.Random(seed)
+    return [(rng.choice("ABC"), rng.randint(-spread, spread)) for _ in range(n)]
+
+
+def _expected_page(totals, page, page_size, ascending):
+    # positions ordered by total, ties in insertion order
+    order = sorted(range(len(totals)), key=lambda p: (totals[p] if ascending else -totals[p], p))
+    return order[page * page_size:(page + 1) * page_size]
+
+
+def _build(rows, bulk):
+    index = LeaderboardIndex()
+    if bulk:
+        index.add_many([s for s, _ in rows], [t for _, t in rows], 0)
+    else:
+        for pos, (scenario, total) in enumerate(rows):
+            index.add(scenario, total, pos)
+    return index
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_pages_and_ranks_match_sorted(bulk, seed):
+    rows = _rows(300, seed)
+    index = _build(rows, bulk)
+    for scenario in [None, "A", "B", "C"]:
+        positions = [p for p, (s, _) in enumerate(rows) if scenario is None or s == scenario]
+        totals = {p: rows[p][1] for p in positions}
+        idx = index.get(scenario)
+        assert idx.n == len(positions)
+        for ascending in (False, True):
+            order = sorted(positions, key=lambda p: (totals[p] if ascending else -totals[p], p))
+            for page_size in (1, 7, 50):
+                for page in range(len(order) // page_size + 2):
+                    assert idx.page_positions(page, page_size, ascending) == \
+                        order[page * page_size:(page + 1) * page_size]
+        for total in range(-35, 36):
+            assert idx.rank(total) == 1 + sum(1 for t in totals.values() if t > total)
+
+
+def test_mixed_bulk_and_single_adds_grow_the_range():
+    idx = ScoreRankIndex()
+    totals = [0, 1, 2]
+    idx.add_many(totals, range(3))
+    for t in [100, -100, 5, 5, 0]:
+        idx.add(t, len(totals))
+        totals.append(t)
+    idx.add_many([250, -3], [len(totals), len(totals) + 1])
+    totals += [250, -3]
+    for ascending in (False, True):
+        for page in range(4):
+            assert idx.page_positions(page, 3, ascending) == _expected_page(totals, page, 3, ascending)
+
+
+def test_copy_is_isolated_from_later_adds():
+    rows = _rows(200, seed=1)
+    old = _build(rows, bulk=True)
+    before = {s: (old.get(s).n, old.get(s).page_positions(0, 500)) for s in [None, "A", "B", "C"]}
+    new = old.copy()
+    extra = _rows(150, seed=2, spread=60) + [("D", 1)]
+    new.add_many([s for s, _ in extra[:100]], [t for _, t in extra[:100]], len(rows))
+    for pos, (scenario, total) in enumerate(extra[100:], start=len(rows) + 100):
+        new.add(scenario, total, pos)
+    for scenario, (n, page) in before.items():
+        idx = old.get(scenario)
+        assert (idx.n, idx.page_positions(0, 500)) == (n, page)
+    assert old.scenarios() == ["A", "B", "C"]
+    assert new.get(None).n == len(rows) + len(extra)
+    all_totals = [t for _, t in rows + extra]
+    assert new.get(None).page_positions(0, 40) == _expected_page(all_totals, 0, 40, False)
+
+
+def test_index_stores_positions_compactly():
+    # int32 buckets: one 4-byte slot per row in the all-scenarios index and one in its scenario's
+    import tracemalloc
+
+    rows = _rows(200_000, seed=5)
+    tracemalloc.start()
+    try:
+        index = _build(rows, bulk=True)
+        for pos, (scenario, total) in enumerate(_rows(1000, seed=6), start=len(rows)):
+            index.add(scenario, total, pos)
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert index.get(None).n == len(rows) + 1000
+    assert used / len(rows) < 16
+
+
+def test_shared_leaderboard_pages_match_the_store(store, make_entries):
+    rng = random.Random(3)
+    board = SharedLeaderboard(store)
+    for batch in (100, 1, 30, 0, 500):
+        store.append_many(make_entries(batch, rng))
+        for scenario in (None, "A"):
+            assert board.count(scenario) == store.count(scenario)
+            expected = [r[1] for r in store.fetch(scenario, limit=20, offset=20)]
+            assert board.page(scenario, page=1, page_size=20)["Name"].tolist() == expected
+
+
+def test_shared_leaderboard_readers_during_refresh(store, make_entries):
+    # readers race an appending/clearing refresher; every read sees one consistent state
+    rng = random.Random(4)
+    store.append_many(make_entries(300, rng))
+    board = SharedLeaderboard(store)
+    errors, stop = [], threading.Event()
+
+    def reader(seed):
+        r = random.Random(seed)
+        while not stop.is_set():
+            try:
+                scenario = r.choice([None, "A", "B", "Z"])
+                df = board.page(scenario, r.choice(["Total", "Timestamp"]), r.random() < 0.5, r.randint(0, 10), 25)
+                assert len(df) <= 25
+                board.top(scenario)
+                board.rank(0, scenario)
+            except Exception as exc:    # noqa: BLE001 - collected and asserted below
+                errors.append(exc)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    try:
+        for i in range(120):
+            store.append_many(make_entries(rng.randint(1, 80), rng))
+            if i % 40 == 39:
+                store.clear()
+            board.refresh()
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+    assert errors == []
@@ -0,0 +1,150 @@
+# tests/test_leaderboard_partitions.py
+import random
+import sqlite3
+
+import pytest
+
+from leaderboard_partitions import PartitionView, compact
+
+DAYS = ["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04"]
+
+
+@pytest.fixture
+def saved(store, make_entries):
+    # 4 days of 60 saves; workshop session 1 spans day 2 and half of day 3,
+    # session 2 the second half of day 4. Returns every save with its id,
+    # day and event, for brute-force filtering.
+    rng = random.Random(0)
+    out = []
+
+    def save(entries, event):
+        store.append_many(entries)
+        for e in entries:
+            out.append(dict(e, id=len(out) + 1, Day=e["Timestamp"][:10], Event=event))
+
+    events = {}
+    for d, day in enumerate(DAYS, start=1):
+        entries = make_entries(60, rng, day=d)
+        for i, e in enumerate(entries):
+            e["Name"] = f"{day}/{i}"
+        if d == 2:
+            events[1] = store.start_event("morning")
+        if d == 4:
+            save(entries[:30], None)
+            events[2] = store.start_event("afternoon")
+            save(entries[30:], events[2])
+            store.end_event()
+        elif d == 3:
+            save(entries[:30], events[1])
+            store.end_event()
+            save(entries[30:], None)
+        else:
+            save(entries, events.get(1))
+    return out
+
+
+def _expected(rows, scenario, ascending):
+    rows = [r for r in rows if scenario is None or r["Scenario"] == scenario]
+    return sorted(rows, key=lambda r: (r["Total"] if ascending else -r["Total"], r["id"]))
+
+
+def _check_view(view, rows):
+    assert view.count() == len(rows)
+    assert view.scenarios() == sorted({r["Scenario"] for r in rows})
+    for scenario in (None, "A", "B", "C"):
+        totals = [r["Total"] for r in rows if scenario is None or r["Scenario"] == scenario]
+        assert view.count(scenario) == len(totals)
+        for total in range(-13, 22, 3):
+            assert view.rank(total, scenario) == 1 + sum(1 for t in totals if t > total)
+        for ascending in (False, True):
+            order = [r["Name"] for r in _expected(rows, scenario, ascending)]
+            for page in range(3):
+                assert view.page(scenario, "Total", ascending, page, 7)["Name"].tolist() == order[page * 7:page * 7 + 7]
+    summary = {row["Scenario"]: row for row in view.summary()}
+    assert summary.get("All", {}).get("Runs", len(rows)) == len(rows)
+
+
+def _partition_totals_match_a_recount(store):
+    with sqlite3.connect(store.path) as conn:
+        stored = conn.execute("SELECT kind, key, scenario, total, count FROM partition_totals").fetchall()
+        recount = conn.execute(
+            "SELECT 'day', day, scenario, total, COUNT(*) FROM leaderboard GROUP BY day, scenario, total "
+            "UNION ALL SELECT 'event', CAST(event AS TEXT), scenario, total, COUNT(*) FROM leaderboard "
+            "WHERE event IS NOT NULL GROUP BY event, scenario, total"
+        ).fetchall()
+    return sorted(stored) == sorted(recount)
+
+
+def test_day_and_event_views_match_a_brute_force_filter(store, saved):
+    for day in DAYS:
+        _check_view(PartitionView(store, "day", day), [r for r in saved if r["Day"] == day])
+    for event in (1, 2):
+        _check_view(PartitionView(store, "event", event), [r for r in saved if r["Event"] == event])
+    assert store.partitions("event") == [("1", 90), ("2", 30)]
+    _check_view(PartitionView(store, "day", "2026-02-01"), [])
+
+
+def test_compact_with_prune_moves_old_days_out_of_sqlite(tmp_path, store, saved):
+    pytest.importorskip("pyarrow")
+    from leaderboard_partitions import archive_rows
+
+    report = compact(store, str(tmp_path / "archive"), keep_days=2, now="2026-01-05", prune=True)
+    assert [(r["day"], r["rows"], r["action"]) for r in report] == \
+        [("2026-01-01", 60, "written, pruned"), ("2026-01-02", 60, "written, pruned")]
+    archived = store.archives("day")
+    for r in report:
+        ids = [row[0] for batch in archive_rows(r["path"]) for row in batch]
+        assert ids == [s["id"] for s in saved if s["Day"] == r["day"]]
+        path, n, _, pruned = archived[r["day"]]
+        assert (path, n, pruned) == (r["path"], 60, True)
+
+    kept = [r for r in saved if r["Day"] >= "2026-01-03"]
+    assert store.count() == len(kept)
+    assert [day for day, _ in store.partitions("day")] == DAYS[2:]
+    assert _partition_totals_match_a_recount(store)
+    # session 1 keeps only its day-3 half; its views still match the rows left
+    _check_view(PartitionView(store, "event", 1), [r for r in kept if r["Event"] == 1])
+    _check_view(PartitionView(store, "day", DAYS[0]), [])
+    assert compact(store, str(tmp_path / "archive"), keep_days=2, now="2026-01-05", prune=True) == []
+
+
+def test_reads_spanning_archives_and_sqlite_see_every_row_once(tmp_path, store, saved, make_entry):
+    pytest.importorskip("pyarrow")
+    from leaderboard_columnar import StoreHistory, aggregate_store, export_columnar
+    from leaderboard_partitions import read_archive
+
+    def check_reads():
+        path = str(tmp_path / "export.arrow")
+        assert export_columnar(store, path, batch_rows=25) == len(saved)
+        table = read_archive(path)
+        assert sorted(zip(table.column("id").to_pylist(), table.column("Name").to_pylist())) == \
+            [(r["id"], r["Name"]) for r in saved]
+        agg, sources = aggregate_store(store, batch_rows=16)
+        assert agg.rows == len(saved) == sources["archived_rows"] + sources["store_rows"]
+        assert history.current()[0].rows == len(saved)
+
+    history = StoreHistory(store, batch_rows=16)
+    archive = tmp_path / "archive"
+    compact(store, str(archive), keep_days=0, now="2026-01-03")                 # days 1-2 copied
+    check_reads()
+    compact(store, str(archive), keep_days=1, now="2026-01-05", prune=True)     # then pruned, with day 3
+    assert store.count() == 60
+    check_reads()
+
+    # a late save to a pruned day is read from SQLite until the next compact
+    # merges it into the day's archive; its scenario then only exists there
+    late = make_entry(1, Timestamp="2026-01-02T23:59:59", Name="late", Scenario="Z", Total=99)
+    store.append(late)
+    saved.append(dict(late, id=len(saved) + 1, Day="2026-01-02", Event=None))
+    check_reads()
+    report = compact(store, str(archive), keep_days=1, now="2026-01-05", prune=True)
+    assert [(r["day"], r["rows"], r["action"]) for r in report] == [("2026-01-02", 61, "merged, pruned")]
+    assert store.count() == 60
+    check_reads()
+    assert len(list(archive.iterdir())) == 3        # the superseded file is gone
+
+    store.clear()
+    assert aggregate_store(store)[0].rows == 0
+    dropped = compact(store, str(archive), keep_days=1, now="2026-01-05", prune=True)
+    assert [r["action"] for r in dropped] == ["dropped"] * 3
+    assert store.archives("day") == {} and list(archive.iterdir()) == []
@@ -0,0 +1,61 @@
+# tests/test_leaderboard_store.py
+import random
+from collections import Counter
+
+import pytest
+
+from leaderboard_store import LeaderboardStore
+
+HEADER = "Timestamp,Name,Scenario,Time,Cost,Trust,Impact,Total\n"
+
+
+@pytest.mark.parametrize("content", [
+    b"",                                            # empty file
+    b"\xff\xfe\x00garbage\x00\x01\x02",             # not text
+    b"a,b\n1,2,3,4,5\n\"unterminated\n",            # not a leaderboard
+    HEADER.encode(),                                # header only
+])
+def test_bad_legacy_csv_does_not_block_startup(tmp_path, content, make_entry):
+    csv_path = tmp_path / "leaderboard.csv"
+    csv_path.write_bytes(content)
+    store = LeaderboardStore(str(tmp_path / "lb.db"), legacy_csv=str(csv_path))
+    assert store.count() == 0
+    store.append(make_entry())
+    assert store.count() == 1
+
+
+def test_legacy_csv_keeps_only_valid_rows_once(tmp_path):
+    csv_path = tmp_path / "leaderboard.csv"
+    csv_path.write_text(
+        HEADER
+        + "2025-05-01T10:00:00,ana,S1,1,2,3,4,10\n"
+        + "2025-05-01T10:05:00,bob,S1,x,2,3,4,9\n"      # non-numeric score
+        + "not a date,cy,S2,1,1,1,1,4\n"
+        + "2025-05-02T09:00:00,dee,S2,-1,0,2,1,2\n"
+    )
+    store = LeaderboardStore(str(tmp_path / "lb.db"), legacy_csv=str(csv_path))
+    assert sorted(r[1] for r in store.fetch()) == ["ana", "dee"]
+    assert dict(store.partitions("day")) == {"2025-05-01": 1, "2025-05-02": 1}
+    # reopening does not import again
+    store = LeaderboardStore(str(tmp_path / "lb.db"), legacy_csv=str(csv_path))
+    assert store.count() == 2
+
+
+def test_choice_counts_match_a_recount_of_saved_paths(store, make_entries, make_entry):
+    rng = random.Random(0)
+    saved = make_entries(200, rng)
+    store.append_many(saved[:150])
+    for entry in saved[150:]:
+        store.append(entry)
+    store.append(make_entry(1, Path=None))                  # saved before paths were recorded
+    store.append_many([make_entry(2, Path=b"\x01\x02\x00\x01"), make_entry(3, Path=b"")])
+    assert store.append_missing(saved[:10]) == 0            # duplicates are not counted again
+    for scenario in ("A", "B", "C"):
+        recount = Counter(
+            (step, option) for _, path, *_ in store.fetch_paths(scenario) if path for step, option in enumerate(path)
+        )
+        assert store.choice_counts(scenario) == dict(recount)
+    store.clear()
+    assert [store.choice_counts(s) for s in ("A", "B", "C")] == [{}, {}, {}]
+    store.append(make_entry(4, Path=b"\x02"))
+    assert store.choice_counts("A") == {(0, 2): 1}
@@ -0,0 +1,85 @@
+# tests/test_leaderboard_writer.py
+import threading
+
+import pytest
+
+from leaderboard_writer import WriteBehindWriter
+
+
+def test_flush_drains_below_the_batch_thresholds(store, make_entry):
+    # neither threshold would fire for an hour: only flush() commits
+    writer = WriteBehindWriter(store, batch_size=1000, flush_interval=3600)
+    try:
+        for i in range(10):
+            writer.submit(make_entry(i))
+        assert store.count() == 0
+        assert writer.flush(timeout=10)
+        assert store.count() == 10
+        assert writer.metrics()["queued_rows"] == 0
+    finally:
+        writer.close()
+
+
+def test_batches_never_exceed_batch_size(store, make_entry):
+    writer = WriteBehindWriter(store, batch_size=7, flush_interval=3600)
+    try:
+        for i in range(50):
+            writer.submit(make_entry(i))
+        assert writer.flush(timeout=10)
+        m = writer.metrics()
+        assert store.count() == m["rows_committed"] == 50
+        assert m["max_batch_rows"] <= 7
+    finally:
+        writer.close()
+
+
+def test_close_drains_the_buffer_and_rejects_new_saves(store, make_entry):
+    writer = WriteBehindWriter(store, batch_size=1000, flush_interval=3600)
+    threads = [threading.Thread(target=lambda k=k: [writer.submit(make_entry(k * 100 + i)) for i in range(25)])
+               for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+    assert store.count() == 100
+    assert sorted(r[1] for r in store.fetch()) == sorted(f"p{k * 100 + i}" for k in range(4) for i in range(25))
+    with pytest.raises(RuntimeError):
+        writer.submit(make_entry(0))
+
+
+class _FlakyStore:
+    # fails the first append_many, then delegates
+    def __init__(self, store):
+        self.store = store
+        self.failures = 1
+
+    def append_many(self, entries):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk unavailable")
+        return self.store.append_many(entries)
+
+
+def test_failed_batch_is_retried_not_lost(store, make_entry):
+    writer = WriteBehindWriter(_FlakyStore(store), batch_size=5, flush_interval=0.01)
+    try:
+        for i in range(5):
+            writer.submit(make_entry(i))
+        assert writer.flush(timeout=10)
+        assert store.count() == 5
+        assert writer.metrics()["errors"] == 1
+    finally:
+        writer.close()
+
+
+def test_flush_timeout_reports_undrained_buffer(store, make_entry):
+    writer = WriteBehindWriter(_FlakyStore(store), batch_size=5, flush_interval=3600)
+    writer.store.failures = 10 ** 6
+    try:
+        writer.submit(make_entry(0))
+        assert writer.flush(timeout=0.2) is False
+    finally:
+        writer.store.failures = 0
+        writer.close()
+    assert store.count() == 1
@@ -0,0 +1,51 @@
+# tests/test_pareto.py
+import itertools
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from pareto import _non_dominated, pareto_frontier
+from scenario_analysis import DIMENSIONS
+
+
+def _score(steps, path):
+    return tuple(sum(steps[s]["options"][o][1][d] for s, o in enumerate(path)) for d in DIMENSIONS)
+
+
+def _dominates(a, b):
+    return all(x >= y for x, y in zip(a, b)) and a != b
+
+
+@pytest.mark.parametrize("n_steps,options,seed", [(1, 3, 0), (4, 3, 1), (5, (2, 3, 4), 2), (6, 3, 3), (3, 6, 4)])
+def test_frontier_matches_exhaustive_enumeration(n_steps, options, seed, make_scenario):
+    steps = make_scenario(n_steps, options, seed)
+    paths = list(itertools.product(*(range(len(step["options"])) for step in steps)))
+    reached = Counter(_score(steps, path) for path in paths)
+    expected = {v for v in reached if not any(_dominates(w, v) for w in reached)}
+
+    result = pareto_frontier(steps)
+    assert result.n_paths == len(paths)
+    assert {p.scores for p in result.frontier} == expected
+    for point in result.frontier:
+        assert _score(steps, point.path) == point.scores
+        assert point.n_paths == reached[point.scores]
+    totals = [p.total for p in result.frontier]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_non_dominated_mask_across_chunks():
+    rng = np.random.default_rng(0)
+    vectors = np.unique(rng.integers(-20, 20, size=(3000, 4)), axis=0)   # > one 1024-row chunk
+    mask = _non_dominated(vectors)
+    for i, v in enumerate(vectors):
+        dominated = bool(((vectors >= v).all(axis=1) & (vectors != v).any(axis=1)).any())
+        assert mask[i] == (not dominated)
+
+
+def test_measure_memory_reports_the_same_frontier(make_scenario):
+    steps = make_scenario(6, 3, seed=9)
+    plain = pareto_frontier(steps)
+    measured = pareto_frontier(steps, measure_memory=True)
+    assert measured.frontier == plain.frontier
+    assert measured.peak_bytes and measured.peak_bytes > 0
@@ -0,0 +1,98 @@
+# tests/test_rescoring.py
+import copy
+import random
+import sqlite3
+
+import pytest
+
+from game_engine import GameEngine, rules_version
+from rescoring import rescore_scenario
+
+NAME = "S"
+
+
+@pytest.fixture
+def played(store, make_scenario, make_entry):
+    # 300 runs of NAME over two days, the second day inside a workshop session,
+    # plus rows re-scoring must leave alone: another scenario, and a run saved
+    # before paths were recorded
+    steps = make_scenario(5, (2, 3, 4), seed=1)
+    engine = GameEngine({NAME: steps})
+    rng = random.Random(0)
+    for day in (1, 2):
+        if day == 2:
+            store.start_event("workshop")
+        entries = []
+        for i in range(150):
+            state = engine.restore(NAME, [rng.randrange(len(step["options"])) for step in steps])
+            entries.append(engine.result_entry(state, f"p{i}", f"2026-01-0{day}T10:{i // 60:02d}:{i % 60:02d}"))
+        store.append_many(entries)
+    store.append(make_entry(1, Scenario="T", Total=3, Path=b"\x00\x01"))
+    store.append(make_entry(2, Scenario=NAME, Total=-5, Path=None, Rules=None))
+    return steps
+
+
+def _edit(steps, seed):
+    # new weights for one option of every step
+    rng = random.Random(seed)
+    edited = copy.deepcopy(steps)
+    for step in edited:
+        _label, impacts = step["options"][rng.randrange(len(step["options"]))]
+        impacts[rng.choice(sorted(impacts))] += rng.choice([-3, -2, 2, 3])
+    return edited
+
+
+def _rows(store, scenario=NAME):
+    # {id: (path, rules, time, cost, trust, impact, total)}
+    return {r[0]: r[1:] for r in store.fetch_paths(scenario)}
+
+
+def test_rescored_rows_match_a_fresh_replay(store, played):
+    edited = _edit(played, seed=2)
+    before = _rows(store)
+    dry = rescore_scenario(store, NAME, edited, apply=False, chunk_rows=64)
+    assert _rows(store) == before
+    report = rescore_scenario(store, NAME, edited, apply=True, chunk_rows=64)
+    assert (report.rows_rescored, report.skipped_no_path) == (300, 1)
+    assert report.rows_changed == dry.rows_changed > 0
+
+    engine = GameEngine({NAME: edited})
+    for row_id, (path, rules, *scores) in _rows(store).items():
+        if path is None:
+            assert (rules, *scores) == before[row_id][1:]
+            continue
+        s = engine.finish(engine.restore(NAME, list(path)))
+        assert scores == [s["time"], s["cost"], s["trust"], s["impact"], s["total"]]
+        assert rules == rules_version(edited)
+    assert _rows(store, "T")[store.count() - 1][1:] == ("r", 0, 0, 0, 0, 3)
+
+
+def test_score_history_keeps_the_superseded_scores(store, played):
+    before = _rows(store)
+    rescore_scenario(store, NAME, _edit(played, seed=3), apply=True)
+    for row_id, (path, rules, *scores) in before.items():
+        history = [h[:6] for h in store.score_history(row_id)]
+        assert history == ([] if path is None else [(rules, *scores)])
+
+
+def test_partition_totals_match_a_recount(store, played):
+    rescore_scenario(store, NAME, _edit(played, seed=4), apply=True, chunk_rows=50)
+    with sqlite3.connect(store.path) as conn:
+        stored = conn.execute("SELECT kind, key, scenario, total, count FROM partition_totals").fetchall()
+        recount = conn.execute(
+            "SELECT 'day', day, scenario, total, COUNT(*) FROM leaderboard GROUP BY day, scenario, total "
+            "UNION ALL SELECT 'event', CAST(event AS TEXT), scenario, total, COUNT(*) FROM leaderboard "
+            "WHERE event IS NOT NULL GROUP BY event, scenario, total"
+        ).fetchall()
+    assert sorted(stored) == sorted(recount)
+    assert {kind for kind, *_ in stored} == {"day", "event"}
+
+
+def test_second_run_with_the_same_rules_updates_nothing(store, played):
+    edited = _edit(played, seed=5)
+    rescore_scenario(store, NAME, edited, apply=True)
+    rows, generation = _rows(store), store.state()[1]
+    again = rescore_scenario(store, NAME, edited, apply=True)
+    assert (again.rows_scanned, again.rows_rescored) == (1, 0)     # only the row without a path is still stale
+    assert _rows(store) == rows
+    assert store.state()[1] == generation      # no rescore transaction: cached boards stay valid
@@ -0,0 +1,54 @@
+# tests/test_scenario_analysis.py
+import itertools
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from scenario_analysis import CHANNELS, DIMENSIONS, analyze_scenario, reachable_score_vectors
+
+
+def _channel(impacts, name):
+    return sum(impacts.values()) if name == "total" else impacts[name]
+
+
+@pytest.mark.parametrize("n_steps,options,seed", [(1, 3, 0), (4, 3, 1), (5, (2, 3, 4), 2), (6, 2, 3), (3, 5, 4)])
+def test_distribution_matches_enumeration(n_steps, options, seed, make_scenario):
+    steps = make_scenario(n_steps, options, seed)
+    analysis = analyze_scenario(steps)
+    paths = list(itertools.product(*(step["options"] for step in steps)))
+    assert analysis.n_paths == len(paths)
+    for name in CHANNELS:
+        values = Counter(sum(_channel(impacts, name) for _label, impacts in path) for path in paths)
+        dist = analysis.distributions[name]
+        assert (dist.worst, dist.best) == (min(values), max(values))
+        expected = np.array([values.get(v, 0) / len(paths) for v in range(dist.lo, dist.best + 1)])
+        np.testing.assert_allclose(dist.pmf, expected, rtol=1e-12, atol=0)
+        assert all(dist.share_equal(v) == 0.0 for v in range(dist.lo, dist.best + 1) if v not in values)
+        for v in range(dist.lo - 1, dist.best + 2):
+            below = sum(n for value, n in values.items() if value < v) / len(paths)
+            assert analysis.percentile(v, name) == pytest.approx(100 * below, abs=1e-9)
+
+
+@pytest.mark.parametrize("n_steps,options", [(25, 4), (40, 3), (40, 5), (60, 4)])
+def test_long_scenarios_keep_exact_extremes(n_steps, options, make_scenario):
+    steps = make_scenario(n_steps, options, seed=n_steps * options)
+    analysis = analyze_scenario(steps)
+    for name in CHANNELS:
+        per_step = [[_channel(impacts, name) for _label, impacts in step["options"]] for step in steps]
+        dist = analysis.distributions[name]
+        assert dist.worst == sum(min(v) for v in per_step)
+        assert dist.best == sum(max(v) for v in per_step)
+        # the single all-best and all-worst paths are counted, however small their share
+        top_paths = np.prod([v.count(max(v)) for v in per_step], dtype=float)
+        assert dist.share_equal(dist.best) == pytest.approx(top_paths / analysis.n_paths, rel=1e-9)
+        assert dist.pmf.sum() == pytest.approx(1.0)
+
+
+def test_reachable_vectors_match_enumeration(make_scenario):
+    steps = make_scenario(4, 3, seed=7)
+    expected = {
+        tuple(sum(impacts[d] for _label, impacts in path) for d in DIMENSIONS)
+        for path in itertools.product(*(step["options"] for step in steps))
+    }
+    assert set(map(tuple, reachable_score_vectors(steps).tolist())) == expected
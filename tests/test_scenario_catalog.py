@@ -0,0 +1,77 @@
+# tests/test_scenario_catalog.py
+import json
+import os
+import shutil
+
+import pytest
+
+from game_engine import DIMENSIONS
+from scenario_catalog import SCENARIO_DIR, ScenarioCatalog
+
+
+def _json_steps(doc) -> list:
+    # a scenario file's steps in the nested form ScenarioCatalog.scenarios serves
+    return [
+        {"question": step["question"],
+         "options": [(o["label"], {d: o["impacts"][d] for d in DIMENSIONS}) for o in step["options"]]}
+        for step in doc["steps"]
+    ]
+
+
+def _touch(path, content: str):
+    # rewrite a scenario file with a new mtime, so refresh() sees it even within one clock tick
+    with open(path, "w") as f:
+        f.write(content)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_compiled_catalog_equals_the_json_source(tmp_path):
+    catalog = ScenarioCatalog(SCENARIO_DIR, cache_dir=str(tmp_path))
+    expected = {}
+    for name in sorted(os.listdir(SCENARIO_DIR)):
+        if name.endswith(".json"):
+            with open(os.path.join(SCENARIO_DIR, name)) as f:
+                doc = json.load(f)
+            expected[doc["name"]] = _json_steps(doc)
+    assert list(catalog.scenarios) == list(expected)        # file order
+    assert catalog.scenarios == expected
+    for name, compiled in catalog.compiled.items():
+        assert compiled.impact_array().shape == (len(expected[name]), compiled.max_options, len(DIMENSIONS))
+
+
+def test_a_second_load_reads_the_marshal_cache(tmp_path):
+    first = ScenarioCatalog(SCENARIO_DIR, cache_dir=str(tmp_path))
+    n_files = first.stats["files"]
+    assert (first.stats["compiled"], first.stats["from_cache"]) == (n_files, 0)
+    assert len(os.listdir(tmp_path)) == n_files
+    second = ScenarioCatalog(SCENARIO_DIR, cache_dir=str(tmp_path))
+    assert (second.stats["compiled"], second.stats["from_cache"]) == (0, n_files)
+    assert second.compiled == first.compiled and second.scenarios == first.scenarios
+
+
+@pytest.mark.parametrize("edit", [
+    lambda doc: "{ not json",                                                   # half-saved file
+    lambda doc: json.dumps(dict(doc, steps=[])),                                # valid JSON, invalid scenario
+    lambda doc: json.dumps(dict(doc, steps=[dict(doc["steps"][0], options=[
+        {"label": "x", "impacts": {"time": 1}}])])),                            # impacts missing dimensions
+])
+def test_a_rejected_edit_keeps_the_last_good_catalog(tmp_path, edit):
+    directory = tmp_path / "scenarios"
+    directory.mkdir()
+    source = os.path.join(SCENARIO_DIR, "01-automated-purchase-orders.json")
+    path = shutil.copy(source, directory / "01.json")
+    with open(source) as f:
+        doc = json.load(f)
+    catalog = ScenarioCatalog(str(directory), cache_dir=str(tmp_path / "cache"))
+    good, version = catalog.scenarios, catalog.version
+
+    for _ in range(2):      # still served while the file stays broken across checks
+        _touch(path, edit(doc))
+        assert catalog.refresh(force=True) is False
+        assert catalog.scenarios is good and catalog.version == version
+
+    doc["steps"][0]["options"][0]["impacts"]["cost"] += 1
+    _touch(path, json.dumps(doc))
+    assert catalog.refresh(force=True) is True
+    assert catalog.scenarios == {doc["name"]: _json_steps(doc)} and catalog.version == version + 1
@@ -0,0 +1,100 @@
+# tests/test_session_store.py
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+import session_store
+from game_engine import GameEngine, GameState
+from session_store import (MemorySessionStore, SessionStore, SQLiteSessionStore, decode_session, encode_session,
+                           resume)
+
+
+@pytest.fixture
+def engine(make_scenario):
+    return GameEngine({"S": make_scenario(4, 3, seed=1), "T": make_scenario(2, 2, seed=2)})
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    # a store factory; a new SQLite instance reopens the same file
+    if request.param == "memory":
+        store = MemorySessionStore()
+        return lambda: store
+    return lambda: SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_encode_decode_round_trip(engine):
+    state = engine.restore("S", [2, 0, 1])
+    record = decode_session(encode_session("game", state, engine.rules["S"]))
+    assert record == {"page": "game", "scenario": "S", "rules": engine.rules["S"], "step": 3, "choices": [2, 0, 1]}
+    assert decode_session(encode_session("intro", GameState(), None))["choices"] == []
+    for bad in (b"", b"not json", b"[]", b'{"v": 1, "page": "game"}', b'{"v": 2, "page": "game"}'):
+        with pytest.raises(ValueError):
+            decode_session(bad)
+
+
+def test_sessions_resume_from_a_new_store_and_engine(engine, backend):
+    writer = backend()
+    writer.put("a", encode_session("game", engine.restore("S", [1, 1]), engine.rules["S"]))
+    writer.put("b", encode_session("leaderboard", engine.restore("T", [0, 1]), engine.rules["T"]))
+    writer.put("c", encode_session("pareto", GameState(), None))
+    writer.put("a", encode_session("game", engine.restore("S", [1, 1, 2]), engine.rules["S"]))   # latest write wins
+
+    replica = GameEngine(copy.deepcopy(engine.scenarios))
+    reader = backend()
+    page, state = resume(reader, "a", replica)
+    assert (page, state.scenario, state.step, state.choices) == ("game", "S", 3, [1, 1, 2])
+    assert state.scores == engine.restore("S", [1, 1, 2]).scores
+    page, state = resume(reader, "b", replica)
+    assert page == "leaderboard" and replica.is_finished(state)
+    assert resume(reader, "c", replica) == ("pareto", GameState())
+    assert resume(reader, "missing", replica) is None
+    reader.put("junk", b"\xff")
+    assert resume(reader, "junk", replica) is None
+    reader.delete("a")
+    assert backend().get("a") is None and resume(reader, "a", replica) is None
+
+
+def test_purge_drops_only_stale_sessions(backend, monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(session_store, "time", SimpleNamespace(time=lambda: clock[0]))
+    store = backend()
+    store.put("old", b"1")
+    clock[0] += 3600
+    store.put("new", b"2")
+    clock[0] += 60
+    assert store.purge(max_age=1800) == 1
+    assert (store.get("old"), backend().get("new")) == (None, b"2")
+    assert store.purge(max_age=1800) == 0
+
+
+def test_resume_after_the_catalog_changed_falls_back_to_intro(engine):
+    store = MemorySessionStore()
+    store.put("s", encode_session("game", engine.restore("S", [2, 2]), engine.rules["S"]))
+    store.put("t", encode_session("choices", engine.restore("T", [1]), engine.rules["T"]))
+    assert resume(store, "s", engine)[1].choices == [2, 2]
+
+    reweighted = copy.deepcopy(engine.scenarios["S"])
+    reweighted[0]["options"][2][1]["cost"] += 5
+    changed = GameEngine({"S": reweighted, "T": engine.scenarios["T"]})
+    assert resume(store, "s", changed) == ("intro", GameState())
+    assert resume(store, "t", changed)[0] == "choices"                  # untouched scenario still resumes
+    assert resume(store, "t", GameEngine({"S": engine.scenarios["S"]})) == ("intro", GameState())   # removed
+
+    # records that do not fit their own scenario or the app's pages
+    store.put("page", encode_session("settings", engine.restore("S", [0]), engine.rules["S"]))
+    store.put("long", encode_session("game", GameState("T", 3, choices=[0, 0, 0]), engine.rules["T"]))
+    store.put("step", encode_session("game", GameState("S", 5, choices=[0]), engine.rules["S"]))
+    store.put("empty", encode_session("game", GameState(), None))
+    for token in ("page", "long", "step", "empty"):
+        assert resume(store, token, engine) == ("intro", GameState()), token
+
+
+def test_an_incomplete_backend_fails_at_construction():
+    class GetOnly(SessionStore):
+        def get(self, token):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -1,57 +1,72 @@
 # streamlit_app.py
+import time
+_run_started = time.perf_counter()
+
+import perf
 import streamlit as st
-import pandas as pd
 import os
-import matplotlib.pyplot as plt
-import numpy as np
-from datetime import datetime
+import threading
+
+# Heavy libraries (pandas, numpy, matplotlib) are imported lazily by the pages
+# and helpers that need them, so the intro page loads none of them.
+from game_content import catalog, APP_CSS
+from game_engine import GameEngine, GameState
+from charts import render_spiderchart, prewarm_spiderchart_cache
+from leaderboard_store import LeaderboardStore, SharedLeaderboard
+from leaderboard_writer import WriteBehindWriter
+from leaderboard_feed import ChangeFeed
+from leaderboard_partitions import PartitionView, today
+from session_store import SESSION_STORE, encode_session, new_token, open_session_store, resume
 
 # ----------------------------
 # Page config & visual theme
 # ----------------------------
 st.set_page_config(page_title="Data Governance Serious Game", page_icon="🚀", layout="wide")
 
-# Minimal CSS to improve look
-st.markdown(
-    """
-    <style>
-    /* App background and text */
-    .stApp {
-        background: #f7f9fb;
-        color: #0f1720;
-    }
-    /* Buttons */
-    .stButton>button {
-        background: linear-gradient(180deg,#0d6efd,#0a58ca);
-        color: white;
-        border-radius: 8px;
-        padding: 8px 12px;
-        font-weight: 600;
-        border: none;
-    }
-    .stButton>button:hover {
-        opacity: 0.95;
-    }
-    /* Sidebar header */
-    .css-1y0tads {  /* may vary across Streamlit versions; kept minimal */
-        font-weight:700;
-    }
-    /* Small card */
-    .card {
-        background: white;
-        padding: 1rem;
-        border-radius: 8px;
-        box-shadow: 0 2px 8px rgba(15,23,36,0.06);
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-# ----------------------------
-# Leaderboard file
-# ----------------------------
-LEADERBOARD_FILE = "leaderboard.csv"
+# Minimal CSS to improve look (string built once per process in game_content)
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# ----------------------------
+# Admin mode (opt-in): set SERIOUSGAME_ADMIN_TOKEN and open the app with ?admin=<token>
+# to get the performance panel; add &profile=1 to cProfile a single rerun.
+# ----------------------------
+ADMIN_TOKEN = os.environ.get("SERIOUSGAME_ADMIN_TOKEN")
+is_admin = bool(ADMIN_TOKEN) and st.query_params.get("admin") == ADMIN_TOKEN
+run_profiler = None
+
+# ----------------------------
+# Leaderboard store (SQLite, shared by every session of this process)
+# ----------------------------
+@st.cache_resource
+def get_leaderboard_store() -> LeaderboardStore:
+    return LeaderboardStore()
+
+@st.cache_resource
+def get_leaderboard_feed() -> ChangeFeed:
+    # bumped by every save/clear of this process; other processes' writes are polled
+    return ChangeFeed(get_leaderboard_store())
+
+@st.cache_resource
+def get_shared_leaderboard() -> SharedLeaderboard:
+    # one in-memory leaderboard for all sessions; sessions only keep their filter widgets
+    return SharedLeaderboard(get_leaderboard_store(), get_leaderboard_feed())
+
+@st.cache_resource(max_entries=16)
+def get_partition_view(kind: str, key: str) -> PartitionView:
+    # "today" / "this workshop session" windows: reads only that partition
+    return PartitionView(get_leaderboard_store(), kind, key, get_leaderboard_feed())
+
+# Open leaderboard views re-check the feed every LIVE_REFRESH_SECONDS and
+# redraw only their live fragment (SERIOUSGAME_LIVE_REFRESH_S=0 turns it off)
+LIVE_REFRESH_SECONDS = float(os.environ.get("SERIOUSGAME_LIVE_REFRESH_S", "2")) or None
+
+# Saves are buffered and committed in batches by a background thread
+# (SERIOUSGAME_WRITE_BEHIND=0 writes synchronously instead)
+WRITE_BEHIND = os.environ.get("SERIOUSGAME_WRITE_BEHIND", "1") != "0"
+
+@st.cache_resource
+def get_leaderboard_writer() -> WriteBehindWriter:
+    return WriteBehindWriter(get_leaderboard_store())
 
 # ----------------------------
 # Interpretations (intervals specified)
@@ -87,438 +102,622 @@ def interpret_dimension(value: int, dim: str) -> str:
             return "🌍 Enterprise Impact: Governance choices enabled scaling across domains."
 
 # ----------------------------
-# Spider (radar) plot helper
-# ----------------------------
-def plot_spiderchart(scores: dict):
-    labels = [l.capitalize() for l in scores.keys()]
-    values = [scores[k] for k in scores.keys()]
-
-    # Normalize for visualization: shift range so center isn't negative (optional)
-    # We'll display raw values but map to symmetric scale for visual balance
-    max_abs = max(6, max(abs(v) for v in values))  # at least 6 for decent axes
-    scaled = [v / max_abs for v in values]
-
-    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-    scaled += scaled[:1]
-    angles += angles[:1]
-
-    fig, ax = plt.subplots(figsize=(6,6), subplot_kw=dict(polar=True))
-    ax.plot(angles, scaled, color="#0d6efd", linewidth=2)
-    ax.fill(angles, scaled, color="#0d6efd", alpha=0.25)
-
-    # labels
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(labels, fontsize=12)
-    # radial ticks: show meaningful ticks based on max_abs
-    ticks = [-max_abs, -max_abs/2, 0, max_abs/2, max_abs]
-    tick_labels = [str(int(t)) for t in ticks]
-    ax.set_yticks([t/max_abs for t in ticks])
-    ax.set_yticklabels(tick_labels)
-    ax.set_ylim(-1, 1)
-    ax.grid(color="#e6eef8")
-    plt.title("Final Scores (normalized view)", y=1.08)
-    return fig
-
-# ----------------------------
-# Story-driven scenarios (sequential lifecycle)
-# Each scenario contains 5 steps, options include score impacts
-# We'll ensure each question follows project lifecycle
-# ----------------------------
-scenarios = {
-    "Automated Purchase Orders": [
-        {
-            "question": "Step 1 — Discovery: how do you source supplier/master data for the project?",
-            "options": [
-                ("Collect Excel exports from procurement teams (fast, fragmented)",
-                 {"time": +2, "cost": +1, "trust": -2, "impact": -1}),
-                ("Expose ERP supplier APIs via IT (structured, work to integrate)",
-                 {"time": -1, "cost": -1, "trust": +1, "impact": +1}),
-                ("Invest in a supplier master-data platform (MDM) for reuse",
-                 {"time": -3, "cost": -3, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 2 — Quality: duplicates & missing fields are discovered. What is your approach?",
-            "options": [
-                ("Ask users to correct records manually (ad-hoc)",
-                 {"time": +2, "cost": +1, "trust": -2, "impact": -1}),
-                ("Automate validation rules at ingestion (pipelines)",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Launch MDM deduplication and data stewardship program",
-                 {"time": -3, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 3 — Metadata & lineage: AI team struggles to interpret fields. What do you do?",
-            "options": [
-                ("Document ad-hoc in Confluence (manual)",
-                 {"time": 0, "cost": -1, "trust": +1, "impact": 0}),
-                ("Create a simple data catalog with field definitions",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Deploy catalog with lineage & glossary integrated with tools",
-                 {"time": -2, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 4 — Access & security: who should access supplier data and how?",
-            "options": [
-                ("Share spreadsheets across teams (open access)",
-                 {"time": +1, "cost": +2, "trust": -3, "impact": -1}),
-                ("Use SharePoint with coarse permissions",
-                 {"time": 0, "cost": -1, "trust": +1, "impact": 0}),
-                ("Implement RBAC & audit logging in platform",
-                 {"time": -1, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 5 — Scaling: pilot succeeded — what's your roll-out strategy?",
-            "options": [
-                ("Leave it as a POC in one business unit",
-                 {"time": +1, "cost": 0, "trust": -2, "impact": -2}),
-                ("Expand step-by-step with light governance",
-                 {"time": -1, "cost": -1, "trust": +1, "impact": +1}),
-                ("Design enterprise roadmap with standard pipelines & cost control",
-                 {"time": -3, "cost": -3, "trust": +3, "impact": +3})
-            ]
-        }
-    ],
-
-    "Predictive Maintenance with IoT Data": [
-        {
-            "question": "Step 1 — Discovery: plants log data in many formats. How do you onboard data?",
-            "options": [
-                ("Collect CSV exports from each plant (quick but siloed)",
-                 {"time": +3, "cost": 0, "trust": -2, "impact": -2}),
-                ("Connect to SCADA/edge via APIs (reliable streams)",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Centralize in an IoT data lake with schemas (future-proof)",
-                 {"time": -3, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 2 — Quality: sensors show noise, missing values. What approach?",
-            "options": [
-                ("Let data scientists clean case-by-case",
-                 {"time": +3, "cost": 0, "trust": -2, "impact": -2}),
-                ("Implement anomaly detection and auto-corrections",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Build full validation pipelines and monitoring",
-                 {"time": -3, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 3 — Lineage & explainability: maintenance teams ask where predictions come from. You should:",
-            "options": [
-                ("Rely on engineers' tacit knowledge",
-                 {"time": +1, "cost": 0, "trust": -3, "impact": -1}),
-                ("Document transformations in Git/Confluence",
-                 {"time": 0, "cost": -1, "trust": +1, "impact": 0}),
-                ("Deploy metadata catalog with lineage & dashboards",
-                 {"time": -2, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 4 — Compliance (AI Act): predictive maintenance may be high risk. You:",
-            "options": [
-                ("Defer compliance work until after launch",
-                 {"time": +1, "cost": +2, "trust": -2, "impact": -1}),
-                ("Document decisions, add explainability tools",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": 0}),
-                ("Set governance, audits and continuous controls",
-                 {"time": -3, "cost": -2, "trust": +3, "impact": +1})
-            ]
-        },
-        {
-            "question": "Step 5 — Scaling: pilot shows value. Rollout plan?",
-            "options": [
-                ("Keep one-off models per plant",
-                 {"time": +2, "cost": +2, "trust": -2, "impact": -3}),
-                ("Standardize processes and share best-practices",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Build central platform with reusable models & governance",
-                 {"time": -3, "cost": -3, "trust": +3, "impact": +3})
-            ]
-        }
-    ],
-
-    "GenAI Chatbot for Customers": [
-        {
-            "question": "Step 1 — Discovery & prep: content is in many formats and links broken. What do you do?",
-            "options": [
-                ("Skip cleaning, rely on embeddings (fast)",
-                 {"time": +3, "cost": 0, "trust": -2, "impact": -2}),
-                ("Standardize formats and fix links (practical)",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Tag content with metadata and lineage in a catalog",
-                 {"time": -3, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 2 — Context for LLM: managers ask for source visibility. You choose:",
-            "options": [
-                ("Deploy black-box LLM with no citations",
-                 {"time": +3, "cost": 0, "trust": -3, "impact": -2}),
-                ("Use RAG with source citations",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Train domain LLM + audit trail/dashboards",
-                 {"time": -3, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 3 — Access control: some docs are sensitive. You:",
-            "options": [
-                ("Make bot public with no restrictions",
-                 {"time": +1, "cost": 0, "trust": -3, "impact": -2}),
-                ("Maintain internal & external bots separately",
-                 {"time": 0, "cost": 0, "trust": +1, "impact": -1}),
-                ("Integrate with SSO and RBAC for granular access",
-                 {"time": -2, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 4 — Monitoring & quality: how to limit hallucinations?",
-            "options": [
-                ("Rely on users to report bad answers",
-                 {"time": +2, "cost": 0, "trust": -3, "impact": -2}),
-                ("Set up automated QA & human-in-the-loop review",
-                 {"time": -1, "cost": -1, "trust": +2, "impact": +1}),
-                ("Implement continuous evaluation + SLAs + retraining pipeline",
-                 {"time": -3, "cost": -2, "trust": +3, "impact": +2})
-            ]
-        },
-        {
-            "question": "Step 5 — Scaling: leadership requests a company-wide rollout. You:",
-            "options": [
-                ("Keep it for customer support only",
-                 {"time": +1, "cost": -2, "trust": -2, "impact": 0}),
-                ("Extend to sales and partners with light governance",
-                 {"time": -1, "cost": -1, "trust": +1, "impact": +1}),
-                ("Integrate into enterprise portals with strict governance",
-                 {"time": -3, "cost": -3, "trust": +3, "impact": +3})
-            ]
-        }
-    ]
-}
+# Scenario catalog (data files in scenarios/, compiled once per process)
+# Re-checked at most every few seconds; edited files are recompiled on their
+# own and show up on the next rerun without restarting the server.
+# ----------------------------
+catalog.refresh()
+scenarios = catalog.scenarios
+
+# ----------------------------
+# Radar chart cache pre-warm (opt-in: SERIOUSGAME_PREWARM_CHARTS=1)
+# ----------------------------
+@st.cache_resource
+def start_chart_prewarm():
+    # renders every reachable final score vector once per process, in the background
+    thread = threading.Thread(
+        target=prewarm_spiderchart_cache, args=(list(scenarios.values()),), daemon=True
+    )
+    thread.start()
+    return thread
+
+if os.environ.get("SERIOUSGAME_PREWARM_CHARTS") == "1":
+    start_chart_prewarm()
+
+# ----------------------------
+# Game rules (headless engine, see game_engine.py), one per catalog version
+# ----------------------------
+@st.cache_resource(max_entries=2)
+def get_game_engine(catalog_version: int) -> GameEngine:
+    return GameEngine(scenarios)
+
+engine = get_game_engine(catalog.version)
+
+# ----------------------------
+# Resumable sessions (opt-in: SERIOUSGAME_SESSION_STORE, see session_store.py)
+# ----------------------------
+@st.cache_resource
+def get_session_store():
+    return open_session_store(SESSION_STORE)
+
+session_store = get_session_store()
+
+def persist_session():
+    # save page + choice path under this session's resume token when they changed
+    if session_store is None:
+        return
+    game = st.session_state.game
+    fingerprint = (st.session_state.page, game.scenario, game.step)
+    if st.session_state.get("persisted") == fingerprint:
+        return
+    if "resume_token" not in st.session_state:
+        if game.scenario is None:
+            return  # nothing worth resuming yet
+        st.session_state.resume_token = new_token()
+        st.query_params["resume"] = st.session_state.resume_token
+    session_store.put(
+        st.session_state.resume_token,
+        encode_session(st.session_state.page, game, engine.rules.get(game.scenario)),
+    )
+    st.session_state.persisted = fingerprint
 
 # ----------------------------
 # Initialize session state
 # ----------------------------
+if "game" not in st.session_state and session_store is not None and st.query_params.get("resume"):
+    # a reload, a restarted server or another replica picking up a saved game
+    resumed = resume(session_store, st.query_params["resume"], engine)
+    if resumed is not None:
+        st.session_state.page, st.session_state.game = resumed
+        st.session_state.resume_token = st.query_params["resume"]
+        st.session_state.persisted = (resumed[0], resumed[1].scenario, resumed[1].step)
+    else:
+        del st.query_params["resume"]
 if "page" not in st.session_state:
     st.session_state.page = "intro"
-if "scenario" not in st.session_state:
-    st.session_state.scenario = None
-if "step" not in st.session_state:
-    st.session_state.step = 0
-if "scores" not in st.session_state:
-    st.session_state.scores = {"time": 0, "cost": 0, "trust": 0, "impact": 0}
-if "leaderboard" not in st.session_state:
-    # load leaderboard from file if exists
-    if os.path.exists(LEADERBOARD_FILE):
-        try:
-            st.session_state.leaderboard = pd.read_csv(LEADERBOARD_FILE)
-        except Exception:
-            st.session_state.leaderboard = pd.DataFrame(columns=["Timestamp","Name","Scenario","Time","Cost","Trust","Impact","Total"])
-    else:
-        st.session_state.leaderboard = pd.DataFrame(columns=["Timestamp","Name","Scenario","Time","Cost","Trust","Impact","Total"])
+if "game" not in st.session_state:
+    st.session_state.game = GameState()
+if st.session_state.game.scenario is not None and st.session_state.game.scenario not in scenarios:
+    # the scenario being played was removed from the catalog
+    st.session_state.game = GameState()
+    st.session_state.page = "intro"
 
 # ----------------------------
-# Helper: save leaderboard persistently
+# Helper: history aggregates for the Insights page, folded forward on each save
 # ----------------------------
-def save_leaderboard_df(df: pd.DataFrame):
-    df.to_csv(LEADERBOARD_FILE, index=False)
+@st.cache_resource
+def get_store_history():
+    from leaderboard_columnar import StoreHistory
+
+    return StoreHistory(get_leaderboard_store())
+
+# ----------------------------
+# Helper: save one leaderboard row persistently
+# ----------------------------
+def save_leaderboard_entry(entry: dict):
+    if WRITE_BEHIND:
+        get_leaderboard_writer().submit(entry)
+        # so this session's own leaderboard view waits for its row to land
+        st.session_state.pending_save = True
+    else:
+        get_leaderboard_store().append(entry)
 
 # ----------------------------
 # UI: Sidebar scoreboard & navigation
 # ----------------------------
-def show_sidebar():
-    st.sidebar.markdown("### 📊 Scoreboard")
-    st.sidebar.write(f"⏳ Time: {st.session_state.scores['time']}")
-    st.sidebar.write(f"💸 Cost Risk: {st.session_state.scores['cost']}")
-    st.sidebar.write(f"🔒 Trust: {st.session_state.scores['trust']}")
-    st.sidebar.write(f"📈 Business Impact: {st.session_state.scores['impact']}")
-    st.sidebar.markdown("---")
+def show_sidebar(scoreboard: bool = True):
+    # while a question is open the scoreboard lives in the question fragment instead
+    if scoreboard:
+        st.sidebar.markdown("### 📊 Scoreboard")
+        scores = st.session_state.game.scores
+        st.sidebar.write(f"⏳ Time: {scores['time']}")
+        st.sidebar.write(f"💸 Cost Risk: {scores['cost']}")
+        st.sidebar.write(f"🔒 Trust: {scores['trust']}")
+        st.sidebar.write(f"📈 Business Impact: {scores['impact']}")
+        st.sidebar.markdown("---")
     if st.sidebar.button("🏠 Restart (choose another scenario)"):
         st.session_state.page = "intro"
-        st.session_state.scenario = None
-        st.session_state.step = 0
-        st.session_state.scores = {"time": 0, "cost": 0, "trust": 0, "impact": 0}
+        st.session_state.game = GameState()
         st.rerun()
     if st.sidebar.button("🏆 View leaderboard"):
         st.session_state.page = "leaderboard"
         st.rerun()
+    if st.sidebar.button("📈 Insights"):
+        st.session_state.page = "insights"
+        st.rerun()
+    if st.sidebar.button("🧭 Facilitator: Pareto frontier"):
+        st.session_state.page = "pareto"
+        st.rerun()
+    if st.sidebar.button("📊 Facilitator: choice distribution"):
+        st.session_state.page = "choices"
+        st.rerun()
 
 # ----------------------------
-# Page: Intro
+# Live leaderboard fragment
+# Reruns on its own every LIVE_REFRESH_SECONDS (and on its widgets) without
+# rerunning the page. The shared board only touches SQLite when the change feed
+# moved, and pages/top-N are built once per data version for all viewers, so an
+# idle tick re-sends the cached frames of the unchanged version.
 # ----------------------------
-if st.session_state.page == "intro":
-    st.title("🚀 Data Governance Serious Game")
-    st.markdown(
-        """
-        **Role:** vous incarnez un décideur data qui doit piloter le déploiement d’un produit IA.  
-        **Objectif pédagogique :** comprendre l'impact des choix de gouvernance sur le **temps**, le **coût/risque**, la **confiance** et l'**impact business**.
-
-        **Dimensions mesurées**
-        - ⏳ **Time** : accélération ou retard (réparations / rework).  
-        - 💸 **Cost Risk** : exposition financière, conformité, ROI.  
-        - 🔒 **Trust** : explicabilité, adoption, conformité.  
-        - 📈 **Business Impact** : capacité à scaler et transformer.
-
-        Sélectionnez un scénario pour commencer — chaque scénario suit la logique d’un cycle de projet (Discovery → Quality → Metadata/Lineage → Compliance/Access → Scaling).
-        """
-    )
-    st.markdown("----")
-    choice = st.selectbox("👉 Choisissez un scénario", list(scenarios.keys()))
-    if st.button("Start scenario"):
-        st.session_state.scenario = choice
-        st.session_state.page = "game"
-        st.session_state.step = 0
-        st.session_state.scores = {"time": 0, "cost": 0, "trust": 0, "impact": 0}
-        st.rerun()
-    st.write("")
-    st.write("Vous pouvez consulter le leaderboard existant :")
-    if st.button("Voir le leaderboard"):
-        st.session_state.page = "leaderboard"
-        st.rerun()
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def show_live_leaderboard(board):
+    # board: the all-time SharedLeaderboard or a PartitionView (same read interface)
+    with perf.metrics.timer("ui.live_leaderboard"):
+        if board.count() == 0:
+            st.info("No entries yet — play a scenario and save your score!")
+        else:
+            if isinstance(board, PartitionView):
+                # ranking summary straight from the partition's totals histogram
+                st.dataframe(board.summary(), use_container_width=True, hide_index=True)
+            # Allow filtering by scenario and sorting
+            st.markdown("Filter & sort leaderboard")
+            scenarios_list = ["All"] + board.scenarios()
+            sel = st.selectbox("Scenario filter", scenarios_list)
+            scenario_filter = None if sel == "All" else sel
+            sort_col = st.selectbox("Sort by", ["Total", "Timestamp", "Name"], index=0)
+            ascending = st.checkbox("Ascending", value=False)
+
+            # Only the visible page is fetched from the ranking index and sent to the browser
+            n_rows = board.count(scenario_filter)
+            c1, c2 = st.columns(2)
+            with c1:
+                page_size = st.selectbox("Rows per page", [25, 50, 100], index=1)
+            n_pages = max(1, -(-n_rows // page_size))
+            with c2:
+                page_no = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+            display_df = board.page(scenario_filter, sort_by=sort_col, ascending=ascending,
+                                    page=int(page_no) - 1, page_size=page_size)
+            st.caption(f"{n_rows:,} entries")
+            # Show nicer table
+            with perf.metrics.timer("ui.dataframe"):
+                # page frames already hold exactly the leaderboard columns: no per-tick copy
+                st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+            # Rank lookup
+            game = st.session_state.game
+            if engine.is_finished(game) and (scenario_filter is None or scenario_filter == game.scenario):
+                st.markdown(f"Your last run (**{game.total}**) ranks **#{board.rank(game.total, scenario_filter)}** of {n_rows:,}.")
+            lookup = st.number_input("What rank does a total of … get?", value=0, step=1)
+            st.write(f"A total of {int(lookup)} would rank **#{board.rank(int(lookup), scenario_filter)}** among {n_rows:,} entries")
+
+            # Quick stats
+            st.markdown("#### Top performers")
+            top_n = st.number_input("Top N", min_value=1, max_value=20, value=5, step=1)
+            top_df = board.top(scenario_filter, int(top_n))
+            st.table(top_df[["Name","Scenario","Total"]])
+        if LIVE_REFRESH_SECONDS:
+            st.caption(f"🔴 Live — updates every {LIVE_REFRESH_SECONDS:g} s (feed version {get_leaderboard_feed().version()})")
 
 # ----------------------------
-# Page: Game (play steps)
+# Question panel fragment
+# Answering reruns only this fragment (scoreboard, progress, question and
+# options): the option's on_click applies the choice before the fragment
+# reruns, so no full-script st.rerun() per answer. The last answer switches
+# to the results page with one app rerun.
+# Button labels are formatted once per scenario and catalog version.
 # ----------------------------
-elif st.session_state.page == "game":
-    show_sidebar()
-    scenario_name = st.session_state.scenario
-    steps = scenarios[scenario_name]
-    step_idx = st.session_state.step
-    total_steps = len(steps)
+@st.cache_resource(max_entries=2)
+def get_option_layouts(catalog_version: int) -> dict:
+    return {}   # scenario -> per step: [(button label, widget key)], filled on first play
+
+def option_layout(scenario: str) -> list:
+    layouts = get_option_layouts(catalog.version)
+    layout = layouts.get(scenario)
+    if layout is None:
+        layout = layouts[scenario] = [
+            [
+                (f"{label}   ⏳ {i['time']:+d}  |  💸 {i['cost']:+d}  |  🔒 {i['trust']:+d}  |  📈 {i['impact']:+d}",
+                 f"opt_{step_idx}_{opt_idx}")
+                for opt_idx, (label, i) in enumerate(step["options"])
+            ]
+            for step_idx, step in enumerate(scenarios[scenario])
+        ]
+    return layout
+
+def answer_option(opt_idx: int):
+    game = st.session_state.game
+    if not engine.is_finished(game):
+        engine.choose(game, opt_idx)
+        persist_session()
+
+@st.fragment
+def show_question_panel():
+    game = st.session_state.game
+    if engine.is_finished(game):
+        st.rerun()
+    step_idx = game.step
+    total_steps = len(engine.steps(game))
+
+    scores = game.scores
+    cols = st.columns(4)
+    cols[0].metric("⏳ Time", scores["time"])
+    cols[1].metric("💸 Cost Risk", scores["cost"])
+    cols[2].metric("🔒 Trust", scores["trust"])
+    cols[3].metric("📈 Business Impact", scores["impact"])
 
     # Progress bar and remaining questions
-    progress = step_idx / total_steps
-    st.progress(progress)
+    st.progress(step_idx / total_steps)
     st.markdown(f"**Progress:** Step {step_idx+1} / {total_steps} — Remaining: {max(0, total_steps - step_idx - 1)}")
 
-    if step_idx < total_steps:
-        step = steps[step_idx]
-        st.subheader(step["question"])
-        st.write("")  # spacing
-
-        # Show options with explicit score effects
-        for opt_idx, (label, impacts) in enumerate(step["options"]):
-            # format impacts string
-            impacts_str = f"⏳ {impacts['time']:+d}  |  💸 {impacts['cost']:+d}  |  🔒 {impacts['trust']:+d}  |  📈 {impacts['impact']:+d}"
-            # Use columns to layout button and explanation
-            c1, c2 = st.columns([4,6])
-            with c1:
-                if st.button(label + "   " + impacts_str, key=f"opt_{step_idx}_{opt_idx}"):
-                    # apply impacts
-                    for d,k in impacts.items():
-                        st.session_state.scores[d] += k
-                    st.session_state.step += 1
-                    st.rerun()
-            with c2:
-                # If the option label contains explanatory text in parentheses, show it; otherwise blank
-                # Better storytelling: show concise rationale
-                st.write("")  # placeholder (could add more narrative per option)
-    else:
-        # Completed scenario
-        st.success("🎉 Scenario completed!")
-        st.markdown("## Final scores")
-        scores = st.session_state.scores.copy()
-        # Show numeric scores and interpretations
-        cols = st.columns(4)
-        dims = ["time", "cost", "trust", "impact"]
-        for i, dim in enumerate(dims):
-            with cols[i]:
-                val = scores[dim]
-                st.metric(label=dim.capitalize(), value=str(val))
-                st.caption(interpret_dimension := interpret_dimension if False else interpret_dimension)  # no-op to avoid linter noise
-                st.write(interpret_dimension(val, dim))
-
-        st.markdown("---")
-        # Spider chart
-        st.markdown("### Visual summary (radar chart)")
-        fig = plot_spiderchart(scores)
-        st.pyplot(fig)
-
-        # Total score calculation
-        total_score = sum(scores.values())
-        st.markdown(f"### Total score: **{total_score}**  (sum of four dimensions)")
-
-        # Save to leaderboard
-        st.markdown("### Save your result to the leaderboard")
-        name = st.text_input("Your name (will appear on leaderboard):", value="")
-        if st.button("Save score to leaderboard") and name.strip() != "":
-            timestamp = datetime.utcnow().isoformat()
-            entry = {
-                "Timestamp": timestamp,
-                "Name": name.strip(),
-                "Scenario": st.session_state.scenario,
-                "Time": scores["time"],
-                "Cost": scores["cost"],
-                "Trust": scores["trust"],
-                "Impact": scores["impact"],
-                "Total": total_score,
-            }
-            st.session_state.leaderboard = pd.concat([st.session_state.leaderboard, pd.DataFrame([entry])], ignore_index=True)
-            save_leaderboard_df(st.session_state.leaderboard)
-            st.success("✅ Score saved to leaderboard!")
+    st.subheader(engine.current_step(game)["question"])
+    st.write("")  # spacing
+
+    # Show options with explicit score effects
+    for opt_idx, (button_label, key) in enumerate(option_layout(game.scenario)[step_idx]):
+        # Use columns to layout button and explanation
+        c1, c2 = st.columns([4,6])
+        with c1:
+            st.button(button_label, key=key, on_click=answer_option, args=(opt_idx,))
+        with c2:
+            st.write("")  # placeholder (could add more narrative per option)
 
-        st.markdown("---")
-        st.markdown("### Key learnings")
+# ----------------------------
+# Pages (a requested cProfile covers exactly this dispatch, and is stopped
+# however the run ends: exception, st.rerun() or st.stop())
+# ----------------------------
+if is_admin and st.query_params.get("profile") == "1":
+    run_profiler = perf.RunProfiler()
+    del st.query_params["profile"]   # only this rerun
+try:
+    # ----------------------------
+    # Page: Intro
+    # ----------------------------
+    if st.session_state.page == "intro":
+        st.title("🚀 Data Governance Serious Game")
         st.markdown(
             """
-            - Lack of governance often induces **delays and rework** later; invest early in discovery, metadata and quality.  
-            - **Metadata, lineage and access controls** are enablers for scaling and explainability.  
-            - Governance drives **trust, compliance, and adoption**, which are prerequisites to realize enterprise impact.
+            **Role:** vous incarnez un décideur data qui doit piloter le déploiement d’un produit IA.  
+            **Objectif pédagogique :** comprendre l'impact des choix de gouvernance sur le **temps**, le **coût/risque**, la **confiance** et l'**impact business**.
+
+            **Dimensions mesurées**
+            - ⏳ **Time** : accélération ou retard (réparations / rework).  
+            - 💸 **Cost Risk** : exposition financière, conformité, ROI.  
+            - 🔒 **Trust** : explicabilité, adoption, conformité.  
+            - 📈 **Business Impact** : capacité à scaler et transformer.
+
+            Sélectionnez un scénario pour commencer — chaque scénario suit la logique d’un cycle de projet (Discovery → Quality → Metadata/Lineage → Compliance/Access → Scaling).
             """
         )
+        st.markdown("----")
+        choice = st.selectbox("👉 Choisissez un scénario", list(scenarios.keys()))
+        if st.button("Start scenario"):
+            st.session_state.game = engine.start(choice)
+            st.session_state.page = "game"
+            st.rerun()
+        st.write("")
+        st.write("Vous pouvez consulter le leaderboard existant :")
+        if st.button("Voir le leaderboard"):
+            st.session_state.page = "leaderboard"
+            st.rerun()
 
-        if st.button("Play another scenario"):
+    # ----------------------------
+    # Page: Game (play steps)
+    # ----------------------------
+    elif st.session_state.page == "game":
+        game = st.session_state.game
+        steps = engine.steps(game)
+
+        if not engine.is_finished(game):
+            show_sidebar(scoreboard=False)
+            show_question_panel()
+        else:
+            show_sidebar()
+            st.progress(1.0)
+            st.markdown(f"**Progress:** Step {game.step+1} / {len(steps)} — Remaining: 0")
+
+            # Completed scenario
+            st.success("🎉 Scenario completed!")
+            st.markdown("## Final scores")
+            scores = dict(game.scores)
+            # Show numeric scores and interpretations
+            cols = st.columns(4)
+            dims = ["time", "cost", "trust", "impact"]
+            for i, dim in enumerate(dims):
+                with cols[i]:
+                    val = scores[dim]
+                    st.metric(label=dim.capitalize(), value=str(val))
+                    st.caption(interpret_dimension := interpret_dimension if False else interpret_dimension)  # no-op to avoid linter noise
+                    st.write(interpret_dimension(val, dim))
+
+            st.markdown("---")
+            # Spider chart
+            st.markdown("### Visual summary (radar chart)")
+            st.image(render_spiderchart(scores), width=600)
+
+            # Total score calculation
+            total_score = engine.finish(game)["total"]
+            st.markdown(f"### Total score: **{total_score}**  (sum of four dimensions)")
+
+            # Where this run sits among every possible strategy (precomputed per scenario)
+            from scenario_analysis import analyze_scenario
+            analysis = analyze_scenario(steps)
+            st.markdown(
+                f"You beat **{analysis.percentile(total_score):.0f}%** of the {analysis.n_paths:,} possible strategies "
+                f"— reachable totals range from **{analysis.total.worst}** (worst) to **{analysis.total.best}** (best)."
+            )
+
+            # Save to leaderboard
+            st.markdown("### Save your result to the leaderboard")
+            name = st.text_input("Your name (will appear on leaderboard):", value="")
+            if st.button("Save score to leaderboard") and name.strip() != "":
+                save_leaderboard_entry(engine.result_entry(game, name))
+                st.success("✅ Score saved to leaderboard!")
+
+            st.markdown("---")
+            st.markdown("### Key learnings")
+            st.markdown(
+                """
+                - Lack of governance often induces **delays and rework** later; invest early in discovery, metadata and quality.  
+                - **Metadata, lineage and access controls** are enablers for scaling and explainability.  
+                - Governance drives **trust, compliance, and adoption**, which are prerequisites to realize enterprise impact.
+                """
+            )
+
+            if st.button("Play another scenario"):
+                st.session_state.page = "intro"
+                st.session_state.game = GameState()
+                st.rerun()
+
+            if st.button("View leaderboard"):
+                st.session_state.page = "leaderboard"
+                st.rerun()
+
+    # ----------------------------
+    # Page: Leaderboard
+    # ----------------------------
+    elif st.session_state.page == "leaderboard":
+        show_sidebar()
+        st.title("🏆 Leaderboard")
+        if st.session_state.get("pending_save"):
+            get_leaderboard_writer().flush(timeout=2.0)
+            st.session_state.pending_save = False
+        store = get_leaderboard_store()
+        event = store.current_event()
+        window = st.radio("Window", ["All time", "Today", "This workshop session"], horizontal=True)
+        if window == "Today":
+            st.caption(f"Runs saved on {today()} (UTC)")
+            show_live_leaderboard(get_partition_view("day", today()))
+        elif window == "This workshop session":
+            if event is None:
+                st.info("No workshop session is open — start one below.")
+            else:
+                st.caption(f"Session **{event[1]}**, started {event[2]} UTC")
+                show_live_leaderboard(get_partition_view("event", str(event[0])))
+        else:
+            show_live_leaderboard(get_shared_leaderboard())
+
+        # Facilitator: workshop sessions partition the leaderboard from now on
+        with st.expander("Workshop session (facilitator)"):
+            if event is not None:
+                st.write(f"Open session: **{event[1]}** (since {event[2]} UTC)")
+            label = st.text_input("Session name", value=f"Workshop {today()}")
+            c1, c2 = st.columns(2)
+            if c1.button("Start new session") and label.strip():
+                store.start_event(label.strip())
+                st.rerun()
+            if c2.button("End session", disabled=event is None):
+                store.end_event()
+                st.rerun()
+
+        # windowed views never load the all-time board; partition counts are a small table
+        has_rows = get_shared_leaderboard().count() > 0 if window == "All time" else bool(store.partitions("day"))
+        if has_rows:
+            # Option to clear leaderboard (careful)
+            if st.button("Clear leaderboard (danger!)"):
+                if WRITE_BEHIND:
+                    get_leaderboard_writer().flush(timeout=5.0)
+                store.clear()
+                st.success("Leaderboard cleared.")
+                st.rerun()
+
+            # Scenario weights changed? Re-score saved runs from their choice paths
+            with st.expander("Re-score history with the current scenario weights"):
+                preview = st.button("Preview (dry run)")
+                apply = st.button("Apply new scores")
+            if preview or apply:
+                from rescoring import rescore_all
+
+                if WRITE_BEHIND:
+                    get_leaderboard_writer().flush(timeout=5.0)
+                reports = rescore_all(get_leaderboard_store(), scenarios, apply=apply)
+                st.dataframe(
+                    [{k: r.as_dict()[k] for k in ("scenario", "rules", "rows_rescored", "rows_changed",
+                                                  "mean_delta_total", "skipped_no_path", "skipped_incompatible")}
+                     for r in reports],
+                    use_container_width=True, hide_index=True,
+                )
+                if apply:
+                    st.success(f"Re-scored {sum(r.rows_rescored for r in reports)} runs; previous scores kept in history.")
+
+        if WRITE_BEHIND:
+            with st.expander("Save pipeline metrics (write-behind)"):
+                st.json(get_leaderboard_writer().metrics())
+
+        if st.button("Back to intro"):
             st.session_state.page = "intro"
-            st.session_state.scenario = None
-            st.session_state.step = 0
-            st.session_state.scores = {"time": 0, "cost": 0, "trust": 0, "impact": 0}
             st.rerun()
 
-        if st.button("View leaderboard"):
-            st.session_state.page = "leaderboard"
+    # ----------------------------
+    # Page: Facilitator — Pareto frontier of choice paths
+    # ----------------------------
+    elif st.session_state.page == "pareto":
+        import pandas as pd
+        from pareto import pareto_frontier, path_labels
+        from scenario_analysis import DIMENSIONS
+
+        show_sidebar()
+        st.title("🧭 Pareto frontier of choice paths")
+        st.markdown(
+            "Paths that no other path beats on **all four** dimensions at once "
+            "(higher is better for Time, Cost, Trust and Impact)."
+        )
+        sel = st.selectbox("Scenario", list(scenarios.keys()))
+        steps = scenarios[sel]
+        measure = st.checkbox("Measure peak memory (slower)", value=False)
+        res = pareto_frontier(steps, measure_memory=measure)
+        mem = f", peak {res.peak_bytes / 1024:.1f} KiB" if res.peak_bytes is not None else ""
+        st.caption(
+            f"{len(res.frontier)} non-dominated of {res.n_paths:,} paths — "
+            f"max {res.max_candidates} candidates per step, computed in {res.seconds * 1000:.2f} ms{mem}"
+        )
+        rows = []
+        for p in res.frontier:
+            row = {d.capitalize(): v for d, v in zip(DIMENSIONS, p.scores)}
+            row["Total"] = p.total
+            row["Path"] = " → ".join(str(o + 1) for o in p.path)
+            row["Equivalent paths"] = p.n_paths
+            rows.append(row)
+        with perf.metrics.timer("ui.dataframe"):
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+        with st.expander("Choices for a frontier path"):
+            idx = st.number_input("Row", min_value=0, max_value=len(res.frontier) - 1, value=0, step=1)
+            for s_idx, label in enumerate(path_labels(steps, res.frontier[int(idx)].path)):
+                st.write(f"**Step {s_idx + 1}:** {label}")
+
+        if st.button("Back to intro"):
+            st.session_state.page = "intro"
+            st.rerun()
+
+    # ----------------------------
+    # Page: Insights — aggregations over the whole leaderboard history
+    # Compacted day partitions are memory-mapped Arrow/Parquet files and only the
+    # days not archived yet stream from SQLite (see leaderboard_columnar.py); the
+    # folded aggregates are small and shared by every viewer, and a save only adds
+    # its own rows to them.
+    # ----------------------------
+    elif st.session_state.page == "insights":
+        from leaderboard_columnar import CHANNELS
+
+        show_sidebar()
+        st.title("📈 Insights")
+        if st.session_state.get("pending_save"):
+            get_leaderboard_writer().flush(timeout=2.0)
+            st.session_state.pending_save = False
+        agg, sources, seconds = get_store_history().current()
+        if agg.rows == 0:
+            st.info("No entries yet — play a scenario and save your score!")
+        else:
+            st.caption(
+                f"{agg.rows:,} runs, brought up to date in {seconds * 1000:.0f} ms: "
+                f"{sources['archived_rows']:,} from {sources['archived_days']} archived days (memory-mapped), "
+                f"{sources['store_rows']:,} from the live store"
+            )
+            st.markdown("#### Mean scores per scenario")
+            st.dataframe(agg.means(), use_container_width=True, hide_index=True)
+
+            st.markdown("#### Score distributions")
+            sel = st.selectbox("Scenario", ["All"] + agg.scenarios)
+            for col, channel in zip(st.columns(len(CHANNELS)), CHANNELS):
+                with col:
+                    st.caption(channel)
+                    st.bar_chart(agg.histogram(channel, None if sel == "All" else sel), height=220)
+
+            st.markdown("#### Mean total per day")
+            trend = agg.trend()
+            st.line_chart(trend.pivot(index="Day", columns="Scenario", values="Mean Total"))
+            st.caption("Analysts: `python leaderboard_columnar.py export history.parquet` writes the full table for notebooks.")
+
+        if st.button("Back to intro"):
+            st.session_state.page = "intro"
+            st.rerun()
+
+    # ----------------------------
+    # Page: Facilitator — how players answered each step
+    # Counts come from per-option counters the store keeps up to date on every
+    # save, so this page costs steps x options regardless of how many runs exist.
+    # ----------------------------
+    elif st.session_state.page == "choices":
+        import pandas as pd
+
+        show_sidebar()
+        st.title("📊 Choice distribution")
+        if st.session_state.get("pending_save"):
+            get_leaderboard_writer().flush(timeout=2.0)
+            st.session_state.pending_save = False
+        sel = st.selectbox("Scenario", list(scenarios.keys()))
+        steps = scenarios[sel]
+        counts = get_leaderboard_store().choice_counts(sel)
+        runs = sum(counts.get((0, o), 0) for o in range(len(steps[0]["options"])))
+        st.caption(f"{runs:,} saved runs with a recorded path")
+        for s_idx, step in enumerate(steps):
+            st.markdown(f"**{step['question']}**")
+            picks = [counts.get((s_idx, o), 0) for o in range(len(step["options"]))]
+            answered = sum(picks)
+            df = pd.DataFrame({
+                "Option": [label for label, _ in step["options"]],
+                "Picks": picks,
+                "Share": [p / answered if answered else 0.0 for p in picks],
+            })
+            with perf.metrics.timer("ui.dataframe"):
+                st.dataframe(
+                    df, use_container_width=True, hide_index=True,
+                    column_config={"Share": st.column_config.ProgressColumn(format="percent", min_value=0.0, max_value=1.0)},
+                )
+
+        if st.button("Back to intro"):
+            st.session_state.page = "intro"
             st.rerun()
+finally:
+    if run_profiler is not None:
+        run_profile = run_profiler.stop()
 
 # ----------------------------
-# Page: Leaderboard
+# Admin: performance panel and single-run profile
 # ----------------------------
-elif st.session_state.page == "leaderboard":
-    show_sidebar()
-    st.title("🏆 Leaderboard")
-    df = st.session_state.leaderboard.copy()
-    if df.empty:
-        st.info("No entries yet — play a scenario and save your score!")
-    else:
-        # Allow filtering by scenario and sorting
-        st.markdown("Filter & sort leaderboard")
-        scenarios_list = ["All"] + sorted(df["Scenario"].unique().tolist())
-        sel = st.selectbox("Scenario filter", scenarios_list)
-        if sel != "All":
-            df = df[df["Scenario"] == sel].copy()
-        sort_col = st.selectbox("Sort by", ["Total", "Timestamp", "Name"], index=0)
-        ascending = st.checkbox("Ascending", value=False)
-        df = df.sort_values(by=sort_col, ascending=ascending).reset_index(drop=True)
-        # Show nicer table
-        display_df = df[["Timestamp","Name","Scenario","Time","Cost","Trust","Impact","Total"]]
-        st.dataframe(display_df, use_container_width=True)
-
-        # Quick stats
-        st.markdown("#### Top performers")
-        top_n = st.number_input("Top N", min_value=1, max_value=20, value=5, step=1)
-        top_df = df.sort_values(by="Total", ascending=False).head(top_n)
-        st.table(top_df[["Name","Scenario","Total"]].reset_index(drop=True))
-
-        # Option to clear leaderboard (careful)
-        if st.button("Clear leaderboard (danger!)"):
-            st.session_state.leaderboard = pd.DataFrame(columns=["Timestamp","Name","Scenario","Time","Cost","Trust","Impact","Total"])
-            if os.path.exists(LEADERBOARD_FILE):
-                os.remove(LEADERBOARD_FILE)
-            st.success("Leaderboard cleared.")
-            st.rerun()
+def show_admin_panel():
+    import pandas as pd
 
-    if st.button("Back to intro"):
-        st.session_state.page = "intro"
-        st.rerun()
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### ⏱️ Performance (admin)")
+    snap = perf.metrics.snapshot()
+    if snap:
+        rows = [
+            {
+                "section": name,
+                "n": h["count"],
+                "mean ms": round(h["mean_seconds"] * 1000, 2),
+                "p50 ms": round(h["p50_seconds"] * 1000, 2),
+                "p99 ms": round(h["p99_seconds"] * 1000, 2),
+                "max ms": round(h["max_seconds"] * 1000, 2),
+            }
+            for name, h in snap.items()
+        ]
+        st.sidebar.dataframe(pd.DataFrame(rows), hide_index=True)
+    st.sidebar.download_button("Prometheus text", perf.metrics.to_prometheus(), file_name="seriousgame.prom")
+    st.sidebar.download_button("JSON snapshot", perf.metrics.to_json(), file_name="seriousgame-metrics.json")
+    if WRITE_BEHIND:
+        st.sidebar.caption("Write-behind writer")
+        st.sidebar.json(get_leaderboard_writer().metrics(), expanded=False)
+    from charts import chart_cache_info
+    st.sidebar.caption(f"Chart cache: {chart_cache_info()}")
+    if st.sidebar.button("Reset timers"):
+        perf.metrics.reset()
+    st.sidebar.caption("Add &profile=1 to the URL to cProfile one rerun.")
+
+if run_profiler is not None:
+    report, raw = run_profile
+    with st.expander("cProfile of this run", expanded=True):
+        st.download_button("Download .prof", raw, file_name="rerun.prof")
+        st.code(report)
+
+# ----------------------------
+# Save the resumable state of this session (no-op unless it changed)
+# ----------------------------
+persist_session()
+
+# ----------------------------
+# Per-run timing: one histogram per page branch (completed runs only;
+# runs cut short by st.rerun() are not recorded)
+# ----------------------------
+run_seconds = time.perf_counter() - _run_started
+perf.metrics.observe(f"page.{st.session_state.page}", run_seconds)
+perf.metrics.maybe_write_file()
+
+# ----------------------------
+# Startup timing: first completed run of each page in this process
+# ----------------------------
+perf.startup.first_render(st.session_state.page, run_seconds)
+
+if is_admin:
+    show_admin_panel()